@@ -0,0 +1,83 @@
+"""Cascade occurrence filter (``--cascade``): cheap model first, escalate when unsure.
+
+Without a cascade every occurrence call goes to ``--model`` or to a random
+model of ``remote_models.txt``, expensive ones included. With
+``--cascade small,large`` each occurrence is first asked to the first
+(cheapest) tier with token logprobs requested. The reply is accepted when it
+is a plain verdict (``significant`` / ``not significant``) whose probability
+(the product of its token probabilities) is at least ``min_confidence``;
+otherwise the next tier is asked. The last tier's reply is always final.
+
+A provider or model that returns no logprobs gives no confidence, so its
+replies always escalate: put only logprob-capable models in the lower
+tiers. Confidences are stored in the response cache, so a cached run
+replays the same escalation decisions.
+
+Every call is a ``CallRecord`` with its ``tier``; ``print_usage_summary``
+and the summary JSON report calls, escalations, cost and latency per tier.
+Only the occurrence filter cascades; the final category analysis still
+uses ``--model`` (or a random model).
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+DEFAULT_MIN_CONFIDENCE = 0.9
+
+
+@dataclass(frozen=True)
+class CascadeSettings:
+    """Tiers (cheapest first) and the confidence below which a reply escalates."""
+    tiers: Tuple[str, ...]
+    min_confidence: float = DEFAULT_MIN_CONFIDENCE
+
+    @classmethod
+    def parse(cls, spec: str, min_confidence: float = DEFAULT_MIN_CONFIDENCE) -> "CascadeSettings":
+        """Build settings from a comma-separated model list (``--cascade``)."""
+        tiers = tuple(model.strip() for model in spec.split(",") if model.strip())
+        if len(tiers) < 2:
+            raise ValueError("--cascade needs at least two comma-separated models, cheapest first.")
+        if not 0.0 < min_confidence <= 1.0:
+            raise ValueError("--cascade-min-confidence must be in (0, 1].")
+        return cls(tiers=tiers, min_confidence=min_confidence)
+
+    def accepts(self, reply: str, confidence: Optional[float]) -> bool:
+        """True when *reply* is a verdict given with enough confidence to stop."""
+        return (
+            confidence is not None
+            and confidence >= self.min_confidence
+            and parse_verdict(reply) is not None
+        )
+
+    def describe(self) -> str:
+        return " -> ".join(self.tiers) + f" (escalate below confidence {self.min_confidence:.2f})"
+
+
+def parse_verdict(reply: str) -> Optional[bool]:
+    """Map a single-occurrence reply to True/False, or None if it is not a verdict."""
+    normalized = reply.strip().lower()
+    if normalized == "significant":
+        return True
+    if normalized == "not significant":
+        return False
+    return None
+
+
+def describe_confidence(confidence: Optional[float]) -> str:
+    return "no logprobs" if confidence is None else f"confidence {confidence:.2f}"
+
+
+def reply_confidence(response) -> Optional[float]:
+    """Probability of the reply from the response's token logprobs (None if absent)."""
+    choices = getattr(response, "choices", None)
+    if not choices:
+        return None
+    logprobs = getattr(choices[0], "logprobs", None)
+    tokens = getattr(logprobs, "content", None) if logprobs is not None else None
+    if not tokens:
+        return None
+    total = sum(token.logprob for token in tokens if getattr(token, "logprob", None) is not None)
+    return math.exp(total)
@@ -0,0 +1,215 @@
+"""Token-budget-aware map-reduce for Method 2 (``full_pdf_analyzer.py``).
+
+``FullPDFAnalyzer`` pastes the whole paper into one prompt per category.
+Before sending it, the prompt is now counted locally against the model's
+context window (:data:`CONTEXT_WINDOWS`, ``--context-tokens``). A paper that
+does not fit, or that is longer than ``--chunk-tokens`` with
+``--map-reduce``, is analysed in two steps instead:
+
+* **map** — the text is split at paragraph (then sentence, then hard)
+  boundaries into chunks that fit the budget, and each chunk is asked for a
+  short evidence summary and a 0-10 ``SCORE`` for the category
+  (:data:`MAP_PROMPT`);
+* **reduce** — the per-chunk summaries and scores are combined into the
+  usual single paragraph and ``NOTE: X`` (:data:`REDUCE_PROMPT`), so the
+  notes tables are unchanged.
+
+Map replies are stored in a chunk cache (a :class:`llm_cache.ResponseCache`
+file keyed by chunk text, category, keywords, model and sampling), so adding
+a category or re-running over an unchanged paper only asks for the missing
+(chunk, category) pairs.
+
+Tokens are counted with ``tiktoken`` when it is installed (plus a 10%
+margin, since most models use other tokenizers) and otherwise estimated
+at three characters per token, which overestimates English text.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+from typing import Callable, Iterable, List, Optional, Sequence
+
+# Context windows in tokens, matched by longest model-name prefix.
+CONTEXT_WINDOWS = {
+    "anthropic/": 200_000,
+    "google/gemini": 1_000_000,
+    "google/gemma": 131_072,
+    "meta-llama/llama-3-": 8_192,
+    "meta-llama/llama-3.": 131_072,
+    "openai/gpt-4.1": 1_047_576,
+    "openai/gpt-4o": 128_000,
+    "openai/gpt-5": 400_000,
+    "qwen/qwen-": 131_072,
+    "qwen/qwen2.5": 32_768,
+    "x-ai/grok-4": 256_000,
+    "x-ai/grok-4-fast": 2_000_000,
+    "x-ai/grok-4.1-fast": 2_000_000,
+}
+DEFAULT_CONTEXT_WINDOW = 32_768
+LOCAL_CONTEXT_WINDOW = 8_192   # llama.cpp servers usually run with a small --ctx-size
+COMPLETION_RESERVE = 1_024     # tokens kept free for the reply
+DEFAULT_CHUNK_TOKENS = 12_000  # chunk size with --map-reduce
+MAX_EVIDENCE_CHARS = 800       # per-chunk summary kept for the reduce prompt
+
+MAP_PROMPT = """You are an expert assistant analyzing one excerpt of a scientific paper for coverage of a technological category.
+
+CONTEXT:
+Category: {category}
+Associated keywords: {keywords}
+
+PAPER EXCERPT:
+{chunk_text}
+
+TASK:
+In at most 80 words, summarize what this excerpt says about the category '{category}', or write "Nothing relevant." if it says nothing about it. Then, on a new line, rate how strongly this excerpt covers the category. The format must be: SCORE: X, where X is between 0 and 10. Answer in English."""
+
+REDUCE_PROMPT = """You are an expert assistant analyzing a scientific paper for coverage of technological criteria.
+
+CONTEXT:
+You are going to analyse the enabler/category: {category}
+Associated keywords: {keywords}
+
+The paper was read in {count} consecutive parts. For each part, a reader summarized what it says about the category and scored its coverage from 0 to 10:
+
+{evidence}
+
+TASK:
+Considering the part summaries above, write no more than ONE SINGLE PARAGRAPH summarizing how well the paper covers the category '{category}' based on the provided keywords and the general content.
+
+Considering all above and the current state of the art in the article area, give a note for this paper after the single PARAGRAPH in a new line. The format must be: NOTE: X, where X is the result of your evaluation between 0 and 10. Answer in English."""
+
+_SCORE_RE = re.compile(r"SCORE:\s*(\d+(?:\.\d+)?)", re.IGNORECASE)
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+class TokenCounter:
+    """Local prompt-size counter (``tiktoken`` if available, else a char estimate)."""
+
+    def __init__(self) -> None:
+        try:
+            import tiktoken
+
+            self._encoding = tiktoken.get_encoding("o200k_base")
+            self.name = "tiktoken/o200k_base"
+        except Exception:  # not installed, or the encoding cannot be loaded
+            self._encoding = None
+            self.name = "estimate (3 chars/token)"
+
+    def count(self, text: str) -> int:
+        if self._encoding is not None:
+            return math.ceil(len(self._encoding.encode(text, disallowed_special=())) * 1.1)
+        return math.ceil(len(text) / 3)
+
+
+def context_window(model_name: str, provider: str = "openrouter", override: int | None = None) -> int:
+    """Context window of *model_name* in tokens (*override* wins when given)."""
+    if override:
+        return override
+    if provider == "local":
+        return LOCAL_CONTEXT_WINDOW
+    lowered = model_name.lower()
+    matches = [prefix for prefix in CONTEXT_WINDOWS if lowered.startswith(prefix)]
+    if not matches:
+        return DEFAULT_CONTEXT_WINDOW
+    return CONTEXT_WINDOWS[max(matches, key=len)]
+
+
+def split_into_chunks(text: str, budget: int, count: Callable[[str], int]) -> List[str]:
+    """Split *text* into consecutive chunks of at most *budget* tokens.
+
+    Paragraphs are packed greedily; a paragraph over budget is split at
+    sentence ends, and a sentence over budget is cut by characters.
+    """
+    chunks: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+
+    def flush() -> None:
+        nonlocal current, current_tokens
+        if current:
+            chunks.append("\n".join(current))
+        current, current_tokens = [], 0
+
+    for piece in _pieces(text, budget, count):
+        tokens = count(piece) + 1
+        if current and current_tokens + tokens > budget:
+            flush()
+        current.append(piece)
+        current_tokens += tokens
+    flush()
+    return chunks
+
+
+def _pieces(text: str, budget: int, count: Callable[[str], int]) -> Iterable[str]:
+    for paragraph in re.split(r"\n\s*\n|\n", text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if count(paragraph) < budget:
+            yield paragraph
+            continue
+        for sentence in _SENTENCE_END_RE.split(paragraph):
+            if count(sentence) < budget:
+                yield sentence
+                continue
+            # Cut an overlong sentence by characters, shrinking until it fits.
+            step = max(1, len(sentence) * (budget - 1) // max(1, count(sentence)))
+            start = 0
+            while start < len(sentence):
+                piece = sentence[start:start + step]
+                while count(piece) >= budget and len(piece) > 1:
+                    piece = piece[: len(piece) * 9 // 10]
+                yield piece
+                start += len(piece)
+
+
+def parse_score(reply: str) -> Optional[float]:
+    """Return the ``SCORE: X`` of a map reply (clamped to 0-10), or None."""
+    match = _SCORE_RE.search(reply or "")
+    if match is None:
+        return None
+    return min(10.0, max(0.0, float(match.group(1))))
+
+
+def evidence_text(reply: str) -> str:
+    """The summary part of a map reply (everything but the SCORE line), shortened."""
+    summary = _SCORE_RE.sub("", reply or "").strip()
+    if len(summary) > MAX_EVIDENCE_CHARS:
+        summary = summary[:MAX_EVIDENCE_CHARS].rstrip() + " ..."
+    return summary or "Nothing relevant."
+
+
+def build_reduce_prompt(
+    category: str,
+    keywords: str,
+    replies: Sequence[str],
+    budget: int,
+    count: Callable[[str], int],
+) -> str:
+    """Combine the map *replies* into the reduce prompt, within *budget* tokens.
+
+    When every summary does not fit, the best-scored parts are kept (listed
+    in document order) and the rest are dropped.
+    """
+    entries = [
+        (index, parse_score(reply), f"Part {index}: score {_format_score(parse_score(reply))}\n{evidence_text(reply)}")
+        for index, reply in enumerate(replies, start=1)
+    ]
+    kept = sorted(entries, key=lambda entry: -(entry[1] or 0.0))
+    while kept:
+        ordered = sorted(kept, key=lambda entry: entry[0])
+        prompt = REDUCE_PROMPT.format(
+            category=category,
+            keywords=keywords,
+            count=len(replies),
+            evidence="\n\n".join(entry[2] for entry in ordered),
+        )
+        if count(prompt) <= budget:
+            return prompt
+        kept = kept[:-1]
+    return REDUCE_PROMPT.format(category=category, keywords=keywords, count=len(replies), evidence="(none)")
+
+
+def _format_score(score: Optional[float]) -> str:
+    return "n/a" if score is None else f"{score:g}"
@@ -0,0 +1,324 @@
+"""Persistent full-text index of a PDF corpus for keyword ranking (``--index``).
+
+``utils/pdf_keyword_ranker.py`` extracts and scans every PDF of the folder
+on each run, even when only the keywords file changed. With ``--index PATH``
+it keeps the page texts in a SQLite file instead, with an FTS5 index over
+them (:class:`CorpusIndex`):
+
+* :meth:`CorpusIndex.stale_paths` lists the PDFs that are new or whose size
+  or modification time changed since they were indexed, and
+  :meth:`CorpusIndex.add` (re)indexes one of them in its own transaction,
+  so an interrupted build keeps its progress. :meth:`CorpusIndex.prune`
+  drops the PDFs deleted from disk.
+* :meth:`CorpusIndex.category_counts` answers a whole taxonomy from the
+  index. FTS5 tokens are the runs of ``\\w`` characters in lower case, the
+  same runs that ``\\b`` delimits in ``KeywordSearcher``'s regex. So a
+  one-word ASCII keyword is counted from its postings alone, without
+  reading any text. Other ASCII keywords (phrases, punctuation) are looked
+  up as FTS5 phrases, whose matches are a superset of the regex hits, and
+  counted exactly with ``\\b{keyword}\\b`` on the matching pages only.
+  FTS5 folds the case of non-ASCII letters differently from ``re``
+  ("İ" is not "i"), so keywords with any are counted on every stored page.
+  FTS5 also splits text differently around some non-ASCII characters: it
+  keeps combining marks (U+0301) inside tokens, and SQLite's Unicode tables
+  are older than Python's. Pages holding such a character are flagged when
+  indexed and always counted with the regex.
+  The counts, and the order of every breakdown, equal a full scan's
+  (``analyze_pdf``).
+
+The extractor id is stored with the index; opening it with another
+extractor (or extractor version) empties it, so every PDF is indexed again.
+When the local SQLite has no FTS5, every stored page is scanned; no PDF is
+re-extracted either way.
+
+The index is written by one process (the ranker's main process); its
+connection is not shared across threads.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+import sqlite3
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from keyword_search import KeywordSearcher
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    indexed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pages (
+    id INTEGER PRIMARY KEY,
+    doc_id INTEGER NOT NULL,
+    page INTEGER NOT NULL,
+    content TEXT NOT NULL,
+    scan INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS pages_by_doc ON pages (doc_id);
+"""
+
+# External-content FTS5 table: the text is stored once, in ``pages``. Tokens
+# are runs of letters, digits and "_" folded to lower case (no diacritic
+# folding), i.e. the runs of ``\w`` that delimit ``\b`` in the keyword regex.
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS page_terms USING fts5(
+    content, content='pages', content_rowid='id',
+    tokenize="unicode61 remove_diacritics 0 tokenchars '_'"
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS page_vocab USING fts5vocab(page_terms, instance);
+"""
+
+# Tells FTS5 token characters from separators, one character at a time.
+_PROBE_SCHEMA = """
+CREATE VIRTUAL TABLE probe USING fts5(
+    content, tokenize="unicode61 remove_diacritics 0 tokenchars '_'"
+);
+"""
+
+# A keyword FTS5 can look up has at least one token character.
+_TOKEN_CHAR = re.compile(r"\w")
+# ASCII single-token keywords, counted from the postings alone.
+_WORD_KEY = re.compile(r"[A-Za-z0-9_]+")
+
+
+class CorpusIndex:
+    """SQLite file mapping indexed PDFs to their page texts."""
+
+    def __init__(self, path: str, extractor: str) -> None:
+        self.path = path
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        # Indexes written before pages had a scan flag are rebuilt.
+        flagged = any(column[1] == "scan" for column in self._conn.execute("PRAGMA table_info(pages)"))
+        if not flagged:
+            self._conn.execute("ALTER TABLE pages ADD COLUMN scan INTEGER NOT NULL DEFAULT 0")
+        self.fts = self._create_fts()
+        self._probe = self._create_probe()
+        # Non-ASCII character -> True when FTS5 and ``\\w`` split text differently around it.
+        self._splits_differently: Dict[str, bool] = {}
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'extractor'").fetchone()
+        if row is None or row[0] != extractor or not flagged:
+            with self._conn:
+                self._clear()
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('extractor', ?)", (extractor,)
+                )
+
+    def _create_fts(self) -> bool:
+        existed = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'page_terms'"
+        ).fetchone()
+        try:
+            self._conn.executescript(_FTS_SCHEMA)
+        except sqlite3.OperationalError as exc:  # SQLite built without FTS5
+            logging.warning("FTS5 unavailable, the corpus index will scan every page: %s", exc)
+            return False
+        if not existed:
+            # Pages stored while FTS5 was unavailable.
+            self._conn.execute("INSERT INTO page_terms (page_terms) VALUES ('rebuild')")
+        self._conn.commit()
+        return True
+
+    @staticmethod
+    def _create_probe() -> Optional[sqlite3.Connection]:
+        probe = sqlite3.connect(":memory:")
+        try:
+            probe.executescript(_PROBE_SCHEMA)
+        except sqlite3.OperationalError:
+            probe.close()
+            return None
+        return probe
+
+    def close(self) -> None:
+        self._conn.close()
+        if self._probe is not None:
+            self._probe.close()
+
+    # -- building -------------------------------------------------------------
+
+    def stale_paths(self, paths: Iterable[str]) -> List[str]:
+        """Return the paths of *paths* that are not indexed or changed on disk since."""
+        known = {
+            path: (size, mtime_ns)
+            for path, size, mtime_ns in self._conn.execute("SELECT path, size, mtime_ns FROM documents")
+        }
+        stale: List[str] = []
+        for path in paths:
+            stat = os.stat(path)
+            if known.get(os.path.abspath(path)) != (stat.st_size, stat.st_mtime_ns):
+                stale.append(path)
+        return stale
+
+    def add(self, path: str, pages: Iterable[Tuple[int, str]]) -> None:
+        """Store ``(page_number, text)`` *pages* as the content of *path*, replacing any previous one."""
+        key = os.path.abspath(path)
+        stat = os.stat(path)
+        with self._conn:
+            self._delete(key)
+            doc_id = self._conn.execute(
+                "INSERT INTO documents (path, size, mtime_ns, indexed_at) VALUES (?, ?, ?, ?)",
+                (key, stat.st_size, stat.st_mtime_ns, time.time()),
+            ).lastrowid
+            for page, content in pages:
+                page_id = self._conn.execute(
+                    "INSERT INTO pages (doc_id, page, content, scan) VALUES (?, ?, ?, ?)",
+                    (doc_id, page, content, self._needs_scan(content)),
+                ).lastrowid
+                if self.fts:
+                    self._conn.execute(
+                        "INSERT INTO page_terms (rowid, content) VALUES (?, ?)", (page_id, content)
+                    )
+
+    def _needs_scan(self, content: str) -> bool:
+        """True when *content* has a character FTS5 tokenizes unlike ``\\w`` (see the module doc)."""
+        if content.isascii():
+            return False
+        chars = {char for char in set(content) if not char.isascii()}
+        unknown = [char for char in chars if char not in self._splits_differently]
+        if unknown:
+            if self._probe is None:
+                # Without FTS5 every page is scanned anyway; flag conservatively
+                # in case a later SQLite with FTS5 opens the index.
+                self._splits_differently.update(dict.fromkeys(unknown, True))
+            else:
+                # "a<char>b" is one FTS5 token when <char> is a token character.
+                with self._probe:
+                    self._probe.executemany(
+                        "INSERT INTO probe (rowid, content) VALUES (?, ?)",
+                        ((ord(char), f"a{char}b") for char in unknown),
+                    )
+                    separators = {
+                        chr(rowid) for (rowid,) in self._probe.execute("SELECT rowid FROM probe WHERE probe MATCH 'a'")
+                    }
+                    self._probe.execute("DELETE FROM probe")
+                for char in unknown:
+                    self._splits_differently[char] = (char in separators) == bool(_TOKEN_CHAR.match(char))
+        return any(self._splits_differently[char] for char in chars)
+
+    def prune(self) -> int:
+        """Drop the documents whose file no longer exists; return how many."""
+        gone = [
+            path for (path,) in self._conn.execute("SELECT path FROM documents")
+            if not os.path.exists(path)
+        ]
+        with self._conn:
+            for path in gone:
+                self._delete(path)
+        return len(gone)
+
+    def _delete(self, key: str) -> None:
+        row = self._conn.execute("SELECT id FROM documents WHERE path = ?", (key,)).fetchone()
+        if row is None:
+            return
+        if self.fts:
+            self._conn.execute(
+                "INSERT INTO page_terms (page_terms, rowid, content) "
+                "SELECT 'delete', id, content FROM pages WHERE doc_id = ?",
+                row,
+            )
+        self._conn.execute("DELETE FROM pages WHERE doc_id = ?", row)
+        self._conn.execute("DELETE FROM documents WHERE id = ?", row)
+
+    def _clear(self) -> None:
+        if self.fts:
+            self._conn.execute("INSERT INTO page_terms (page_terms) VALUES ('delete-all')")
+        self._conn.execute("DELETE FROM pages")
+        self._conn.execute("DELETE FROM documents")
+
+    def stats(self) -> Dict[str, int]:
+        documents, = self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()
+        pages, = self._conn.execute("SELECT COUNT(*) FROM pages").fetchone()
+        return {"documents": documents, "pages": pages}
+
+    # -- queries --------------------------------------------------------------
+
+    def category_counts(
+        self,
+        searcher: KeywordSearcher,
+        paths: Optional[Iterable[str]] = None,
+    ) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Per-file ``{category: {"total", "breakdown"}}`` for *searcher*'s keywords.
+
+        Same counts, in the same order, as ``pdf_keyword_ranker.analyze_pdf``
+        over the stored text. Only files with at least one hit are returned,
+        keyed by the path given in *paths* (all indexed files when None).
+        """
+        doc_paths = dict(self._conn.execute("SELECT id, path FROM documents"))
+        if paths is not None:
+            wanted = {os.path.abspath(path): path for path in paths}
+            doc_paths = {doc_id: wanted[path] for doc_id, path in doc_paths.items() if path in wanted}
+
+        # (doc, page, keyword list index, enabler, keyword, hits), one per keyword entry and page
+        page_counts = []
+        for key, entries in searcher._keyword_entries.items():
+            for doc_id, page_id, hits in self._key_counts(key, searcher._key_spellings[key]):
+                if doc_id in doc_paths:
+                    page_counts.extend((doc_id, page_id, index, enabler, keyword, hits)
+                                       for enabler, keyword, index in entries)
+        # Page order, then keyword list order, like check_enabler_occurrences,
+        # so every breakdown lists its keywords in the same order as a scan.
+        page_counts.sort(key=lambda item: item[:3])
+
+        categories = list(searcher.enabler_keywords)
+        per_file: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for doc_id, _page_id, _index, enabler, keyword, hits in page_counts:
+            counts = per_file.get(doc_paths[doc_id])
+            if counts is None:
+                counts = per_file[doc_paths[doc_id]] = {
+                    category: {"total": 0, "breakdown": {}} for category in categories
+                }
+            category_counts = counts[enabler]
+            category_counts["total"] += hits
+            category_counts["breakdown"][keyword] = category_counts["breakdown"].get(keyword, 0) + hits
+        return per_file
+
+    def _key_counts(self, key: str, spellings: List[str]) -> Iterator[Tuple[int, int, int]]:
+        """Yield ``(doc_id, page_id, hits)`` for the pages where a spelling of *key* matches as a word."""
+        if self.fts and all(_WORD_KEY.fullmatch(spelling) for spelling in spellings):
+            # One token: its postings are the regex hits, except on flagged pages.
+            yield from self._conn.execute(
+                "SELECT p.doc_id, p.id, COUNT(*) FROM page_vocab v JOIN pages p ON p.id = v.doc "
+                "WHERE v.term = ? AND NOT p.scan GROUP BY v.doc",
+                (key,),
+            )
+            pages = self._conn.execute("SELECT doc_id, id, content FROM pages WHERE scan")
+        else:
+            pages = self._candidate_pages(spellings)
+        pattern = KeywordSearcher.spellings_pattern(spellings)
+        for doc_id, page_id, content in pages:
+            hits = len(pattern.findall(content))
+            if hits:
+                yield doc_id, page_id, hits
+
+    def _candidate_pages(self, spellings: List[str]):
+        """``(doc_id, page_id, content)`` of the pages that may contain one of *spellings*."""
+        scan_all = "SELECT doc_id, id, content FROM pages"
+        if not self.fts or not all(spelling.isascii() and _TOKEN_CHAR.search(spelling) for spelling in spellings):
+            return self._conn.execute(scan_all)
+        # ASCII spellings of one key only differ in case, which FTS5 folds.
+        query = '"' + spellings[0].replace('"', '""') + '"'
+        try:
+            return self._conn.execute(
+                "SELECT p.doc_id, p.id, p.content FROM page_terms JOIN pages p ON p.id = page_terms.rowid "
+                "WHERE page_terms MATCH ? AND NOT p.scan "
+                "UNION ALL SELECT doc_id, id, content FROM pages WHERE scan",
+                (query,),
+            )
+        except sqlite3.OperationalError as exc:
+            logging.warning("FTS5 query for %r failed, scanning every page: %s", spellings, exc)
+            return self._conn.execute(scan_all)
@@ -0,0 +1,180 @@
+"""Incremental corpus mode (``--incremental``): only process new or changed PDFs.
+
+A manifest per method lives next to the timestamped run directories
+(``<source>/Results/manifest_<method>.json``). For every PDF it records the
+SHA-256 of the file, a fingerprint of the run configuration, the run
+directory holding its outputs and the names of those output files.
+
+The fingerprint hashes everything that determines a PDF's results: the
+keywords file and prompt file contents, model, sampling parameters,
+provider and method-specific options (see :func:`config_fingerprint`).
+On an incremental run, a PDF whose hash and fingerprint match its entry
+(and whose recorded files still exist) is not extracted or sent to the
+LLM: its output files are hard-linked (copied when linking is not
+possible) into the new run directory, so aggregate tables built from that
+directory cover the full corpus. Everything else is processed normally
+and recorded once finished.
+
+The manifest is rewritten atomically (temp file + ``os.replace``) by the
+coordinating process only; worker processes never touch it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from pdf_text_cache import file_digest
+
+MANIFEST_VERSION = 1
+
+# Per-PDF output files (``<stem>_<suffix>``) of each method's run directory.
+OUTPUT_SUFFIXES: Dict[str, Tuple[str, ...]] = {
+    "method1": (
+        r"significant_paragraphs_category_\d+\.txt",
+        r"all_category_results\.txt",
+        r"all_category_notes\.txt",
+        r"occurrences\.txt",
+        r"cost\.txt",
+        r"summary\.json",
+    ),
+    "method2": (
+        r"2_cost\.txt",
+        r"summary\.json",
+    ),
+}
+
+
+def content_digest(path: Path | str) -> str:
+    """SHA-256 of a small text/config file (``"missing"`` if it does not exist)."""
+    try:
+        return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+    except FileNotFoundError:
+        return "missing"
+
+
+def config_fingerprint(**parts) -> str:
+    """Return one SHA-256 over the keyword arguments (JSON-encoded, sorted)."""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _link_or_copy(src: Path, dst: Path) -> None:
+    if dst.exists():
+        return
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+class CorpusManifest:
+    """The ``manifest_<method>.json`` of one ``Results`` directory."""
+
+    def __init__(self, results_dir: Path | str, method: str) -> None:
+        if method not in OUTPUT_SUFFIXES:
+            raise ValueError(f"Unknown method for the corpus manifest: {method!r}")
+        self.results_dir = Path(results_dir)
+        self.method = method
+        self.path = self.results_dir / f"manifest_{method}.json"
+        self.entries: Dict[str, dict] = {}
+        try:
+            payload = json.loads(self.path.read_text(encoding="utf-8"))
+            if payload.get("version") == MANIFEST_VERSION:
+                self.entries = payload.get("pdfs", {})
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, AttributeError) as exc:
+            logging.warning("Ignoring unreadable corpus manifest %s: %s", self.path, exc)
+
+    # -- queries --------------------------------------------------------------
+
+    def output_files(self, run_dir: Path, pdf_path: Path) -> List[str]:
+        """Names of the per-PDF output files of *pdf_path* present in *run_dir*."""
+        pattern = re.compile(
+            re.escape(pdf_path.stem) + "_(?:" + "|".join(OUTPUT_SUFFIXES[self.method]) + ")$"
+        )
+        return sorted(path.name for path in run_dir.iterdir() if pattern.match(path.name))
+
+    def lookup(self, pdf_path: Path, digest: str, fingerprint: str) -> dict | None:
+        """Return the reusable entry of *pdf_path*, or None if it must be processed."""
+        entry = self.entries.get(pdf_path.name)
+        if not entry or entry.get("sha256") != digest or entry.get("fingerprint") != fingerprint:
+            return None
+        run_dir = self.results_dir / entry.get("run_dir", "")
+        files = entry.get("files") or []
+        if not files or not all((run_dir / name).is_file() for name in files):
+            return None
+        return entry
+
+    # -- updates --------------------------------------------------------------
+
+    def reuse(self, pdf_path: Path, fingerprint: str, run_dir: Path) -> dict | None:
+        """Link the recorded outputs of an unchanged *pdf_path* into *run_dir*.
+
+        Returns the entry (now pointing at *run_dir*) or None when the PDF is
+        new or changed.
+        """
+        digest = file_digest(pdf_path)
+        entry = self.lookup(pdf_path, digest, fingerprint)
+        if entry is None:
+            return None
+        source_dir = self.results_dir / entry["run_dir"]
+        if source_dir.resolve() != Path(run_dir).resolve():
+            for name in entry["files"]:
+                _link_or_copy(source_dir / name, Path(run_dir) / name)
+        entry = dict(entry, run_dir=os.path.relpath(run_dir, self.results_dir))
+        self.entries[pdf_path.name] = entry
+        return entry
+
+    def partition(
+        self, pdf_files: Sequence[Path], fingerprint: str, run_dir: Path
+    ) -> Tuple[List[Path], List[Path]]:
+        """Split *pdf_files* into ``(to_process, reused)``, linking the reused outputs."""
+        to_process: List[Path] = []
+        reused: List[Path] = []
+        for pdf_path in pdf_files:
+            (reused if self.reuse(pdf_path, fingerprint, run_dir) else to_process).append(pdf_path)
+        return to_process, reused
+
+    def record(
+        self,
+        pdf_path: Path,
+        fingerprint: str,
+        run_dir: Path,
+        extra: dict | None = None,
+    ) -> None:
+        """Record the outputs *pdf_path* just produced in *run_dir*."""
+        files = self.output_files(Path(run_dir), pdf_path)
+        if not files:
+            return
+        self.entries[pdf_path.name] = {
+            "sha256": file_digest(pdf_path),
+            "fingerprint": fingerprint,
+            "run_dir": os.path.relpath(run_dir, self.results_dir),
+            "files": files,
+            **({"extra": extra} if extra is not None else {}),
+        }
+
+    def record_all(self, pdf_files: Iterable[Path], fingerprint: str, run_dir: Path) -> None:
+        for pdf_path in pdf_files:
+            self.record(pdf_path, fingerprint, run_dir)
+
+    def save(self) -> None:
+        self.results_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            tmp.write_text(
+                json.dumps({"version": MANIFEST_VERSION, "pdfs": self.entries}, indent=2, ensure_ascii=False),
+                encoding="utf-8",
+            )
+            os.replace(tmp, self.path)
+        except OSError as exc:
+            logging.warning("Failed to write corpus manifest %s: %s", self.path, exc)
+            tmp.unlink(missing_ok=True)
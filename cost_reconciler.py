@@ -0,0 +1,125 @@
+"""Deferred cost reconciliation through OpenRouter's generation endpoint.
+
+When a completion response carries no ``usage.cost``, the real cost is only
+available from ``GET /api/v1/generation?id=<id>``, and usually only after a
+short delay. Looking it up inline (3 attempts, 1.5 s apart) held the worker
+that had just finished the completion for up to ~4.5 s per call.
+
+``LLMAnalyzer._record_call`` now stores such calls at once with a
+pricing-table estimate and ``source="pending"``, and hands the generation
+id to a :class:`CostReconciler`. Its background thread looks up the queued
+ids in batches (a few in parallel), retries the ones not available yet a
+round later, and patches the ``CallRecord`` in place: ``source`` becomes
+``generation_endpoint``, or ``estimate`` when every attempt failed.
+``get_usage_summary``, ``print_usage_summary`` and ``write_summary_json``
+call :meth:`CostReconciler.drain` first, so every reported figure is
+final and reports keep their previous sources and totals.
+"""
+
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, List, Optional, Tuple
+
+# _fetch returns ("done", data), ("retry", None) or ("failed", None).
+FetchResult = Tuple[str, Optional[dict]]
+
+LOOKUP_WORKERS = 4
+
+
+@dataclass
+class _Pending:
+    record: Any
+    generation_id: str
+    attempts: int = field(default=0)
+
+
+class CostReconciler:
+    """Background queue of generation ids whose cost is still unknown.
+
+    *fetch(generation_id)* makes one lookup; *apply(record, data)* patches
+    the record with the stats (or, for ``data=None``, with the estimate).
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str], FetchResult],
+        apply: Callable[[Any, Optional[dict]], None],
+        retries: int = 3,
+        retry_delay: float = 1.5,
+    ) -> None:
+        self._fetch = fetch
+        self._apply = apply
+        self._retries = retries
+        self._retry_delay = retry_delay
+        self._queue: "queue.Queue[_Pending]" = queue.Queue()
+        self._outstanding = 0
+        self._idle = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, record, generation_id: str) -> None:
+        """Queue *record* for a generation-endpoint lookup."""
+        with self._idle:
+            self._outstanding += 1
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="cost-reconciler", daemon=True)
+                self._thread.start()
+        self._queue.put(_Pending(record, generation_id))
+
+    @property
+    def pending(self) -> int:
+        with self._idle:
+            return self._outstanding
+
+    def drain(self) -> None:
+        """Block until every record submitted so far has been patched."""
+        with self._idle:
+            self._idle.wait_for(lambda: self._outstanding == 0)
+
+    def _run(self) -> None:
+        with ThreadPoolExecutor(max_workers=LOOKUP_WORKERS, thread_name_prefix="cost-lookup") as pool:
+            batch: List[_Pending] = []
+            while True:
+                if not batch:
+                    batch.append(self._queue.get())
+                batch.extend(self._take_queued())
+                results = list(pool.map(self._lookup, [item.generation_id for item in batch]))
+                retry: List[_Pending] = []
+                for item, (status, data) in zip(batch, results):
+                    item.attempts += 1
+                    if status == "retry" and item.attempts < self._retries:
+                        retry.append(item)
+                    else:
+                        self._finish(item, data)
+                batch = retry
+                if batch:
+                    time.sleep(self._retry_delay)
+
+    def _take_queued(self) -> List[_Pending]:
+        taken: List[_Pending] = []
+        while True:
+            try:
+                taken.append(self._queue.get_nowait())
+            except queue.Empty:
+                return taken
+
+    def _lookup(self, generation_id: str) -> FetchResult:
+        try:
+            return self._fetch(generation_id)
+        except Exception as exc:  # keep the reconciler alive
+            logging.debug("Generation lookup for %s failed: %s", generation_id, exc)
+            return "retry", None
+
+    def _finish(self, item: _Pending, data: Optional[dict]) -> None:
+        try:
+            self._apply(item.record, data)
+        except Exception as exc:
+            logging.warning("Could not reconcile the cost of generation %s: %s", item.generation_id, exc)
+        with self._idle:
+            self._outstanding -= 1
+            self._idle.notify_all()
@@ -7,67 +7,193 @@ from pathlib import Path
 from typing import Dict, List, Tuple
 from colorama import Fore, Style, init
 from dotenv import load_dotenv
-from PyPDF2 import PdfReader
+from llm_cache import CachedResponse, ResponseCache
 from llm_query import LLMAnalyzer
+from chunked_analysis import (
+    COMPLETION_RESERVE, DEFAULT_CHUNK_TOKENS, MAP_PROMPT, REDUCE_PROMPT, TokenCounter,
+    build_reduce_prompt, context_window, split_into_chunks,
+)
+from multi_category import (
+    MULTI_CATEGORY_PREFIX, MULTI_CATEGORY_SUFFIX, build_multi_category_prompt,
+    format_category_response, group_categories, parse_multi_category_reply,
+)
+from pdf_text_cache import pypdf2_pages
+from corpus_manifest import CorpusManifest, config_fingerprint, content_digest
 
 # Initialize colorama
 init(autoreset=True)
 
 class FullPDFAnalyzer:
+    PROMPT_TEMPLATE = """You are an expert assistant analyzing a scientific paper for coverage of technological criteria.
+
+CONTEXT:
+You are going to analyse the enabler/category: {category}
+Associated keywords: {keywords}
+
+FULL PAPER TEXT:
+{pdf_text}
+
+TASK:
+Considering the paper text above, write no more than ONE SINGLE PARAGRAPH summarizing how well the paper covers the category '{category}' based on the provided keywords and the general content.
+
+Considering all above and the current state of the art in the article area, give a note for this paper after the single PARAGRAPH in a new line. The format must be: NOTE: X, where X is the result of your evaluation between 0 and 10. Answer in English."""
+
     def __init__(self, source_folder: str, keywords_path: str, output_folder: str,
                  temperature: float = 1.0, top_p: float = 1.0,
                  provider: str = "openrouter", local_url: str | None = None,
-                 model_name: str = "random", max_workers: int = 3):
+                 model_name: str = "random", max_workers: int = 3,
+                 llm_cache: str | None = None, incremental: bool = False,
+                 map_reduce: bool = False, chunk_tokens: int = DEFAULT_CHUNK_TOKENS,
+                 context_tokens: int | None = None, chunk_cache: str | None = None,
+                 multi_category: bool = False, categories_per_request: int | None = None):
         self.source_folder = Path(source_folder)
         self.keywords_path = Path(keywords_path)
         self.output_folder = Path(output_folder)
         self.model_name = model_name
         self.max_workers = max_workers
-        self.llm_analyzer = LLMAnalyzer(temperature=temperature, top_p=top_p, provider=provider, local_base_url=local_url)
+        self.temperature = temperature
+        self.top_p = top_p
+        self.provider = provider
+        self.local_url = local_url
+        self.incremental = incremental
+        # Token-budget-aware map-reduce (see chunked_analysis.py). Over-length
+        # prompts are always chunked; --map-reduce also chunks anything longer
+        # than chunk_tokens.
+        self.map_reduce = map_reduce
+        self.chunk_tokens = chunk_tokens
+        self.context_tokens = context_tokens
+        self.chunk_cache_path = chunk_cache
+        self._chunk_cache: ResponseCache | None = None
+        # Several categories per request (see multi_category.py).
+        self.multi_category = multi_category
+        self.categories_per_request = categories_per_request
+        self.token_counter = TokenCounter()
+        self.llm_analyzer = LLMAnalyzer(temperature=temperature, top_p=top_p, provider=provider, local_base_url=local_url,
+                                        response_cache_path=llm_cache)
         # Provider-model validation
         if model_name != "random" and model_name not in self.llm_analyzer.models:
             print(Fore.RED + f"Error: Model '{model_name}' not found in {self.llm_analyzer.active_provider.models_file}" + Style.RESET_ALL)
             sys.exit(2)
         self.categories = self._load_categories()
         self._run_dir = None  # Set by run() via R7
+        # PDFs whose results an incremental run reused instead of analyzing.
+        self._reused: List[str] = []
 
     @property
     def _effective_output_dir(self):
         """Return the timestamped Results dir (R7) if set, else output_folder."""
         return self._run_dir if self._run_dir is not None else self.output_folder
+
+    @property
+    def _aggregate_label(self) -> str:
+        """Name of the in-memory usage row, which covers this run's API calls only."""
+        return "Full Text Analysis (this run only)" if self._reused else "Full Text Analysis"
         
     def _load_categories(self) -> Dict[str, List[str]]:
         with open(self.keywords_path, 'r', encoding='utf-8') as f:
             return json.load(f)
 
+    def _fingerprint(self) -> str:
+        """Fingerprint of everything that determines a PDF's Method 2 outputs (incremental mode)."""
+        return config_fingerprint(
+            method="method2",
+            keywords=content_digest(self.keywords_path),
+            prompt=self.PROMPT_TEMPLATE,
+            model=self.model_name,
+            temperature=self.temperature,
+            top_p=self.top_p,
+            provider=self.provider,
+            local_url=self.local_url,
+            map_reduce=self.map_reduce,
+            chunk_tokens=self.chunk_tokens if self.map_reduce else None,
+            context_tokens=self.context_tokens,
+            map_prompt=MAP_PROMPT,
+            reduce_prompt=REDUCE_PROMPT,
+            multi_category=self.multi_category,
+            categories_per_request=self.categories_per_request if self.multi_category else None,
+            multi_category_prompt=(MULTI_CATEGORY_PREFIX + MULTI_CATEGORY_SUFFIX) if self.multi_category else None,
+        )
+
     def extract_text(self, pdf_path: Path) -> str:
         print(Fore.CYAN + f"Extracting text from {pdf_path.name}..." + Style.RESET_ALL)
-        reader = PdfReader(str(pdf_path))
-        text = ""
-        for page in reader.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text += page_text + "\n"
-        return text
+        pages, from_cache = pypdf2_pages(pdf_path)
+        if from_cache:
+            print(Fore.CYAN + f"  Loaded {len(pages)} pages from the text cache." + Style.RESET_ALL)
+        return "".join(page_text + "\n" for page_text in pages if page_text)
 
-    def analyze_category(self, pdf_text: str, category: str, keywords: List[str]) -> Tuple[str, int]:
-        prompt = f"""You are an expert assistant analyzing a scientific paper for coverage of technological criteria.
+    def _prompt_budget(self, model_name: str) -> int:
+        """Largest prompt (in local tokens) that may be sent to *model_name*.
 
-CONTEXT:
-You are going to analyse the enabler/category: {category}
-Associated keywords: {', '.join(keywords)}
+        With ``--model random`` the smallest window of the loaded models is
+        used, so the chunks do not depend on the model drawn for a category.
+        """
+        models = self.llm_analyzer.models if self.model_name == "random" else [model_name]
+        window = min(context_window(model, self.provider, self.context_tokens) for model in models)
+        return window - COMPLETION_RESERVE
 
-FULL PAPER TEXT:
-{pdf_text}
+    def _get_chunk_cache(self) -> ResponseCache:
+        if self._chunk_cache is None:
+            path = self.chunk_cache_path or str(self.source_folder / "Results" / "method2_chunk_cache.sqlite")
+            self._chunk_cache = ResponseCache(path)
+        return self._chunk_cache
 
-TASK:
-Considering the paper text above, write no more than ONE SINGLE PARAGRAPH summarizing how well the paper covers the category '{category}' based on the provided keywords and the general content.
+    def _map_chunk(self, chunk_text: str, category: str, keywords: str, model_name: str) -> str:
+        """Map step for one chunk, replayed from the chunk cache when possible."""
+        prompt = MAP_PROMPT.format(category=category, keywords=keywords, chunk_text=chunk_text)
+        cache = self._get_chunk_cache()
+        key = ResponseCache.make_key(
+            self.provider, model_name, self.temperature, self.top_p, "method2-map", prompt
+        )
+        cached = cache.get(key)
+        if cached is not None:
+            self.llm_analyzer._record_cache_hit(model_name, cached)
+            return cached.reply
+        reply = self.llm_analyzer.analyze({}, prompt, model_name=model_name)
+        cache.put(key, self.provider, model_name, CachedResponse(reply, None, 0, 0, 0.0))
+        return reply
 
-Considering all above and the current state of the art in the article area, give a note for this paper after the single PARAGRAPH in a new line. The format must be: NOTE: X, where X is the result of your evaluation between 0 and 10. Answer in English."""
+    def _map_reduce_category(
+        self, pdf_text: str, category: str, keywords: str, model_name: str, budget: int
+    ) -> str:
+        """Analyze *category* chunk by chunk, then combine (see chunked_analysis.py)."""
+        count = self.token_counter.count
+        overhead = count(MAP_PROMPT.format(category=category, keywords=keywords, chunk_text=""))
+        chunk_budget = budget - overhead
+        if self.map_reduce:
+            chunk_budget = min(chunk_budget, self.chunk_tokens)
+        chunks = split_into_chunks(pdf_text, chunk_budget, count)
+        print(
+            Fore.YELLOW
+            + f"    Map-reduce for {category}: {len(chunks)} chunk(s) of <= {chunk_budget:,} tokens "
+            + f"({self.token_counter.name})"
+            + Style.RESET_ALL
+        )
+        replies = [self._map_chunk(chunk, category, keywords, model_name) for chunk in chunks]
+        reduce_prompt = build_reduce_prompt(category, keywords, replies, budget, count)
+        return self.llm_analyzer.analyze({}, reduce_prompt, model_name=model_name)
+
+    def analyze_category(self, pdf_text: str, category: str, keywords: List[str]) -> Tuple[str, int]:
+        prompt = self.PROMPT_TEMPLATE.format(
+            category=category, keywords=", ".join(keywords), pdf_text=pdf_text
+        )
 
         print(Fore.YELLOW + f"  Analyzing category: {category}..." + Style.RESET_ALL)
         effective_model = self.model_name if self.model_name != "random" else self.llm_analyzer.get_random_model()
-        response = self.llm_analyzer.analyze({}, prompt, model_name=effective_model)
+        budget = self._prompt_budget(effective_model)
+        over_length = self.token_counter.count(prompt) > budget
+        if over_length or (self.map_reduce and self.token_counter.count(pdf_text) > self.chunk_tokens):
+            if over_length and not self.map_reduce:
+                print(
+                    Fore.YELLOW
+                    + f"    Full-text prompt exceeds the {budget:,}-token budget of {effective_model}; "
+                    + "analyzing it in chunks."
+                    + Style.RESET_ALL
+                )
+            response = self._map_reduce_category(
+                pdf_text, category, ", ".join(keywords), effective_model, budget
+            )
+        else:
+            response = self.llm_analyzer.analyze({}, prompt, model_name=effective_model)
         
         # Extract note
         note = 0
@@ -82,6 +208,46 @@ Considering all above and the current state of the art in the article area, give
         
         return response, note
 
+    def _category_groups(self, pdf_text: str) -> List[List[str]]:
+        """Categories to ask together with --multi-category (singletons are asked alone)."""
+        if self.map_reduce and self.token_counter.count(pdf_text) > self.chunk_tokens:
+            # Chunked papers are analysed category by category.
+            return [[cat] for cat in self.categories]
+        budget = self._prompt_budget(self.model_name)
+        return group_categories(
+            pdf_text, self.categories, budget, self.token_counter.count, self.categories_per_request
+        )
+
+    def analyze_categories(self, pdf_text: str, names: List[str]) -> Dict[str, Tuple[str, float]]:
+        """Analyze the categories *names* in one request; returns {category: (response, note)}.
+
+        Categories missing from, or malformed in, the JSON reply are asked
+        again one by one with :meth:`analyze_category`.
+        """
+        if len(names) == 1:
+            return {names[0]: self.analyze_category(pdf_text, names[0], self.categories[names[0]])}
+
+        print(Fore.YELLOW + f"  Analyzing {len(names)} categories in one request: {', '.join(names)}..." + Style.RESET_ALL)
+        effective_model = self.model_name if self.model_name != "random" else self.llm_analyzer.get_random_model()
+        prompt = build_multi_category_prompt(pdf_text, {name: self.categories[name] for name in names})
+        reply = self.llm_analyzer.analyze({}, prompt, model_name=effective_model)
+
+        results = {
+            name: (format_category_response(paragraph, note), note)
+            for name, (paragraph, note) in parse_multi_category_reply(reply, names).items()
+        }
+        missing = [name for name in names if name not in results]
+        if missing:
+            print(
+                Fore.YELLOW
+                + f"    {len(missing)} of {len(names)} categories missing from the JSON reply; "
+                + "asking them one by one."
+                + Style.RESET_ALL
+            )
+            for name in missing:
+                results[name] = self.analyze_category(pdf_text, name, self.categories[name])
+        return results
+
     def generate_latex_tables(self, results: Dict[str, Dict[str, float]]):
         # results format: {pdf_name: {category: note}}
         pdf_names = sorted(results.keys())
@@ -132,7 +298,7 @@ Considering all above and the current state of the art in the article area, give
         total_cost = summary['total_cost_usd']
         
         # Add the full text analysis row first
-        rows.append(f"        \\texttt{{Full Text Analysis}} & {summary['calls']} & ${summary['total_cost_usd']:.6f} \\\\")
+        rows.append(f"        \\texttt{{{self._aggregate_label}}} & {summary['calls']} & ${summary['total_cost_usd']:.6f} \\\\")
         
         pdf_idx = 1
         for cost_file in cost_files:
@@ -194,7 +360,7 @@ Considering all above and the current state of the art in the article area, give
         total_calls = summary['calls']
         
         # Add full text analysis row
-        rows.append(f"        \\texttt{{Full Text Analysis}} & {summary['prompt_tokens']:,} & {summary['completion_tokens']:,} & {summary['total_tokens']:,} & {summary['calls']:,} \\\\")
+        rows.append(f"        \\texttt{{{self._aggregate_label}}} & {summary['prompt_tokens']:,} & {summary['completion_tokens']:,} & {summary['total_tokens']:,} & {summary['calls']:,} \\\\")
         
         pdf_idx = 1
         for cost_file in cost_files:
@@ -258,8 +424,21 @@ Considering all above and the current state of the art in the article area, give
 
         pdf_files = sorted(list(self.source_folder.glob("*.pdf")))
         all_results = {} # {pdf_name: {category: note}}
-        
+
+        # Incremental corpus mode (see corpus_manifest.py): unchanged PDFs reuse
+        # their recorded notes and per-PDF files instead of being re-analyzed.
+        manifest = CorpusManifest(results_base, "method2") if self.incremental else None
+        fingerprint = self._fingerprint()
+        self._reused = []
+
         for pdf_path in pdf_files:
+            if manifest is not None:
+                entry = manifest.reuse(pdf_path, fingerprint, self._run_dir)
+                if entry is not None:
+                    print(Fore.CYAN + f"\nReusing the results of unchanged {pdf_path.name}." + Style.RESET_ALL)
+                    self._reused.append(pdf_path.name)
+                    all_results[pdf_path.stem] = entry.get("extra", {}).get("notes", {})
+                    continue
             print(Fore.BLUE + f"\nProcessing {pdf_path.name}..." + Style.RESET_ALL)
             # Record call_records index before this PDF
             start_idx = len(self.llm_analyzer.call_records)
@@ -277,10 +456,23 @@ Considering all above and the current state of the art in the article area, give
                 return cat, note, resp
 
             with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-                futures = [executor.submit(process_cat, (cat, kws)) for cat, kws in self.categories.items()]
-                for future in futures:
-                    cat, note, resp = future.result()
-                    pdf_results[cat] = note
+                if self.multi_category:
+                    groups = self._category_groups(pdf_text)
+                    print(
+                        Fore.CYAN
+                        + f"  {len(self.categories)} categories in {len(groups)} request group(s)."
+                        + Style.RESET_ALL
+                    )
+                    futures = [executor.submit(self.analyze_categories, pdf_text, names) for names in groups]
+                    analyzed = {}
+                    for future in futures:
+                        analyzed.update(future.result())
+                    pdf_results = {cat: analyzed[cat][1] for cat in self.categories}
+                else:
+                    futures = [executor.submit(process_cat, (cat, kws)) for cat, kws in self.categories.items()]
+                    for future in futures:
+                        cat, note, resp = future.result()
+                        pdf_results[cat] = note
             
             all_results[pdf_path.stem] = pdf_results
 
@@ -299,6 +491,9 @@ Considering all above and the current state of the art in the article area, give
                     records=pdf_records,
                     method="full_text",
                 )
+            if manifest is not None:
+                manifest.record(pdf_path, fingerprint, self._run_dir, extra={"notes": pdf_results})
+                manifest.save()
             
         self.generate_latex_tables(all_results)
         self.generate_cost_table()
@@ -307,6 +502,14 @@ Considering all above and the current state of the art in the article area, give
         # Save cost summary
         cost_file = self._run_dir / "2_full_text_analysis_cost.txt"
         self.llm_analyzer.print_usage_summary(str(cost_file))
+        if self._reused:
+            # The summary counts this run's calls; the reused PDFs' costs are
+            # in their own *_2_cost.txt files, linked from earlier runs.
+            with open(cost_file, "a", encoding="utf-8") as f:
+                f.write(
+                    f"\nThis run only: {len(self._reused)} unchanged PDF(s) reused from earlier runs "
+                    f"are not included (see their *_2_cost.txt files).\n"
+                )
 
         # -- STATISTICS_SPEC v1.3 — R8 (per-run summary JSON) --
         self.llm_analyzer.write_summary_json(
@@ -349,13 +552,58 @@ if __name__ == "__main__":
         "--max-workers", type=int, default=3, dest="max_workers",
         help="Max concurrent category threads (default: 3). Use 1 for sequential with local provider.",
     )
+    parser.add_argument(
+        "--llm-cache", default=None, dest="llm_cache", metavar="PATH",
+        help="Opt-in SQLite file caching LLM replies; identical requests are replayed at zero cost.",
+    )
+    parser.add_argument(
+        "--incremental", action="store_true",
+        help="Only analyze PDFs that are new or changed since an earlier --incremental run "
+             "(or whose keywords, prompt, model or sampling options changed); tables still cover every PDF.",
+    )
+    parser.add_argument(
+        "--map-reduce", action="store_true", dest="map_reduce",
+        help="Analyze papers longer than --chunk-tokens chunk by chunk and combine the results "
+             "(over-length prompts are always chunked).",
+    )
+    parser.add_argument(
+        "--chunk-tokens", type=int, default=DEFAULT_CHUNK_TOKENS, dest="chunk_tokens",
+        help=f"Chunk size in tokens with --map-reduce (default: {DEFAULT_CHUNK_TOKENS}).",
+    )
+    parser.add_argument(
+        "--context-tokens", type=int, default=None, dest="context_tokens",
+        help="Override the model context window used to size prompts (e.g. the --ctx-size of a local server).",
+    )
+    parser.add_argument(
+        "--chunk-cache", default=None, dest="chunk_cache", metavar="PATH",
+        help="SQLite file caching per-chunk results (default: <source>/Results/method2_chunk_cache.sqlite).",
+    )
+    parser.add_argument(
+        "--multi-category", action="store_true", dest="multi_category",
+        help="Ask for several categories per request (JSON reply), packed to fit the context window; "
+             "unreadable categories fall back to one request each.",
+    )
+    parser.add_argument(
+        "--categories-per-request", type=int, default=None, dest="categories_per_request", metavar="N",
+        help="With --multi-category, put at most N categories in one request (default: as many as fit).",
+    )
     
     args = parser.parse_args()
+    if args.chunk_tokens < 500:
+        parser.error("--chunk-tokens must be at least 500.")
+    if args.context_tokens is not None and args.context_tokens < COMPLETION_RESERVE + 2000:
+        parser.error(f"--context-tokens must be at least {COMPLETION_RESERVE + 2000}.")
+    if args.categories_per_request is not None and args.categories_per_request < 1:
+        parser.error("--categories-per-request must be at least 1.")
     
     analyzer = FullPDFAnalyzer(
         args.source, args.keywords, args.source,
         provider=args.provider, local_url=args.local_url,
         model_name=args.model, temperature=args.temperature, top_p=args.top_p,
-        max_workers=args.max_workers,
+        max_workers=args.max_workers, llm_cache=args.llm_cache,
+        incremental=args.incremental,
+        map_reduce=args.map_reduce, chunk_tokens=args.chunk_tokens,
+        context_tokens=args.context_tokens, chunk_cache=args.chunk_cache,
+        multi_category=args.multi_category, categories_per_request=args.categories_per_request,
     )
     analyzer.run()
\ No newline at end of file
@@ -0,0 +1,312 @@
+"""Global work-stealing scheduler for Method 1 (``--scheduler global``).
+
+``run_pipeline_parallel`` pins one PDF per process and, inside a PDF, drains
+one thread pool per category before starting the next, so one large PDF or
+one large category leaves the other workers idle. This scheduler removes
+those barriers: every occurrence task of every PDF and category in the
+batch goes into one queue, consumed by one fixed fleet of worker threads.
+
+Layout (all in the calling process except the extraction pool):
+    * **Extraction pool** — ``ProcessPoolExecutor(num_processes)`` runs the
+      CPU-bound ``main.read_pdf`` per PDF. As each text arrives, the
+      coordinator runs :func:`parallel.prepare_pdf_v2` (keyword search,
+      per-PDF ``LLMAnalyzer``) and enqueues that PDF's occurrence tasks.
+    * **Worker fleet** — one ``ThreadPoolExecutor(fleet_size)``. Its FIFO
+      work queue is the global queue: an idle worker always takes the next
+      task, whatever PDF or category it belongs to.
+    * **Finalizers** — when the last task of a PDF completes, its significant
+      files are written and :func:`parallel.finish_pdf_v2` (final category
+      analysis, results, cost file, summaries) is submitted to a small
+      finalizer pool, overlapping with the filtering of the other PDFs.
+
+Per-PDF outputs, prompts, context and paragraph dedup (one
+:class:`parallel.SharedAccumulator` and one
+:class:`occurrence_dedup.ContextDedup` per PDF) and cost accounting (one
+``LLMAnalyzer`` per PDF) are the same as in ``run_pipeline_parallel``.
+"""
+
+from __future__ import annotations
+
+import concurrent.futures
+import logging
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from time import monotonic
+from typing import List
+
+from colorama import Fore, Style
+from tqdm import tqdm
+
+from occurrence_dedup import ContextDedup
+from parallel import (
+    Occurrence,
+    PdfRun,
+    SharedAccumulator,
+    _evaluate_occurrence_batch,
+    _dedup_pending,
+    _evaluate_one_occurrence,
+    _print_pipeline_summary,
+    _replay_journal,
+    _share_verdict,
+    _write_significant_files,
+    finish_pdf_v2,
+    prepare_pdf_v2,
+)
+
+
+@dataclass
+class _PdfState:
+    """Progress of one PDF through the global queue."""
+    run: PdfRun
+    accumulator: SharedAccumulator
+    remaining: int
+    dedup: ContextDedup = field(default_factory=ContextDedup)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    finished: threading.Event = field(default_factory=threading.Event)
+
+
+def _extract_pdf_text(pdf_path: str, extract_workers: int = 1) -> str:
+    """Picklable extraction-pool entry point."""
+    from main import read_pdf
+
+    return read_pdf(Path(pdf_path), extract_workers)
+
+
+class _GlobalScheduler:
+    def __init__(
+        self,
+        fleet_size: int,
+        finalizers: int,
+        min_representative_matches: int,
+        log_level: str,
+        batch_size: int,
+    ) -> None:
+        self.min_representative_matches = min_representative_matches
+        self.log_level = log_level
+        self.batch_size = batch_size
+        self.fleet = concurrent.futures.ThreadPoolExecutor(
+            max_workers=fleet_size, thread_name_prefix="occ"
+        )
+        self.finalizer_pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=finalizers, thread_name_prefix="finish"
+        )
+        self.states: List[_PdfState] = []
+        self._progress_lock = threading.Lock()
+        self.progress = (
+            tqdm(total=0, desc="occurrences", unit="occ")
+            if log_level != "quiet"
+            else None
+        )
+
+    # -- producer side --------------------------------------------------------
+
+    def enqueue(self, run: PdfRun) -> None:
+        """Push every occurrence task of *run* onto the global queue."""
+        step = max(1, self.batch_size)
+        state = _PdfState(
+            run=run,
+            accumulator=SharedAccumulator(run.enabler_occurrences.keys()),
+            remaining=0,
+        )
+        # Occurrences already decided in the run journal, or rejected by the
+        # pre-filter, are settled here and never reach the queue, nor do
+        # duplicates of a queued context.
+        pending = _replay_journal(run.journal, run.prefilter, run.enabler_occurrences, state.accumulator)
+        pending = _dedup_pending(state.dedup, pending, run.pdf_text, run.sentence_index)
+        chunks = [
+            (enabler, occurrences[start:start + step])
+            for enabler, occurrences in pending.items()
+            for start in range(0, len(occurrences), step)
+        ]
+        state.remaining = len(chunks)
+        self.states.append(state)
+        if self.progress is not None:
+            with self._progress_lock:
+                self.progress.total += sum(len(chunk) for _enabler, chunk in chunks)
+                self.progress.refresh()
+        if not chunks:
+            self.finalizer_pool.submit(self._finalize, state)
+            return
+        for enabler, chunk in chunks:
+            self.fleet.submit(self._run_task, state, enabler, chunk)
+
+    # -- worker side ----------------------------------------------------------
+
+    def _run_task(self, state: _PdfState, enabler: str, chunk: List[Occurrence]) -> None:
+        run = state.run
+        try:
+            if self.batch_size > 1:
+                results = _evaluate_occurrence_batch(
+                    run.llm_analyzer, enabler, chunk, run.pdf_text,
+                    run.keyword_occurrence_prompt, run.effective_model,
+                    run.sentence_index, None, run.journal,
+                )
+            else:
+                page_num, keyword, paragraph, abs_start = chunk[0]
+                results = [_evaluate_one_occurrence(
+                    run.llm_analyzer, enabler, page_num, keyword, paragraph,
+                    run.pdf_text, abs_start, run.keyword_occurrence_prompt,
+                    run.effective_model, run.sentence_index, None, run.journal,
+                )]
+            for occurrence, item in zip(chunk, results):
+                if item is not None:
+                    page_num, keyword, paragraph = item
+                    state.accumulator.record_significant(enabler, page_num, keyword, paragraph)
+                _share_verdict(state.dedup, run.journal, state.accumulator, enabler, occurrence, item)
+        except Exception as exc:  # pragma: no cover - defensive
+            logging.debug("Task raised in global scheduler: %s", exc)
+        finally:
+            if self.progress is not None:
+                with self._progress_lock:
+                    self.progress.update(len(chunk))
+            with state.lock:
+                state.remaining -= 1
+                done = state.remaining == 0
+            if done:
+                self.finalizer_pool.submit(self._finalize, state)
+
+    def _finalize(self, state: _PdfState) -> None:
+        run = state.run
+        try:
+            if self.log_level == "verbose":
+                counts = state.accumulator.counts()
+                for category_index, (enabler, occurrences) in enumerate(
+                    run.enabler_occurrences.items(), start=1
+                ):
+                    if occurrences:
+                        print(
+                            Fore.CYAN
+                            + f"  [{run.pdf_path.stem} cat{category_index}] "
+                            + f"{counts.get(enabler, 0)}/{len(occurrences)} significant"
+                            + Style.RESET_ALL
+                        )
+            filtered = state.accumulator.snapshot_filtered()
+            _write_significant_files(state.accumulator, run.significant_files)
+            finish_pdf_v2(run, filtered, self.min_representative_matches)
+            if run.journal is not None:
+                run.journal.mark_finished()
+        except Exception as exc:
+            print(
+                Fore.RED
+                + f"Finalization for {run.pdf_path} raised: {exc!r}"
+                + Style.RESET_ALL
+            )
+        finally:
+            state.finished.set()
+
+    def wait(self) -> None:
+        for state in self.states:
+            state.finished.wait()
+        self.fleet.shutdown(wait=True)
+        self.finalizer_pool.shutdown(wait=True)
+        if self.progress is not None:
+            self.progress.close()
+
+
+def run_pipeline_global(
+    files,
+    keywords_path,
+    max_workers: int = 5,
+    num_processes: int = 2,
+    min_representative_matches: int = 1,
+    model_name = "random",
+    log_level: str = "normal",
+    profile: bool = False,
+    temperature: float = 1.0,
+    top_p: float = 1.0,
+    output_dir = None,
+    provider: str = "openrouter",
+    local_url: str | None = None,
+    llm_cache: str | None = None,
+    batch_size: int = 1,
+    rate_limit_rpm: float | None = None,
+    extract_workers: int = 1,
+    journal_path: str | None = None,
+    prefilter=None,
+    cascade=None,
+) -> None:
+    """Run Method 1 over *files* with one global occurrence queue.
+
+    Takes the same arguments as :func:`parallel.run_pipeline_parallel`.
+    The fleet has ``max_workers * num_processes`` threads (the same total
+    LLM concurrency as the per-PDF layout), ``num_processes`` processes
+    extract text and ``num_processes`` threads run the per-PDF
+    finalization.
+    """
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
+    if not files:
+        print(Fore.YELLOW + "run_pipeline_global: no files provided." + Style.RESET_ALL)
+        return
+
+    start = monotonic()
+    M = max(1, min(num_processes, len(files)))
+    fleet_size = max(1, max_workers * num_processes)
+
+    rate_limiter = None
+    if rate_limit_rpm is not None:
+        from rate_limiter import AdaptiveRateLimiter
+        rate_limiter = AdaptiveRateLimiter(initial_rpm=rate_limit_rpm)
+
+    scheduler = _GlobalScheduler(
+        fleet_size=fleet_size,
+        finalizers=M,
+        min_representative_matches=min_representative_matches,
+        log_level=log_level,
+        batch_size=batch_size,
+    )
+
+    extractor_cls = (
+        concurrent.futures.ProcessPoolExecutor
+        if M > 1
+        else concurrent.futures.ThreadPoolExecutor
+    )
+    with extractor_cls(max_workers=M) as extractor:
+        futures = {
+            extractor.submit(_extract_pdf_text, str(pdf_path), extract_workers): pdf_path
+            for pdf_path in files
+        }
+        # Enqueue each PDF as soon as its text is available so the fleet
+        # starts on the first document while the others are still parsed.
+        for fut in concurrent.futures.as_completed(futures):
+            pdf_path = futures[fut]
+            try:
+                run = prepare_pdf_v2(
+                    pdf_path,
+                    keywords_path,
+                    model_name=model_name,
+                    temperature=temperature,
+                    top_p=top_p,
+                    output_dir=output_dir,
+                    provider=provider,
+                    local_url=local_url,
+                    llm_cache=llm_cache,
+                    rate_limiter=rate_limiter,
+                    pdf_text=fut.result(),
+                    journal_path=journal_path,
+                    prefilter=prefilter,
+                    cascade=cascade,
+                )
+            except Exception as exc:
+                # Same policy as run_pipeline_parallel: one bad PDF must
+                # not kill the batch.
+                print(
+                    Fore.RED
+                    + f"Preparing {pdf_path} raised: {exc!r}"
+                    + Style.RESET_ALL
+                )
+                continue
+            scheduler.enqueue(run)
+
+    scheduler.wait()
+
+    _print_pipeline_summary(
+        files,
+        output_dir,
+        f"GLOBAL SCHEDULER SUMMARY ({len(files)} PDF(s), fleet={fleet_size}, extractors={M})",
+        rate_limiter.snapshot() if rate_limiter is not None else {},
+        monotonic() - start if profile else None,
+    )
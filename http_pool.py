@@ -0,0 +1,187 @@
+"""HTTP connection pooling for the LLM clients (``llm_query.LLMAnalyzer``).
+
+With ``--max-workers`` up to 50 threads (or hundreds of coroutines with
+``--async-llm``) sharing one ``OpenAI`` client, httpx's default pool keeps
+only 20 idle connections alive, so bursts open and tear down TLS
+connections, and requests beyond ``max_connections`` wait inside the client
+for a free connection. The chat clients are therefore built on an explicit
+pool, and the generation-stats lookups reuse one ``requests.Session``
+instead of a new connection per ``requests.get``.
+
+Settings come from the environment (``.env``):
+
+* ``LLM_HTTP_MAX_CONNECTIONS`` (100): open connections per client;
+* ``LLM_HTTP_MAX_KEEPALIVE`` (100): idle connections kept for reuse;
+* ``LLM_HTTP_KEEPALIVE_EXPIRY`` (60): seconds an idle connection is kept;
+* ``LLM_HTTP2`` (off): multiplex requests over HTTP/2 (needs the ``h2`` package).
+
+**Pool wait.** Every request is traced with httpcore's ``trace`` extension.
+The time from handing a request to the pool until its first connection
+event (connect, or sending headers on a reused connection) is time spent
+queued in the client. :class:`PoolWaitMeter` collects it for the requests
+sent by one thread or task. ``LLMAnalyzer`` subtracts it from
+``CallRecord.latency_s`` and stores it as ``CallRecord.pool_wait_s``.
+
+Without ``httpx`` (it normally comes with ``openai``) the OpenAI default
+client is used and no pool wait is measured.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import requests
+from colorama import Fore, Style
+from requests.adapters import HTTPAdapter
+
+try:
+    import httpx
+    from openai import DefaultAsyncHttpxClient, DefaultHttpxClient
+except ImportError:  # pragma: no cover - depends on the installed openai
+    httpx = None
+
+_pool_waits: ContextVar[Optional[List[float]]] = ContextVar("llm_pool_waits", default=None)
+_http2_warned = False
+
+
+@dataclass(frozen=True)
+class PoolSettings:
+    """Connection-pool limits shared by the chat clients and the stats session."""
+    max_connections: int = 100
+    max_keepalive: int = 100
+    keepalive_expiry: float = 60.0
+    http2: bool = False
+
+    @classmethod
+    def from_env(cls) -> "PoolSettings":
+        """Read the ``LLM_HTTP_*`` variables (defaults for unset or invalid ones)."""
+        defaults = cls()
+        return cls(
+            max_connections=_env_number("LLM_HTTP_MAX_CONNECTIONS", defaults.max_connections, int),
+            max_keepalive=_env_number("LLM_HTTP_MAX_KEEPALIVE", defaults.max_keepalive, int),
+            keepalive_expiry=_env_number("LLM_HTTP_KEEPALIVE_EXPIRY", defaults.keepalive_expiry, float),
+            http2=os.getenv("LLM_HTTP2", "off").lower() in ("1", "on", "true", "yes"),
+        )
+
+    def limits(self):
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=min(self.max_keepalive, self.max_connections),
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+
+def _env_number(name: str, default, kind):
+    try:
+        value = kind(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+    return value if value > 0 else default
+
+
+def http2_enabled(settings: PoolSettings) -> bool:
+    """True when HTTP/2 is requested and the ``h2`` package is installed."""
+    global _http2_warned
+    if not settings.http2:
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        if not _http2_warned:
+            _http2_warned = True
+            print(
+                Fore.YELLOW
+                + "Warning: LLM_HTTP2 is set but the 'h2' package is not installed; using HTTP/1.1."
+                + Style.RESET_ALL
+            )
+        return False
+    return True
+
+
+def sync_http_client(settings: PoolSettings):
+    """``http_client`` for ``OpenAI(...)``, or None to keep the OpenAI default."""
+    if httpx is None:
+        return None
+    return DefaultHttpxClient(
+        limits=settings.limits(),
+        http2=http2_enabled(settings),
+        event_hooks={"request": [_trace_pool_wait]},
+    )
+
+
+def async_http_client(settings: PoolSettings):
+    """``http_client`` for ``AsyncOpenAI(...)``, or None to keep the OpenAI default."""
+    if httpx is None:
+        return None
+    return DefaultAsyncHttpxClient(
+        limits=settings.limits(),
+        http2=http2_enabled(settings),
+        event_hooks={"request": [_atrace_pool_wait]},
+    )
+
+
+def pooled_session(settings: PoolSettings) -> requests.Session:
+    """A ``requests.Session`` keeping up to ``max_keepalive`` connections per host."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=min(settings.max_keepalive, settings.max_connections))
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class PoolWaitMeter:
+    """Collect the pool wait of the requests sent inside ``with`` (per thread or task)."""
+
+    def __enter__(self) -> "PoolWaitMeter":
+        self.waits: List[float] = []
+        self._token = _pool_waits.set(self.waits)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        _pool_waits.reset(self._token)
+
+    def split(self, elapsed: float) -> Tuple[float, Optional[float]]:
+        """Split *elapsed* into ``(latency without pool wait, pool wait or None)``.
+
+        Retried requests add up. None means no request was traced.
+        """
+        if not self.waits:
+            return elapsed, None
+        waited = min(sum(self.waits), elapsed)
+        return elapsed - waited, waited
+
+
+def _pool_wait_tracer(request):
+    """Start timing *request*; return a callback recording the wait at its first event."""
+    waits = _pool_waits.get()
+    if waits is None:
+        return None
+    queued_at = time.perf_counter()
+    acquired = False
+
+    def record() -> None:
+        nonlocal acquired
+        if not acquired:
+            acquired = True
+            waits.append(time.perf_counter() - queued_at)
+
+    return record
+
+
+def _trace_pool_wait(request) -> None:
+    record = _pool_wait_tracer(request)
+    if record is not None:
+        request.extensions["trace"] = lambda event_name, info: record()
+
+
+async def _atrace_pool_wait(request) -> None:
+    record = _pool_wait_tracer(request)
+    if record is not None:
+        async def trace(event_name: str, info: dict) -> None:
+            record()
+
+        request.extensions["trace"] = trace
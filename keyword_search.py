@@ -1,9 +1,207 @@
 import re
-from collections import Counter
+from bisect import bisect_right
+from collections import Counter, defaultdict
+
+PAGE_HEADER_PATTERN = re.compile(r'^Page (\d+):\n', re.MULTILINE)
+
+
+class SentenceIndex:
+    """Sorted sentence-boundary offsets of one document, queried by binary search.
+
+    Boundaries follow the sentence regex of ``KeywordSearcher._iter_sentences``:
+    a sentence ends right after ``.``, ``!`` or ``?`` or at the end of the
+    text. Build it once per extracted document; every lookup is then
+    O(log n) instead of re-splitting the text. Lookups may be clipped to a
+    ``[lo, hi)`` sub-range (e.g. one page) and return exactly what splitting
+    that slice on its own would.
+    """
+
+    _TERMINATOR_PATTERN = re.compile(r'[.!?]')
+
+    def __init__(self, text):
+        self.text = text
+        bounds = [0]
+        bounds.extend(match.end() for match in self._TERMINATOR_PATTERN.finditer(text))
+        if bounds[-1] != len(text):
+            bounds.append(len(text))
+        self._bounds = bounds
+
+    def __len__(self):
+        return len(self._bounds) - 1
+
+    def _ends_with_terminator(self):
+        return bool(self.text) and self.text[-1] in ".!?"
+
+    @property
+    def settled_end(self):
+        """Offset of the last sentence terminator (0 if none).
+
+        Sentences ending at or before this offset can no longer change
+        when more text is appended with :meth:`extend`.
+        """
+        if self._ends_with_terminator() or len(self._bounds) < 2:
+            return self._bounds[-1]
+        return self._bounds[-2]
+
+    def extend(self, more):
+        """Append *more* to the indexed text (streaming extraction).
+
+        The result is the same index as building one over the full text;
+        only the trailing unterminated sentence can grow.
+        """
+        if not more:
+            return
+        offset = len(self.text)
+        if len(self._bounds) > 1 and not self._ends_with_terminator():
+            self._bounds.pop()
+        self.text += more
+        self._bounds.extend(offset + match.end() for match in self._TERMINATOR_PATTERN.finditer(more))
+        if self._bounds[-1] != len(self.text):
+            self._bounds.append(len(self.text))
+
+    def context_settled(self, pos):
+        """Return True once the extended context around *pos* is final.
+
+        That is the sentence containing *pos* and the next non-blank one
+        (the previous one is already fixed) both end at or before
+        :attr:`settled_end`, so appending more text cannot change them.
+        """
+        index = self.locate(pos)
+        if index is None:
+            return False
+        settled_end = self.settled_end
+        for other in range(index + 1, len(self)):
+            if self._bounds[other + 1] > settled_end:
+                return False
+            if self.sentence(other)[0]:
+                return True
+        return False
+
+    def locate(self, pos):
+        """Return the index of the sentence containing *pos*, or None."""
+        if not 0 <= pos < len(self.text):
+            return None
+        return bisect_right(self._bounds, pos) - 1
+
+    def sentence(self, index, lo=0, hi=None):
+        """Return ``(stripped_sentence, start, end)`` for sentence *index* clipped to ``[lo, hi)``."""
+        hi = len(self.text) if hi is None else hi
+        start = max(lo, self._bounds[index])
+        end = min(hi, self._bounds[index + 1])
+        return self.text[start:end].strip(), start, end
+
+    def sentence_at(self, pos, lo=0, hi=None):
+        """Return the stripped sentence containing *pos* within ``[lo, hi)``, or None."""
+        hi = len(self.text) if hi is None else hi
+        if not lo <= pos < hi:
+            return None
+        sentence, _start, _end = self.sentence(self.locate(pos), lo, hi)
+        return sentence or None
+
+    def previous_sentence(self, index):
+        """Return the nearest non-blank sentence before *index*, or None."""
+        for other in range(index - 1, -1, -1):
+            sentence = self.sentence(other)[0]
+            if sentence:
+                return sentence
+        return None
+
+    def next_sentence(self, index):
+        """Return the nearest non-blank sentence after *index*, or None."""
+        for other in range(index + 1, len(self)):
+            sentence = self.sentence(other)[0]
+            if sentence:
+                return sentence
+        return None
+
 
 class KeywordSearcher:
     def __init__(self, enabler_keywords):
         self.enabler_keywords = enabler_keywords
+        (
+            self._keyword_pattern,
+            self._keyword_entries,
+            self._key_spellings,
+            self._prefix_keys,
+        ) = self._compile_keywords(enabler_keywords)
+
+    @staticmethod
+    def _compile_keywords(enabler_keywords):
+        """Build one case-insensitive alternation for every keyword of every enabler.
+
+        Keywords are grouped by their case-folded form so a keyword shared by
+        several enablers (or repeated in one list) is matched once and fanned
+        out to each ``(enabler, keyword, list index)`` entry afterwards. The
+        alternation holds the original spellings: ``str.lower`` and
+        ``casefold`` may change a keyword's length (e.g. "İstanbul"), which
+        ``re.IGNORECASE`` never does, so only the spellings match like
+        ``\\b{keyword}\\b`` would.
+        """
+        entries = defaultdict(list)
+        spellings = defaultdict(list)
+        for enabler, keywords in enabler_keywords.items():
+            for index, keyword in enumerate(keywords):
+                if keyword:
+                    key = keyword.casefold()
+                    entries[key].append((enabler, keyword, index))
+                    if keyword not in spellings[key]:
+                        spellings[key].append(keyword)
+
+        if not entries:
+            return None, {}, {}, {}
+
+        # Longest alternatives first, so the lookahead reports the longest
+        # keyword starting at each position; shorter keywords starting at the
+        # same position are necessarily prefixes of it (see ``_prefix_keys``).
+        alternatives = sorted(
+            (spelling for key_spellings in spellings.values() for spelling in key_spellings),
+            key=lambda spelling: (-len(spelling), spelling),
+        )
+        alternation = "|".join(re.escape(spelling) for spelling in alternatives)
+        # Zero-width lookahead: finditer advances one character at a time, so
+        # overlapping hits of different keywords are all visited.
+        pattern = re.compile(rf"\b(?=(?P<kw>{alternation})\b)", re.IGNORECASE)
+
+        # Case-insensitive prefixes: plain ``startswith`` between ASCII keys,
+        # a match of the spellings otherwise (they may differ in length).
+        ascii_keys = {key for key, key_spellings in spellings.items() if all(map(str.isascii, key_spellings))}
+
+        def spelled_prefix(other, key):
+            return any(
+                re.match(re.escape(other_spelling), spelling, re.IGNORECASE)
+                for other_spelling in spellings[other]
+                for spelling in spellings[key]
+            )
+
+        prefix_keys = {}
+        for key in entries:
+            if key in ascii_keys:
+                others = [
+                    other for other in entries
+                    if other != key and (key.startswith(other) if other in ascii_keys else spelled_prefix(other, key))
+                ]
+            else:
+                others = [other for other in entries if other != key and spelled_prefix(other, key)]
+            prefix_keys[key] = [(other, KeywordSearcher.spellings_pattern(spellings[other])) for other in others]
+        return pattern, dict(entries), dict(spellings), prefix_keys
+
+    @staticmethod
+    def spellings_pattern(spellings):
+        """Return ``\\b(?:spelling|...)\\b``, case-insensitive, for one keyword key."""
+        return re.compile(rf"\b(?:{'|'.join(re.escape(spelling) for spelling in spellings)})\b", re.IGNORECASE)
+
+    @staticmethod
+    def _iter_pages(text):
+        """Yield ``(page_num, content_start, content)`` for every "Page N:" section."""
+        page_matches = list(PAGE_HEADER_PATTERN.finditer(text))
+        for i, match in enumerate(page_matches):
+            page_content_start = match.end()
+            # Determine where this page's content ends (start of next page or EOF)
+            if i + 1 < len(page_matches):
+                page_content_end = page_matches[i + 1].start()
+            else:
+                page_content_end = len(text)
+            yield int(match.group(1)), page_content_start, text[page_content_start:page_content_end]
 
     @staticmethod
     def _iter_sentences(content):
@@ -22,48 +220,92 @@ class KeywordSearcher:
 
     @staticmethod
     def find_occurrences_without_references(text, keywords):
-        results = []
-        # Use regex to find actual page headers: "Page N:\n" at start of line
-        page_pattern = re.compile(r'^Page (\d+):\n', re.MULTILINE)
-        
-        # Find all page header positions
-        page_matches = list(page_pattern.finditer(text))
-        
-        if not page_matches:
-            print("Warning: No page headers found in text.")
-            return results
+        return KeywordSearcher({None: list(keywords)}).check_enabler_occurrences(text)[None]
 
-        for i, match in enumerate(page_matches):
-            page_num = int(match.group(1))
-            page_content_start = match.end()
-            
-            # Determine where this page's content ends (start of next page or EOF)
-            if i + 1 < len(page_matches):
-                page_content_end = page_matches[i + 1].start()
-            else:
-                page_content_end = len(text)
-            
-            content = text[page_content_start:page_content_end]
+    def _resolve_key(self, matched_text):
+        """Map the matched text back to its keyword key (case-folded form)."""
+        key = matched_text.casefold()
+        if key in self._keyword_entries:
+            return key
+        # Unicode case folding can make the match differ from ``str.casefold``
+        # of a spelling (e.g. "istanbul" for "İstanbul").
+        for candidate, spellings in self._key_spellings.items():
+            if any(re.fullmatch(re.escape(spelling), matched_text, re.IGNORECASE) for spelling in spellings):
+                return candidate
+        return key
 
-            for keyword in keywords:
-                keyword_pattern = re.compile(rf"\b{re.escape(keyword)}\b", re.IGNORECASE)
-                for kw_match in keyword_pattern.finditer(content):
-                    start_idx = kw_match.start()
-                    end_idx = kw_match.end()
-                    context = KeywordSearcher.extract_context(content, start_idx, end_idx)
-                    absolute_start_idx = page_content_start + start_idx
-                    results.append((page_num, keyword, context, absolute_start_idx))
+    def _page_hits(self, content):
+        """Return ``(enabler, keyword, keyword_index, start_idx)`` for every hit in one page."""
+        hits = []
+        if self._keyword_pattern is None:
+            return hits
 
-        return results
+        next_free = {}
+        for match in self._keyword_pattern.finditer(content):
+            start_idx = match.start()
+            longest = self._resolve_key(match.group("kw"))
+            candidates = [(longest, match.end("kw"))]
+            for key, key_pattern in self._prefix_keys[longest]:
+                key_match = key_pattern.match(content, start_idx)
+                if key_match:
+                    candidates.append((key, key_match.end()))
+            for key, end_idx in candidates:
+                # Hits of one keyword never overlap, as with re.finditer.
+                if start_idx < next_free.get(key, 0):
+                    continue
+                next_free[key] = end_idx
+                for enabler, keyword, index in self._keyword_entries[key]:
+                    hits.append((enabler, keyword, index, start_idx))
+        return hits
 
-    def check_enabler_occurrences(self, pdf_text):
+    def iter_keyword_hits(self, text):
+        """Scan *text* once and yield ``(enabler, keyword, page_num, absolute_offset)``.
+
+        Matching is case-insensitive with ``\\b`` word boundaries on both
+        sides and each page is matched in isolation, exactly like running
+        ``\\b{keyword}\\b`` for every keyword over every page.
+        """
+        for page_num, page_content_start, content in self._iter_pages(text):
+            for enabler, keyword, _index, start_idx in self._page_hits(content):
+                yield enabler, keyword, page_num, page_content_start + start_idx
+
+    def check_enabler_occurrences(self, pdf_text, sentence_index=None):
         enabler_occurrences = {enabler: [] for enabler in self.enabler_keywords.keys()}
 
-        for enabler, keywords in self.enabler_keywords.items():
-            enabler_occurrences[enabler] = self.find_occurrences_without_references(pdf_text, keywords)
+        if not PAGE_HEADER_PATTERN.search(pdf_text):
+            print("Warning: No page headers found in text.")
+            return enabler_occurrences
+
+        if sentence_index is None:
+            sentence_index = SentenceIndex(pdf_text)
+
+        for enabler, occurrence in self.iter_page_occurrences(pdf_text, sentence_index):
+            enabler_occurrences[enabler].append(occurrence)
 
         return enabler_occurrences
 
+    def iter_page_occurrences(self, text, sentence_index, offset=0):
+        """Yield ``(enabler, (page, keyword, context, abs_start))`` for the pages in *text*.
+
+        Pages come in order; within a page, hits are ordered by keyword list
+        position, then offset (the order of ``check_enabler_occurrences``).
+        *text* may be the tail of a longer document starting at *offset*,
+        as long as it starts with a page header and *sentence_index* covers
+        it (streaming extraction appends one page at a time).
+        """
+        for page_num, page_content_start, content in self._iter_pages(text):
+            page_content_start += offset
+            # Keep the historical order: page, then keyword list order, then offset.
+            page_hits = sorted(self._page_hits(content), key=lambda hit: (hit[2], hit[3]))
+            page_content_end = page_content_start + len(content)
+            for enabler, keyword, _index, start_idx in page_hits:
+                absolute_start_idx = page_content_start + start_idx
+                # Same result as extract_context(content, ...) on the page slice.
+                context = sentence_index.sentence_at(
+                    absolute_start_idx, page_content_start, page_content_end
+                ) or content[start_idx:start_idx + len(keyword)].strip()
+                yield enabler, (page_num, keyword, context, absolute_start_idx)
+
     def classify_keywords(self, enabler_occurrences):
         classified_keywords = {enabler: Counter() for enabler in self.enabler_keywords.keys()}
 
@@ -0,0 +1,128 @@
+"""Opt-in persistent cache of LLM chat-completion replies (SQLite).
+
+``LLMAnalyzer._complete`` consults this cache before calling the provider.
+The key covers everything that determines the request: provider, model,
+temperature, top_p, system message and user message. A hit replays the stored
+reply and is recorded as a zero-cost ``CallRecord`` with ``source="cache"``.
+
+One SQLite file can be shared by the threads of a process and by the worker
+processes of ``run_pipeline_parallel``: each thread opens its own connection
+lazily (connections are neither fork- nor thread-safe), the database runs in
+WAL mode and writers wait on SQLite's busy timeout.
+
+Replies are replayed regardless of sampling randomness, so the cache is most
+useful with ``--temperature 0`` runs; with higher temperatures a re-run
+returns the first sample drawn for each prompt.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    provider TEXT NOT NULL,
+    model TEXT NOT NULL,
+    reply TEXT NOT NULL,
+    model_version TEXT,
+    prompt_tokens INTEGER NOT NULL,
+    completion_tokens INTEGER NOT NULL,
+    cost_usd REAL NOT NULL,
+    created_at REAL NOT NULL,
+    confidence REAL
+)
+"""
+
+
+@dataclass
+class CachedResponse:
+    """A stored reply plus the billing data of the call that produced it."""
+    reply: str
+    model_version: str | None
+    prompt_tokens: int
+    completion_tokens: int
+    cost_usd: float
+    confidence: float | None = None  # reply probability, kept for --cascade
+
+
+class ResponseCache:
+    """SQLite-backed map from request key to :class:`CachedResponse`."""
+
+    def __init__(self, path: str, timeout: float = 30.0) -> None:
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        conn = self._connect()
+        conn.executescript(_SCHEMA)
+        # Caches written before the confidence column existed.
+        if "confidence" not in {row[1] for row in conn.execute("PRAGMA table_info(responses)")}:
+            conn.execute("ALTER TABLE responses ADD COLUMN confidence REAL")
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per (process, thread): sqlite3 connections must not
+        # cross threads, and an inherited connection must not cross a fork.
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @staticmethod
+    def make_key(
+        provider: str,
+        model: str,
+        temperature: float,
+        top_p: float,
+        system_message: str,
+        user_message: str,
+    ) -> str:
+        """Return the SHA-256 key of one chat request."""
+        payload = json.dumps(
+            [provider, model, temperature, top_p, system_message, user_message],
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> CachedResponse | None:
+        try:
+            row = self._connect().execute(
+                "SELECT reply, model_version, prompt_tokens, completion_tokens, cost_usd, "
+                "confidence FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+        except sqlite3.Error as exc:
+            logging.warning("LLM response cache read failed: %s", exc)
+            return None
+        if row is None:
+            return None
+        return CachedResponse(*row)
+
+    def put(self, key: str, provider: str, model: str, response: CachedResponse) -> None:
+        try:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, provider, model, reply, "
+                    "model_version, prompt_tokens, completion_tokens, cost_usd, created_at, "
+                    "confidence) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        key, provider, model, response.reply, response.model_version,
+                        response.prompt_tokens, response.completion_tokens,
+                        response.cost_usd, time.time(), response.confidence,
+                    ),
+                )
+        except sqlite3.Error as exc:
+            logging.warning("LLM response cache write failed: %s", exc)
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import os
 import logging
 import random
@@ -8,10 +9,16 @@ import time
 from dataclasses import dataclass
 from collections import defaultdict
 
-import requests
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI, RateLimitError
 from colorama import init, Fore, Style
 
+from cascade import describe_confidence, reply_confidence
+from cost_reconciler import CostReconciler
+from http_pool import PoolSettings, PoolWaitMeter, async_http_client, pooled_session, sync_http_client
+from llm_cache import CachedResponse, ResponseCache
+from prompt_layout import cache_hints, user_content
+from rate_limiter import await_slot, estimate_tokens, rate_limit_headers, wait_for_slot
+
 init(autoreset=True)
 
 
@@ -40,12 +47,16 @@ class CallRecord:
     prompt_tokens: int
     completion_tokens: int
     cost_usd: float
-    source: str  # "openrouter", "generation_endpoint", "estimate", or "local"
+    source: str  # "openrouter", "generation_endpoint", "estimate", "local", "cache" ("pending" until reconciled)
     latency_s: float | None = None
     temperature: float | None = None
     top_p: float | None = None
     model_version: str | None = None
     provider: str | None = None  # "openrouter" or "local"
+    cache_miss: bool = False     # True if the response cache was consulted and missed
+    tier: int | None = None      # --cascade tier (0 = cheapest); None outside a cascade
+    cached_tokens: int | None = None  # prompt tokens served from the provider's prompt cache
+    pool_wait_s: float | None = None  # time queued for a pooled connection (not in latency_s)
 
 
 # ---------------------------------------------------------------------------
@@ -109,8 +120,8 @@ class LLMAnalyzer:
     Cost accuracy hierarchy (best to worst, openrouter only):
     1. ``response.usage.model_extra['cost']`` — returned directly in the
        completion response by OpenRouter; zero-latency, fully accurate.
-    2. ``GET /api/v1/generation?id=<id>`` — queried after the call; used only
-       when (1) is unavailable.
+    2. ``GET /api/v1/generation?id=<id>`` — queried after the call by a
+       background ``CostReconciler``; used only when (1) is unavailable.
     3. Local pricing-table estimate — last resort when the API is unreachable.
 
     For the local provider, cost_usd is always 0.0 and source is "local".
@@ -127,10 +138,16 @@ class LLMAnalyzer:
                  models_file: str = "remote_models.txt",
                  temperature: float = 1.0, top_p: float = 1.0,
                  provider: str = "openrouter",
-                 local_base_url: str | None = None):
+                 local_base_url: str | None = None,
+                 response_cache_path: str | None = None):
         self.temperature = temperature
         self.top_p = top_p
 
+        # Opt-in persistent response cache (see llm_cache.py). None = disabled.
+        self.response_cache: ResponseCache | None = (
+            ResponseCache(response_cache_path) if response_cache_path else None
+        )
+
         # ----------------------------------------------------------------
         # Provider registry (MULTIPROVIDER_SPEC v1.2 — E2)
         # ----------------------------------------------------------------
@@ -169,11 +186,16 @@ class LLMAnalyzer:
         self.active_provider = providers[provider]
         self.provider_name = provider
 
-        # Create client for active provider
+        # Create client for active provider, on an explicitly sized
+        # connection pool (see http_pool.py). The generation endpoint gets a
+        # pooled requests.Session of its own, created on first use.
+        self.pool_settings = PoolSettings.from_env()
         self.client = OpenAI(
             api_key=self.active_provider.api_key,
             base_url=self.active_provider.base_url,
+            http_client=sync_http_client(self.pool_settings),
         )
+        self._http_session = None
 
         # Load models for active provider
         self.models = self._load_models(self.active_provider.models_file)
@@ -204,6 +226,23 @@ class LLMAnalyzer:
         # output does not interleave across threads/processes.
         self.quiet = False
 
+        # Optional rate_limiter.AdaptiveRateLimiter (or a manager proxy to
+        # one shared across processes). None = send requests unpaced.
+        self.rate_limiter = None
+
+        # Optional cascade.CascadeSettings (``--cascade``). None = every
+        # occurrence call goes to the requested or a random model.
+        self.cascade = None
+
+        # Generation-endpoint lookups run in the background and patch their
+        # CallRecord later (see cost_reconciler.py); the summaries drain it.
+        self.cost_reconciler = CostReconciler(
+            self._fetch_generation_stats,
+            self._apply_generation_stats,
+            retries=self._GENERATION_RETRIES,
+            retry_delay=self._GENERATION_RETRY_DELAY,
+        )
+
         # Pricing table — only used as a last-resort fallback (USD per 1 M tokens)
         self._fallback_pricing: dict[str, dict[str, float]] = {
             "qwen/qwen-turbo": {"prompt": 0.04, "completion": 0.16},
@@ -282,53 +321,110 @@ class LLMAnalyzer:
 
         return prompt_tokens, completion_tokens, cost
 
+    @staticmethod
+    def _extract_cached_tokens(response) -> int | None:
+        """Prompt tokens the provider served from its prompt cache, if reported.
+
+        OpenAI-compatible APIs (OpenRouter included) report them in
+        ``usage.prompt_tokens_details.cached_tokens``; llama.cpp reports
+        ``timings.cache_n`` on the response itself.
+        """
+        usage = getattr(response, "usage", None)
+        details = getattr(usage, "prompt_tokens_details", None) if usage else None
+        cached = getattr(details, "cached_tokens", None) if details is not None else None
+        if cached is None:
+            try:
+                timings = (getattr(response, "model_extra", None) or {}).get("timings") or {}
+                cached = timings.get("cache_n")
+            except Exception:
+                cached = None
+        try:
+            return int(cached) if cached is not None else None
+        except (TypeError, ValueError):
+            return None
+
     # ------------------------------------------------------------------
     # Generation endpoint (secondary source, rarely needed)
     # ------------------------------------------------------------------
 
-    def _fetch_generation_stats(self, generation_id: str) -> dict | None:
-        """Query the OpenRouter generation endpoint for actual billing data.
+    def _fetch_generation_stats(self, generation_id: str) -> tuple[str, dict | None]:
+        """Query the OpenRouter generation endpoint once for actual billing data.
 
-        Used only when ``response.usage.model_extra['cost']`` is unavailable.
-        Returns the ``data`` dict, or *None* on failure.
+        Used only when ``response.usage.model_extra['cost']`` is unavailable,
+        from the ``CostReconciler`` thread. Returns ``("done", data)``,
+        ``("retry", None)`` while the generation is not available yet, or
+        ``("failed", None)``.
         """
         headers = {"Authorization": f"Bearer {self.active_provider.api_key}"}
         params = {"id": generation_id}
+        with self._lock:
+            if self._http_session is None:
+                self._http_session = pooled_session(self.pool_settings)
+            session = self._http_session
 
-        for attempt in range(1, self._GENERATION_RETRIES + 1):
-            try:
-                resp = requests.get(
-                    self._GENERATION_URL,
-                    headers=headers,
-                    params=params,
-                    timeout=10,
-                )
-                if resp.status_code == 200:
-                    data = resp.json().get("data")
-                    if data and data.get("total_cost") is not None:
-                        return data
-                    if attempt < self._GENERATION_RETRIES:
-                        time.sleep(self._GENERATION_RETRY_DELAY)
-                elif resp.status_code == 404:
-                    if attempt < self._GENERATION_RETRIES:
-                        time.sleep(self._GENERATION_RETRY_DELAY)
-                else:
-                    print(
-                        Fore.YELLOW
-                        + f"Warning: Generation endpoint HTTP {resp.status_code} for id={generation_id}"
-                        + Style.RESET_ALL
-                    )
-                    break
-            except Exception as exc:
-                print(
-                    Fore.YELLOW
-                    + f"Warning: Generation endpoint error (attempt {attempt}): {exc}"
-                    + Style.RESET_ALL
-                )
-                if attempt < self._GENERATION_RETRIES:
-                    time.sleep(self._GENERATION_RETRY_DELAY)
+        try:
+            resp = session.get(
+                self._GENERATION_URL,
+                headers=headers,
+                params=params,
+                timeout=10,
+            )
+        except Exception as exc:
+            print(
+                Fore.YELLOW
+                + f"Warning: Generation endpoint error for id={generation_id}: {exc}"
+                + Style.RESET_ALL
+            )
+            return "retry", None
+        if resp.status_code == 200:
+            data = resp.json().get("data")
+            if data and data.get("total_cost") is not None:
+                return "done", data
+            return "retry", None
+        if resp.status_code == 404:
+            return "retry", None
+        print(
+            Fore.YELLOW
+            + f"Warning: Generation endpoint HTTP {resp.status_code} for id={generation_id}"
+            + Style.RESET_ALL
+        )
+        return "failed", None
 
-        return None
+    def _apply_generation_stats(self, record: CallRecord, stats: dict | None) -> None:
+        """Patch a ``source="pending"`` record with generation stats (or keep the estimate)."""
+        with self._lock:
+            if stats is None:
+                record.source = "estimate"
+                logging.debug(
+                    "[Cost] %s: generation endpoint unavailable, keeping estimate $%.8f",
+                    record.model, record.cost_usd,
+                )
+                return
+            record.prompt_tokens = int(
+                stats.get("tokens_prompt")
+                or stats.get("native_tokens_prompt")
+                or record.prompt_tokens
+            )
+            record.completion_tokens = int(
+                stats.get("tokens_completion")
+                or stats.get("native_tokens_completion")
+                or record.completion_tokens
+            )
+            record.cost_usd = float(stats.get("total_cost", 0.0))
+            if record.cached_tokens is None and stats.get("native_tokens_cached") is not None:
+                record.cached_tokens = int(stats["native_tokens_cached"])
+            record.source = "generation_endpoint"
+
+    def reconcile_costs(self) -> None:
+        """Wait until every pending generation-endpoint lookup has patched its record."""
+        pending = self.cost_reconciler.pending
+        if pending:
+            self._emit(
+                Fore.CYAN
+                + f"Waiting for {pending:,} generation-endpoint cost lookup(s)..."
+                + Style.RESET_ALL
+            )
+            self.cost_reconciler.drain()
 
     # ------------------------------------------------------------------
     # Pricing-table fallback (last resort)
@@ -371,11 +467,16 @@ class LLMAnalyzer:
         temperature: float | None = None,
         top_p: float | None = None,
         model_version: str | None = None,
-    ) -> None:
+        cache_miss: bool = False,
+        tier: int | None = None,
+        cached_tokens: int | None = None,
+        pool_wait_s: float | None = None,
+    ) -> CallRecord:
         """Store a CallRecord using the most accurate cost source available.
 
         For the local provider (cost_per_call=False), cost_usd is always 0.0
         and source is "local". OpenRouter cost resolution paths are skipped.
+        Returns the stored record.
         """
 
         if not self.active_provider.cost_per_call:
@@ -399,51 +500,66 @@ class LLMAnalyzer:
                 + Style.RESET_ALL
             )
         else:
-            # Second path: generation endpoint
-            stats = self._fetch_generation_stats(generation_id)
-            if stats is not None:
-                prompt_tokens = int(
-                    stats.get("tokens_prompt")
-                    or stats.get("native_tokens_prompt")
-                    or prompt_tokens
-                )
-                completion_tokens = int(
-                    stats.get("tokens_completion")
-                    or stats.get("native_tokens_completion")
-                    or completion_tokens
-                )
-                cost_usd = float(stats.get("total_cost", 0.0))
-                source = "generation_endpoint"
-                self._emit(
-                    Fore.CYAN
-                    + f"    [Cost] {model_name}: {prompt_tokens:,} prompt + "
-                    + f"{completion_tokens:,} completion = ${cost_usd:.8f} USD (generation endpoint)"
-                    + Style.RESET_ALL
-                )
-            else:
-                # Last resort: price table estimation
-                cost_usd = self._estimate_cost(model_name, prompt_tokens, completion_tokens)
-                source = "estimate"
-                self._emit(
-                    Fore.YELLOW
-                    + f"    [Cost] {model_name}: {prompt_tokens:,} prompt + "
-                    + f"{completion_tokens:,} completion = ${cost_usd:.8f} USD (estimated)"
-                    + Style.RESET_ALL
-                )
+            # Second path: generation endpoint, looked up in the background.
+            # The record starts with the pricing-table estimate and is patched
+            # by the CostReconciler (see cost_reconciler.py).
+            cost_usd = self._estimate_cost(model_name, prompt_tokens, completion_tokens)
+            source = "pending"
+            self._emit(
+                Fore.CYAN
+                + f"    [Cost] {model_name}: {prompt_tokens:,} prompt + "
+                + f"{completion_tokens:,} completion = ${cost_usd:.8f} USD (estimate; generation endpoint pending)"
+                + Style.RESET_ALL
+            )
 
+        record = CallRecord(
+            model=model_name,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            cost_usd=cost_usd,
+            source=source,
+            latency_s=latency_s,
+            temperature=temperature,
+            top_p=top_p,
+            model_version=model_version,
+            provider=self.provider_name,
+            cache_miss=cache_miss,
+            tier=tier,
+            cached_tokens=cached_tokens,
+            pool_wait_s=pool_wait_s,
+        )
+        with self._lock:
+            self.call_records.append(record)
+        if source == "pending":
+            self.cost_reconciler.submit(record, generation_id)
+        return record
+
+    def _record_cache_hit(
+        self, model_name: str, cached: CachedResponse, tier: int | None = None
+    ) -> None:
+        """Store a zero-cost CallRecord for a reply replayed from the response cache.
+
+        Tokens and latency are left out (nothing was sent), so cache hits do
+        not distort token totals or latency percentiles.
+        """
+        self._emit(
+            Fore.CYAN
+            + f"    [Cost] {model_name}: replayed from response cache = $0.00000000 USD"
+            + Style.RESET_ALL
+        )
         with self._lock:
             self.call_records.append(
                 CallRecord(
                     model=model_name,
-                    prompt_tokens=prompt_tokens,
-                    completion_tokens=completion_tokens,
-                    cost_usd=cost_usd,
-                    source=source,
-                    latency_s=latency_s,
-                    temperature=temperature,
-                    top_p=top_p,
-                    model_version=model_version,
+                    prompt_tokens=0,
+                    completion_tokens=0,
+                    cost_usd=0.0,
+                    source="cache",
+                    temperature=self.temperature,
+                    top_p=self.top_p,
+                    model_version=cached.model_version,
                     provider=self.provider_name,
+                    tier=tier,
                 )
             )
 
@@ -457,6 +573,7 @@ class LLMAnalyzer:
         If *records* is provided, aggregate from that slice instead
         of ``self.call_records``.
         """
+        self.reconcile_costs()
         recs = records if records is not None else self.call_records
         total_prompt = sum(r.prompt_tokens for r in recs)
         total_completion = sum(r.completion_tokens for r in recs)
@@ -465,13 +582,44 @@ class LLMAnalyzer:
             "prompt_tokens": total_prompt,
             "completion_tokens": total_completion,
             "total_tokens": total_prompt + total_completion,
+            "cached_prompt_tokens": sum(r.cached_tokens or 0 for r in recs),
             "total_cost_usd": total_cost,
             "calls": len(recs),
             "openrouter_calls": sum(1 for r in recs if r.source == "openrouter"),
             "generation_endpoint_calls": sum(1 for r in recs if r.source == "generation_endpoint"),
             "estimated_calls": sum(1 for r in recs if r.source == "estimate"),
+            "cache_hits": sum(1 for r in recs if r.source == "cache"),
+            "cache_misses": sum(1 for r in recs if r.cache_miss),
         }
 
+    def _cascade_breakdown(self, call_records: list) -> list[dict]:
+        """Per-tier calls, escalations, cost and latency of the ``--cascade`` calls."""
+        import statistics as _stats
+
+        if self.cascade is None:
+            return []
+        tiers = []
+        for tier, model_name in enumerate(self.cascade.tiers):
+            recs = [r for r in call_records if r.tier == tier]
+            latencies = [r.latency_s for r in recs if r.latency_s is not None]
+            entry: dict = {
+                "tier": tier,
+                "model": model_name,
+                "calls": len(recs),
+                "cost_usd": round(sum(r.cost_usd for r in recs), 8),
+            }
+            if latencies:
+                entry["mean_s"] = round(sum(latencies) / len(latencies), 3)
+                if len(latencies) >= 20:
+                    entry["p95_s"] = round(
+                        _stats.quantiles(latencies, n=100, method="inclusive")[94], 3
+                    )
+            tiers.append(entry)
+        # Every call of tier k+1 is an escalation out of tier k.
+        for lower, upper in zip(tiers, tiers[1:]):
+            lower["escalated"] = upper["calls"]
+        return tiers
+
     def print_usage_summary(self, output_file: str | None = None, *, records: list | None = None) -> None:
         """Print token usage and cost summary to console and optionally save to a file.
 
@@ -480,6 +628,7 @@ class LLMAnalyzer:
         """
         import statistics as _stats
 
+        self.reconcile_costs()
         call_records = records if records is not None else self.call_records
 
         summary = self.get_usage_summary(records=records)
@@ -503,9 +652,18 @@ class LLMAnalyzer:
             lines.append(f"  - Generation endpoint:  {summary['generation_endpoint_calls']:,}  (queried after response)")
         if summary['estimated_calls'] > 0:
             lines.append(f"  - Estimated:            {summary['estimated_calls']:,}  (pricing-table fallback)")
+        if summary['cache_hits'] > 0:
+            lines.append(f"  - Response cache:       {summary['cache_hits']:,}  (cost $0.00 — replayed, no API request)")
         lines += [
             "-" * 70,
             f"Prompt tokens:            {summary['prompt_tokens']:,}",
+        ]
+        if summary['cached_prompt_tokens'] > 0:
+            lines.append(
+                f"  - Provider-cached:      {summary['cached_prompt_tokens']:,}"
+                f"  ({summary['cached_prompt_tokens'] / max(1, summary['prompt_tokens']):.1%} of prompt tokens)"
+            )
+        lines += [
             f"Completion tokens:        {summary['completion_tokens']:,}",
             f"Total tokens:             {summary['total_tokens']:,}",
             "-" * 70,
@@ -513,6 +671,41 @@ class LLMAnalyzer:
             "=" * 70,
         ]
 
+        # --- RESPONSE CACHE section (only when the cache was consulted) ---
+        cache_lookups = summary['cache_hits'] + summary['cache_misses']
+        if cache_lookups > 0:
+            lines += [
+                "LLM RESPONSE CACHE",
+                "-" * 70,
+                f"hits:     {summary['cache_hits']:,}",
+                f"misses:   {summary['cache_misses']:,}",
+                f"hit rate: {summary['cache_hits'] / cache_lookups:.1%}",
+                "=" * 70,
+            ]
+
+        # --- CASCADE section (only with --cascade) ---
+        cascade_tiers = self._cascade_breakdown(call_records)
+        if cascade_tiers:
+            lines += [
+                "CASCADE (occurrence filter)",
+                "-" * 70,
+                f"tiers: {self.cascade.describe()}",
+            ]
+            for entry in cascade_tiers:
+                line = (
+                    f"  tier {entry['tier']} {entry['model']}: calls={entry['calls']:,}"
+                    f"  cost=${entry['cost_usd']:.8f}"
+                )
+                if "escalated" in entry:
+                    rate = entry["escalated"] / entry["calls"] if entry["calls"] else 0.0
+                    line += f"  escalated={entry['escalated']:,} ({rate:.1%})"
+                if "mean_s" in entry:
+                    line += f"  mean={entry['mean_s']:.3f}s"
+                if "p95_s" in entry:
+                    line += f"  p95={entry['p95_s']:.3f}s"
+                lines.append(line)
+            lines.append("=" * 70)
+
         # --- LATENCY section ---
         latencies = [r.latency_s for r in call_records if r.latency_s is not None]
         lines.append("LATENCY (per LLM call, seconds)")
@@ -531,6 +724,13 @@ class LLMAnalyzer:
                     lines.append(f"p99:      {q[98]:.3f}")
         else:
             lines.append("(no latency data)")
+        pool_waits = [r.pool_wait_s for r in call_records if r.pool_wait_s is not None]
+        if any(pool_waits):
+            waited = [w for w in pool_waits if w > 0.001]
+            lines.append(
+                f"pool wait: {sum(pool_waits):.3f} total, {max(pool_waits):.3f} max"
+                f"  ({len(waited):,}/{len(pool_waits):,} calls waited >1 ms; not included above)"
+            )
         lines.append("=" * 70)
 
         # --- SAMPLING & MODEL section ---
@@ -567,6 +767,7 @@ class LLMAnalyzer:
             model_data: dict[str, dict] = defaultdict(
                 lambda: {
                     "prompt_tokens": 0,
+                    "cached_tokens": 0,
                     "completion_tokens": 0,
                     "cost_usd": 0.0,
                     "calls": 0,
@@ -578,6 +779,7 @@ class LLMAnalyzer:
             for rec in call_records:
                 m = model_data[rec.model]
                 m["prompt_tokens"] += rec.prompt_tokens
+                m["cached_tokens"] += rec.cached_tokens or 0
                 m["completion_tokens"] += rec.completion_tokens
                 m["cost_usd"] += rec.cost_usd
                 m["calls"] += 1
@@ -597,8 +799,9 @@ class LLMAnalyzer:
                     for ver, ver_count in sorted(m["versions"].items(), key=lambda x: -x[1]):
                         lines.append(f"    actual: {ver} ({ver_count:,} calls)")
                 # main stats line
+                cached_tag = f" (cached={m['cached_tokens']:,})" if m["cached_tokens"] else ""
                 lines.append(
-                    f"    calls={m['calls']:,}  prompt={m['prompt_tokens']:,}  "
+                    f"    calls={m['calls']:,}  prompt={m['prompt_tokens']:,}{cached_tag}  "
                     f"completion={m['completion_tokens']:,}  cost=${m['cost_usd']:.8f}  [{src_tag}]"
                 )
                 # latency: sub-line
@@ -665,6 +868,7 @@ class LLMAnalyzer:
         output_dir = _Path(output_dir)
         pdf_path = _Path(pdf_path)
 
+        self.reconcile_costs()
         call_records = records if records is not None else self.call_records
 
         # --- Aggregate from call_records ---
@@ -698,6 +902,16 @@ class LLMAnalyzer:
                 if len(latencies) >= 100:
                     latency_block["p99_s"] = round(q[98], 3)
 
+        # Time queued for a pooled connection, kept out of the latencies above
+        pool_waits = [r.pool_wait_s for r in call_records if r.pool_wait_s is not None]
+        if pool_waits:
+            latency_block["pool_wait"] = {
+                "total_s": round(sum(pool_waits), 3),
+                "max_s": round(max(pool_waits), 3),
+                "mean_s": round(sum(pool_waits) / len(pool_waits), 3),
+                "waited_calls": sum(1 for w in pool_waits if w > 0.001),
+            }
+
         # --- model_versions ---
         model_versions: dict[str, int] = {}
         for r in call_records:
@@ -720,6 +934,27 @@ class LLMAnalyzer:
             "latency": latency_block,
         }
 
+        # Response cache counters (only when the cache was consulted)
+        cache_hits = sum(1 for r in call_records if r.source == "cache")
+        cache_misses = sum(1 for r in call_records if r.cache_miss)
+        if cache_hits + cache_misses > 0:
+            summary["response_cache"] = {
+                "hits": cache_hits,
+                "misses": cache_misses,
+                "hit_rate": round(cache_hits / (cache_hits + cache_misses), 4),
+            }
+
+        cascade_tiers = self._cascade_breakdown(call_records)
+        if cascade_tiers:
+            summary["cascade"] = {
+                "min_confidence": self.cascade.min_confidence,
+                "tiers": cascade_tiers,
+            }
+
+        # Provider prompt-cache hits (only when the provider reported them)
+        if any(r.cached_tokens is not None for r in call_records):
+            summary["total_cached_prompt_tokens"] = sum(r.cached_tokens or 0 for r in call_records)
+
         # Method identifier (for cross-method comparison)
         if method is not None:
             summary["method"] = method
@@ -838,53 +1073,158 @@ class LLMAnalyzer:
     # Internal completion helper (with timing + sampling params)
     # ------------------------------------------------------------------
 
+    def _chat_params(
+        self,
+        model_name: str,
+        system_message: str,
+        user_message: str,
+        logprobs: bool = False,
+    ) -> dict:
+        """Return the ``chat.completions.create`` keyword arguments for one request."""
+        # Runtime safety net (warn + override, NOT raise — P6)
+        temp, top_p = validate_sampling_for_model(
+            model_name, self.temperature, self.top_p, strict=False
+        )
+        params = {
+            "model": model_name,
+            "temperature": temp,
+            "top_p": top_p,
+            # Invariant parts first so the provider can reuse its prompt
+            # cache (see prompt_layout).
+            "messages": [
+                {"role": "system", "content": system_message},
+                {
+                    "role": "user",
+                    "content": user_content(self.provider_name, model_name, user_message),
+                },
+            ],
+            **cache_hints(self.provider_name),
+        }
+        if logprobs:
+            params["logprobs"] = True
+        return params
+
     def _timed_create(
         self,
         model_name: str,
         system_message: str,
         user_message: str,
+        logprobs: bool = False,
     ) -> tuple:
         """Send a chat completion with timing and sampling params.
 
-        Returns (response, latency_s, model_version).
+        Returns (response, latency_s, model_version, pool_wait_s), where
+        latency_s excludes the time spent waiting for a pooled connection.
         Raises ValueError if the model is a reasoning model and
         temperature/top_p are not 1.0 (see validate_sampling_for_model).
         """
-        # Runtime safety net (warn + override, NOT raise — P6)
-        temp, top_p = validate_sampling_for_model(
-            model_name, self.temperature, self.top_p, strict=False
+        params = self._chat_params(model_name, system_message, user_message, logprobs)
+        if self.rate_limiter is None:
+            with PoolWaitMeter() as pool:
+                t0 = time.perf_counter()
+                response = self.client.chat.completions.create(**params)
+                latency_s, pool_wait_s = pool.split(time.perf_counter() - t0)
+        else:
+            key, est_tokens = self._rate_limit_key(
+                model_name, system_message, user_message
+            )
+            wait_for_slot(self.rate_limiter, key, est_tokens)
+            with PoolWaitMeter() as pool:
+                t0 = time.perf_counter()
+                try:
+                    raw = self.client.chat.completions.with_raw_response.create(**params)
+                except RateLimitError as exc:
+                    self._report_rate_limited(key, exc)
+                    raise
+                latency_s, pool_wait_s = pool.split(time.perf_counter() - t0)
+            response = raw.parse()
+            self._report_rate_limit_success(key, response, est_tokens, raw.headers)
+        model_version = getattr(response, "model", None)
+        return response, latency_s, model_version, pool_wait_s
+
+    # ------------------------------------------------------------------
+    # Adaptive rate limiter hooks (see rate_limiter.py)
+    # ------------------------------------------------------------------
+
+    def _rate_limit_key(
+        self, model_name: str, system_message: str, user_message: str
+    ) -> tuple[str, int]:
+        """Return the ``(key, est_tokens)`` pair passed to ``self.rate_limiter``."""
+        key = f"{self.provider_name}|{model_name}"
+        return key, estimate_tokens(system_message, user_message)
+
+    def _report_rate_limited(self, key: str, exc: RateLimitError) -> None:
+        response = getattr(exc, "response", None)
+        self.rate_limiter.record_rate_limited(
+            key, rate_limit_headers(getattr(response, "headers", None)), str(exc)
         )
-        t0 = time.perf_counter()
-        response = self.client.chat.completions.create(
-            model=model_name,
-            temperature=temp,
-            top_p=top_p,
-            messages=[
-                {"role": "system", "content": system_message},
-                {"role": "user", "content": user_message},
-            ],
+
+    def _report_rate_limit_success(self, key: str, response, est_tokens: int, headers) -> None:
+        prompt_tokens, completion_tokens, _ = self._extract_usage(response)
+        self.rate_limiter.record_success(
+            key, prompt_tokens + completion_tokens or est_tokens, est_tokens,
+            rate_limit_headers(headers),
         )
-        latency_s = time.perf_counter() - t0
-        model_version = getattr(response, "model", None)
-        return response, latency_s, model_version
 
-    def _complete(
+    def _lookup_cached_reply(
         self,
         model_name: str,
         system_message: str,
         user_message: str,
-    ) -> str:
-        """Send a chat completion, record accurate billing, and return the reply."""
-        response, latency_s, model_version = self._timed_create(
-            model_name, system_message, user_message
+    ) -> tuple[str | None, str | None]:
+        """Return ``(cache_key, cached_reply)`` for a request.
+
+        ``cache_key`` is None when no response cache is configured. A hit is
+        recorded here as a zero-cost ``source="cache"`` call.
+        """
+        cache_key, cached = self._lookup_cached(model_name, system_message, user_message)
+        return cache_key, cached.reply if cached is not None else None
+
+    def _lookup_cached(
+        self,
+        model_name: str,
+        system_message: str,
+        user_message: str,
+        tier: int | None = None,
+        scored: bool = False,
+    ) -> tuple[str | None, CachedResponse | None]:
+        """Like :meth:`_lookup_cached_reply` but return the whole cached response.
+
+        With *scored* (cascade tiers), an entry without a confidence (written
+        by a non-cascade run or without logprobs) is a miss: the request is
+        asked again with logprobs and the entry overwritten, instead of the
+        cascade escalating on every replay.
+        """
+        if self.response_cache is None:
+            return None, None
+        cache_key = ResponseCache.make_key(
+            self.provider_name, model_name, self.temperature, self.top_p,
+            system_message, user_message,
         )
+        cached = self.response_cache.get(cache_key)
+        if cached is None or (scored and cached.confidence is None):
+            return cache_key, None
+        self._record_cache_hit(model_name, cached, tier)
+        return cache_key, cached
 
+    def _finish_completion(
+        self,
+        model_name: str,
+        response,
+        latency_s: float,
+        model_version: str | None,
+        cache_key: str | None,
+        tier: int | None = None,
+        confidence: float | None = None,
+        pool_wait_s: float | None = None,
+    ) -> str:
+        """Record billing for a completion response, store it in the cache, return the reply."""
         if not response.choices:
             raise RuntimeError("No response choices returned by the API.")
 
         prompt_tokens, completion_tokens, cost_from_response = self._extract_usage(response)
 
-        self._record_call(
+        record = self._record_call(
             model_name=model_name,
             generation_id=response.id,
             prompt_tokens=prompt_tokens,
@@ -894,9 +1234,92 @@ class LLMAnalyzer:
             temperature=self.temperature,
             top_p=self.top_p,
             model_version=model_version,
+            cache_miss=cache_key is not None,
+            tier=tier,
+            cached_tokens=self._extract_cached_tokens(response),
+            pool_wait_s=pool_wait_s,
+        )
+
+        reply = response.choices[0].message.content.strip()
+        if cache_key is not None:
+            self.response_cache.put(
+                cache_key, self.provider_name, model_name,
+                CachedResponse(
+                    reply=reply,
+                    model_version=model_version,
+                    prompt_tokens=record.prompt_tokens,
+                    completion_tokens=record.completion_tokens,
+                    cost_usd=record.cost_usd,
+                    confidence=confidence,
+                ),
+            )
+        return reply
+
+    def _complete(
+        self,
+        model_name: str,
+        system_message: str,
+        user_message: str,
+    ) -> str:
+        """Send a chat completion, record accurate billing, and return the reply.
+
+        With a response cache configured, an identical earlier request
+        (provider, model, temperature, top_p, system and user message) is
+        replayed instead and recorded as a zero-cost ``source="cache"`` call.
+        """
+        cache_key, cached_reply = self._lookup_cached_reply(
+            model_name, system_message, user_message
+        )
+        if cached_reply is not None:
+            return cached_reply
+
+        response, latency_s, model_version, pool_wait_s = self._timed_create(
+            model_name, system_message, user_message
+        )
+        return self._finish_completion(
+            model_name, response, latency_s, model_version, cache_key,
+            pool_wait_s=pool_wait_s,
         )
 
-        return response.choices[0].message.content.strip()
+    def _complete_scored(
+        self,
+        model_name: str,
+        system_message: str,
+        user_message: str,
+        tier: int,
+    ) -> tuple[str, float | None]:
+        """:meth:`_complete` for one cascade tier; also return the reply's confidence."""
+        cache_key, cached = self._lookup_cached(model_name, system_message, user_message, tier, scored=True)
+        if cached is not None:
+            return cached.reply, cached.confidence
+
+        response, latency_s, model_version, pool_wait_s = self._timed_create(
+            model_name, system_message, user_message, logprobs=True
+        )
+        confidence = reply_confidence(response)
+        reply = self._finish_completion(
+            model_name, response, latency_s, model_version, cache_key,
+            tier=tier, confidence=confidence, pool_wait_s=pool_wait_s,
+        )
+        return reply, confidence
+
+    def _cascade_complete(self, system_message: str, user_message: str) -> str:
+        """Ask the cascade tiers in order until one is confident (see ``cascade.py``)."""
+        tiers = self.cascade.tiers
+        for tier, model_name in enumerate(tiers):
+            reply, confidence = self._complete_scored(
+                model_name, system_message, user_message, tier
+            )
+            if self.cascade.accepts(reply, confidence):
+                break
+            if tier + 1 < len(tiers):
+                self._emit(
+                    Fore.CYAN
+                    + f"    [Cascade] {model_name}: {describe_confidence(confidence)}"
+                    + f" -> escalating to {tiers[tier + 1]}"
+                    + Style.RESET_ALL
+                )
+        return reply
 
     # ------------------------------------------------------------------
     # Public analysis methods
@@ -926,15 +1349,21 @@ class LLMAnalyzer:
     def analyze_single_occurrence(
         self, prompt_text: str, model_name: str | None = None
     ) -> str:
-        """Determine whether a single keyword occurrence is significant."""
+        """Determine whether a single keyword occurrence is significant.
+
+        With a cascade configured (``self.cascade``), *model_name* is ignored
+        and the cascade tiers are asked instead.
+        """
+        system_message = (
+            "You are an expert assistant specialized in analyzing scientific articles."
+        )
+        if self.cascade is not None:
+            return self._cascade_complete(system_message, prompt_text)
         if model_name is None:
             model_name = self.get_random_model()
         else:
             print(Fore.CYAN + f"Using specified model: {model_name}" + Style.RESET_ALL)
 
-        system_message = (
-            "You are an expert assistant specialized in analyzing scientific articles."
-        )
         return self._complete(model_name, system_message, prompt_text)
 
     # ------------------------------------------------------------------
@@ -982,7 +1411,7 @@ class LLMAnalyzer:
         for search_model in models_to_try:
             print(Fore.CYAN + f"Trying model: {search_model}" + Style.RESET_ALL)
             try:
-                response, latency_s, model_version = self._timed_create(
+                response, latency_s, model_version, pool_wait_s = self._timed_create(
                     search_model, system_message, prompt
                 )
 
@@ -999,6 +1428,8 @@ class LLMAnalyzer:
                     temperature=self.temperature,
                     top_p=self.top_p,
                     model_version=model_version,
+                    cached_tokens=self._extract_cached_tokens(response),
+                    pool_wait_s=pool_wait_s,
                 )
 
                 if not response.choices:
@@ -1038,4 +1469,151 @@ class LLMAnalyzer:
             + f"Obtained {len(all_summaries)} summary(s) from {len(models_to_try)} model(s)."
             + Style.RESET_ALL
         )
-        return combined
\ No newline at end of file
+        return combined
+
+class AsyncLLMAnalyzer(LLMAnalyzer):
+    """:class:`LLMAnalyzer` with coroutine counterparts backed by ``AsyncOpenAI``.
+
+    Meant for the asyncio occurrence filter (``parallel_async.py``), where
+    hundreds of requests are in flight on one event loop instead of one OS
+    thread per request. Billing, the response cache and ``call_records``
+    are shared with the synchronous methods, which keep working unchanged.
+
+    The ``AsyncOpenAI`` client is bound to the event loop it was first used
+    on, so one is created lazily per running loop; call :meth:`aclose`
+    before that loop ends. Generation-endpoint cost lookups run on the
+    ``CostReconciler`` thread, so recording a call never blocks the loop.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._async_client: AsyncOpenAI | None = None
+        self._async_client_loop: asyncio.AbstractEventLoop | None = None
+
+    def _get_async_client(self) -> AsyncOpenAI:
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_client_loop is not loop:
+            self._async_client = AsyncOpenAI(
+                api_key=self.active_provider.api_key,
+                base_url=self.active_provider.base_url,
+                http_client=async_http_client(self.pool_settings),
+            )
+            self._async_client_loop = loop
+        return self._async_client
+
+    async def aclose(self) -> None:
+        """Close the ``AsyncOpenAI`` client of the running loop, if any."""
+        client, self._async_client = self._async_client, None
+        self._async_client_loop = None
+        if client is not None:
+            await client.close()
+
+    async def _atimed_create(
+        self,
+        model_name: str,
+        system_message: str,
+        user_message: str,
+        logprobs: bool = False,
+    ) -> tuple:
+        """Coroutine counterpart of :meth:`LLMAnalyzer._timed_create`."""
+        params = self._chat_params(model_name, system_message, user_message, logprobs)
+        client = self._get_async_client()
+        if self.rate_limiter is None:
+            with PoolWaitMeter() as pool:
+                t0 = time.perf_counter()
+                response = await client.chat.completions.create(**params)
+                latency_s, pool_wait_s = pool.split(time.perf_counter() - t0)
+        else:
+            key, est_tokens = self._rate_limit_key(
+                model_name, system_message, user_message
+            )
+            await await_slot(self.rate_limiter, key, est_tokens)
+            with PoolWaitMeter() as pool:
+                t0 = time.perf_counter()
+                try:
+                    raw = await client.chat.completions.with_raw_response.create(**params)
+                except RateLimitError as exc:
+                    self._report_rate_limited(key, exc)
+                    raise
+                latency_s, pool_wait_s = pool.split(time.perf_counter() - t0)
+            response = raw.parse()
+            self._report_rate_limit_success(key, response, est_tokens, raw.headers)
+        model_version = getattr(response, "model", None)
+        return response, latency_s, model_version, pool_wait_s
+
+    async def _acomplete(
+        self,
+        model_name: str,
+        system_message: str,
+        user_message: str,
+    ) -> str:
+        """Coroutine counterpart of :meth:`LLMAnalyzer._complete`."""
+        cache_key, cached_reply = self._lookup_cached_reply(
+            model_name, system_message, user_message
+        )
+        if cached_reply is not None:
+            return cached_reply
+
+        response, latency_s, model_version, pool_wait_s = await self._atimed_create(
+            model_name, system_message, user_message
+        )
+        return self._finish_completion(
+            model_name, response, latency_s, model_version, cache_key,
+            pool_wait_s=pool_wait_s,
+        )
+
+    async def _acomplete_scored(
+        self,
+        model_name: str,
+        system_message: str,
+        user_message: str,
+        tier: int,
+    ) -> tuple[str, float | None]:
+        """Coroutine counterpart of :meth:`LLMAnalyzer._complete_scored`."""
+        cache_key, cached = self._lookup_cached(model_name, system_message, user_message, tier, scored=True)
+        if cached is not None:
+            return cached.reply, cached.confidence
+
+        response, latency_s, model_version, pool_wait_s = await self._atimed_create(
+            model_name, system_message, user_message, logprobs=True
+        )
+        confidence = reply_confidence(response)
+        reply = self._finish_completion(
+            model_name, response, latency_s, model_version, cache_key, tier, confidence,
+            pool_wait_s=pool_wait_s,
+        )
+        return reply, confidence
+
+    async def _acascade_complete(self, system_message: str, user_message: str) -> str:
+        """Coroutine counterpart of :meth:`LLMAnalyzer._cascade_complete`."""
+        tiers = self.cascade.tiers
+        for tier, model_name in enumerate(tiers):
+            reply, confidence = await self._acomplete_scored(
+                model_name, system_message, user_message, tier
+            )
+            if self.cascade.accepts(reply, confidence):
+                break
+            if tier + 1 < len(tiers):
+                self._emit(
+                    Fore.CYAN
+                    + f"    [Cascade] {model_name}: {describe_confidence(confidence)}"
+                    + f" -> escalating to {tiers[tier + 1]}"
+                    + Style.RESET_ALL
+                )
+        return reply
+
+    async def aanalyze_single_occurrence(
+        self, prompt_text: str, model_name: str | None = None
+    ) -> str:
+        """Coroutine counterpart of :meth:`LLMAnalyzer.analyze_single_occurrence`."""
+        system_message = (
+            "You are an expert assistant specialized in analyzing scientific articles."
+        )
+        if self.cascade is not None:
+            return await self._acascade_complete(system_message, prompt_text)
+        if model_name is None:
+            model_name = self.get_random_model()
+        else:
+            self._emit(Fore.CYAN + f"Using specified model: {model_name}" + Style.RESET_ALL)
+
+        return await self._acomplete(model_name, system_message, prompt_text)
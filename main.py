@@ -2,7 +2,6 @@ from __future__ import annotations
 
 import argparse
 import json
-import re
 import sys
 from collections import Counter
 from pathlib import Path
@@ -10,10 +9,18 @@ from typing import Dict, List, Sequence, Tuple
 
 from colorama import Fore, Style, init
 from dotenv import load_dotenv
-from PyPDF2 import PdfReader
-
-from keyword_search import KeywordSearcher
+from keyword_search import KeywordSearcher, SentenceIndex
 from llm_query import LLMAnalyzer
+from occurrence_batching import build_occurrence_prompt, classify_occurrence_batch
+from occurrence_dedup import ContextDedup
+from pdf_text_cache import pypdf2_pages
+from cascade import DEFAULT_MIN_CONFIDENCE, CascadeSettings
+from corpus_manifest import CorpusManifest, config_fingerprint, content_digest
+from prefilter import (
+    DocumentPreFilter, PreFilterSettings, decided_verdict, describe_counts, document_prefilter, prefilter_counts,
+)
+from run_journal import JOURNAL_FILE_NAME, PdfJournal, RunJournal, journal_path_for
+from streaming import OccurrenceStream
 
 sys.stdout.reconfigure(encoding="utf-8")
 
@@ -28,54 +35,74 @@ FilteredOccurrencesByEnabler = Dict[str, List[FilteredOccurrence]]
 SignificantFileMap = Dict[str, Path]
 
 
-def extract_extended_context(text: str, keyword_start: int, keyword_end: int) -> str:
-    """Return the surrounding sentences for the keyword occurrence."""
+def extract_extended_context(
+    text: str,
+    keyword_start: int,
+    keyword_end: int,
+    sentence_index: SentenceIndex | None = None,
+) -> str:
+    """Return the surrounding sentences for the keyword occurrence.
 
-    sentence_pattern = re.compile(r"[^.!?]*[.!?]|[^.!?]+$", re.DOTALL)
-    sentences: List[Tuple[str, int, int]] = []
+    Pass the document's ``sentence_index`` (built once after extraction) to
+    make the lookup O(log n); without it the index is rebuilt from *text*.
+    """
 
-    for match in sentence_pattern.finditer(text):
-        sentence = match.group()
-        if sentence.strip():
-            sentences.append((sentence.strip(), match.start(), match.end()))
+    if sentence_index is None:
+        sentence_index = SentenceIndex(text)
 
-    current_index = None
-    for index, (_sentence, start, end) in enumerate(sentences):
-        if start <= keyword_start < end:
-            current_index = index
-            break
+    current_index = sentence_index.locate(keyword_start)
+    current_sentence = (
+        sentence_index.sentence(current_index)[0] if current_index is not None else ""
+    )
 
-    if current_index is None:
-        return sentences[0][0] if sentences else ""
+    if not current_sentence:
+        first_sentence = sentence_index.next_sentence(-1)
+        return first_sentence or ""
 
     extended_context_parts: List[str] = []
 
-    if current_index > 0:
-        extended_context_parts.append(f"Previous sentence: {sentences[current_index - 1][0]}")
+    previous_sentence = sentence_index.previous_sentence(current_index)
+    if previous_sentence is not None:
+        extended_context_parts.append(f"Previous sentence: {previous_sentence}")
 
-    extended_context_parts.append(f"Current sentence: {sentences[current_index][0]}")
+    extended_context_parts.append(f"Current sentence: {current_sentence}")
 
-    if current_index < len(sentences) - 1:
-        extended_context_parts.append(f"Next sentence: {sentences[current_index + 1][0]}")
+    next_sentence = sentence_index.next_sentence(current_index)
+    if next_sentence is not None:
+        extended_context_parts.append(f"Next sentence: {next_sentence}")
 
     return "\n".join(extended_context_parts)
 
 
-def read_pdf(file_path: Path) -> str:
-    """Extract text from a PDF, persist it alongside the file, and return the content."""
+def read_pdf(file_path: Path, extract_workers: int = 1) -> str:
+    """Extract text from a PDF, persist it alongside the file, and return the content.
+
+    Page texts come from the shared extraction cache (see ``pdf_text_cache``),
+    so re-running over an unchanged PDF skips parsing. With
+    ``extract_workers > 1`` a long PDF is parsed in page-range shards by
+    that many processes (see ``sharded_extraction``); the text is identical.
+    """
 
-    pdf = PdfReader(str(file_path))
+    pages, from_cache = pypdf2_pages(file_path, workers=extract_workers)
+    if from_cache:
+        print(Fore.CYAN + f"Loaded extracted text for {len(pages)} pages from cache." + Style.RESET_ALL)
     text_parts: List[str] = []
 
-    for page_num, page in enumerate(pdf.pages, start=1):
-        page_text = page.extract_text()
-        print(Fore.CYAN + f"Extracted text from page {page_num}:" + Style.RESET_ALL)
+    for page_num, page_text in enumerate(pages, start=1):
+        if not from_cache:
+            print(Fore.CYAN + f"Extracted text from page {page_num}:" + Style.RESET_ALL)
         if page_text:
             text_parts.append(f"Page {page_num}:\n{page_text}\n")
-        else:
+        elif not from_cache:
             print(Fore.YELLOW + "  No text extracted from this page." + Style.RESET_ALL)
 
     extracted_text = "".join(text_parts)
+    save_extracted_text(file_path, extracted_text)
+    return extracted_text
+
+
+def save_extracted_text(file_path: Path, extracted_text: str) -> None:
+    """Persist *extracted_text* next to the PDF as ``<stem>.txt``."""
 
     output_path = file_path.with_suffix(".txt")
     try:
@@ -86,8 +113,6 @@ def read_pdf(file_path: Path) -> str:
             Fore.RED + f"Warning: Failed to write extracted text to {output_path}: {exc}" + Style.RESET_ALL
         )
 
-    return extracted_text
-
 
 def load_enabler_keywords(keywords_path: Path) -> EnablerKeywords:
     """
@@ -152,14 +177,34 @@ def analyze_occurrences(
     significant_files: SignificantFileMap | None = None,
     total_occurrences: int | None = None,
     enabler_descriptions: Dict[str, str] | None = None,
+    sentence_index: SentenceIndex | None = None,
+    batch_size: int = 1,
+    journal: PdfJournal | None = None,
+    prefilter: DocumentPreFilter | None = None,
 ) -> FilteredOccurrencesByEnabler:
     """Filter occurrences using the LLM to keep only significant mentions.
 
     If ``enabler_descriptions`` is provided, each ``Enabler:`` line in the
     prompt is followed by a ``Description:`` line so the LLM has richer
-    context to judge significance.
+    context to judge significance. ``sentence_index`` is the document's
+    precomputed :class:`SentenceIndex`; it is built here when omitted.
+
+    With ``batch_size > 1`` up to that many occurrences of one enabler are
+    classified per LLM call (see ``occurrence_batching``); passages whose
+    verdict cannot be parsed fall back to single-occurrence calls.
+
+    With a run ``journal`` (see ``run_journal``), verdicts recorded by an
+    interrupted attempt are replayed and new ones are recorded. The other
+    occurrences that ``prefilter`` (see ``prefilter.py``) rejects are not
+    sent to the LLM.
+
+    Occurrences of one enabler with the same extended context are asked
+    once and share the verdict (see ``occurrence_dedup``).
     """
 
+    if sentence_index is None:
+        sentence_index = SentenceIndex(pdf_text)
+
     filtered_enabler_occurrences: FilteredOccurrencesByEnabler = {
         enabler: [] for enabler in enabler_occurrences
     }
@@ -167,6 +212,8 @@ def analyze_occurrences(
         enabler: set() for enabler in enabler_occurrences
     }
 
+    dedup = ContextDedup()
+
     # Counter for tracking progress
     current_occurrence = 0
 
@@ -176,66 +223,230 @@ def analyze_occurrences(
             + f"\n\n--------> Processing occurrences for enabler category {category_index}: {enabler} ({len(occurrences)} occurrences)"
             + Style.RESET_ALL
         )
+        desc = enabler_descriptions.get(enabler, "") if enabler_descriptions else ""
+
+        for chunk_start in range(0, len(occurrences), batch_size):
+            chunk = occurrences[chunk_start:chunk_start + batch_size]
+            batch_items: List[Tuple[str, str]] = []
+
+            for page_num, keyword, paragraph, absolute_start_idx in chunk:
+                current_occurrence += 1
+                extended_context = extract_extended_context(
+                    pdf_text, absolute_start_idx, absolute_start_idx + len(keyword), sentence_index
+                )
+                _announce_occurrence(
+                    current_occurrence, total_occurrences, page_num, keyword, extended_context, debug
+                )
+                batch_items.append((keyword, extended_context))
+
+            _filter_chunk(
+                enabler, chunk, batch_items, desc, keyword_occurrence_prompt, llm_analyzer,
+                model_name, filtered_enabler_occurrences, seen_paragraphs, significant_files, batch_size,
+                journal, prefilter, dedup,
+            )
+
+    return filtered_enabler_occurrences
+
+
+def _announce_occurrence(
+    current_occurrence: int,
+    total_occurrences: int | None,
+    page_num: int,
+    keyword: str,
+    extended_context: str,
+    debug: bool,
+) -> None:
+    # Format total with leading zeros for better alignment
+    total_str = str(total_occurrences) if total_occurrences else "?"
+    current_str = str(current_occurrence).zfill(len(total_str))
+    print(
+        Fore.MAGENTA
+        + f"\n\n-----> Occurrence {current_str}/{total_str}: Keyword '{keyword}' on page {page_num}"
+        + Style.RESET_ALL
+    )
+    if debug:
+        print(Fore.YELLOW + "\n    [DEBUG] Context being sent to LLM:" + Style.RESET_ALL)
+        print(Fore.WHITE + "=" * 80 + Style.RESET_ALL)
+        print(Fore.WHITE + extended_context + Style.RESET_ALL)
+        print(Fore.WHITE + "=" * 80 + Style.RESET_ALL)
+
+
+def _filter_chunk(
+    enabler: str,
+    chunk: Sequence[Occurrence],
+    batch_items: List[Tuple[str, str]],
+    desc: str,
+    keyword_occurrence_prompt: str,
+    llm_analyzer: LLMAnalyzer,
+    model_name: str | None,
+    filtered_enabler_occurrences: FilteredOccurrencesByEnabler,
+    seen_paragraphs: Dict[str, set[str]],
+    significant_files: SignificantFileMap | None,
+    batch_size: int,
+    journal: PdfJournal | None = None,
+    prefilter: DocumentPreFilter | None = None,
+    dedup: ContextDedup | None = None,
+) -> None:
+    """Classify one chunk of *enabler* occurrences and record the significant ones.
 
-        for occurrence_index, (page_num, keyword, paragraph, absolute_start_idx) in enumerate(
-            occurrences,
-            start=1,
-        ):
-            current_occurrence += 1
-            # Format total with leading zeros for better alignment
-            total_str = str(total_occurrences) if total_occurrences else "?"
-            current_str = str(current_occurrence).zfill(len(total_str))
+    Verdicts already in the run *journal* are replayed instead of re-asked,
+    and occurrences rejected by the *prefilter* are not asked; new verdicts
+    are appended to the journal as soon as they arrive. With *dedup*,
+    an occurrence whose extended context was already asked reuses that
+    verdict.
+    """
+
+    verdicts: List[bool | None] = [
+        decided_verdict(journal, prefilter, enabler, occurrence)
+        for occurrence in chunk
+    ]
+    undecided = [index for index, verdict in enumerate(verdicts) if verdict is None]
+    if len(undecided) < len(chunk):
+        print(
+            Fore.CYAN
+            + f"    Decided {len(chunk) - len(undecided)} verdict(s) from the run journal or pre-filter"
+            + Style.RESET_ALL
+        )
+    todo = undecided
+    if dedup is not None:
+        todo = []
+        for index in undecided:
+            ask, verdicts[index] = dedup.claim(enabler, chunk[index], batch_items[index][1])
+            if ask:
+                todo.append(index)
+        if len(todo) < len(undecided):
             print(
-                Fore.MAGENTA
-                + f"\n\n-----> Occurrence {current_str}/{total_str}: Keyword '{keyword}' on page {page_num}"
+                Fore.CYAN
+                + f"    Shared {len(undecided) - len(todo)} verdict(s) with identical contexts"
                 + Style.RESET_ALL
             )
-            extended_context = extract_extended_context(
-                pdf_text, absolute_start_idx, absolute_start_idx + len(keyword)
+
+    try:
+        if not todo:
+            new_verdicts: List[bool | None] = []
+        elif batch_size == 1:
+            keyword, extended_context = batch_items[todo[0]]
+            prompt_text = build_occurrence_prompt(
+                keyword_occurrence_prompt, enabler, keyword, extended_context, desc
             )
-            desc_line = ""
-            if enabler_descriptions:
-                desc = enabler_descriptions.get(enabler, "")
-                if desc:
-                    desc_line = f"\nDescription: {desc}"
-            prompt_text = (
-                f"{keyword_occurrence_prompt}\n\nEnabler: {enabler}{desc_line}\nKeyword: {keyword}\nContext:\n{extended_context}"
+            llm_response = llm_analyzer.analyze_single_occurrence(prompt_text, model_name)
+            print(Fore.GREEN + f"    LLM response: {llm_response}" + Style.RESET_ALL)
+            new_verdicts = [bool(llm_response) and llm_response.strip().lower() == "significant"]
+        else:
+            new_verdicts = classify_occurrence_batch(
+                llm_analyzer, keyword_occurrence_prompt, enabler,
+                [batch_items[index] for index in todo], model_name, desc,
             )
-
-            try:
-                if debug:
-                    print(Fore.YELLOW + "\n    [DEBUG] Context being sent to LLM:" + Style.RESET_ALL)
-                    print(Fore.WHITE + "=" * 80 + Style.RESET_ALL)
-                    print(Fore.WHITE + extended_context + Style.RESET_ALL)
-                    print(Fore.WHITE + "=" * 80 + Style.RESET_ALL)
-
-                llm_response = llm_analyzer.analyze_single_occurrence(prompt_text, model_name)
-                print(Fore.GREEN + f"    LLM response: {llm_response}" + Style.RESET_ALL)
-            except Exception as exc:  # pragma: no cover - defensive logging
-                print(
-                    Fore.RED
-                    + f"Warning: LLM call failed for keyword occurrence filtering: {exc}"
-                    + Style.RESET_ALL
+            print(
+                Fore.GREEN
+                + "    Batch verdicts: "
+                + ", ".join(
+                    "?" if verdict is None else ("significant" if verdict else "not significant")
+                    for verdict in new_verdicts
                 )
-                continue
-
-            if llm_response and llm_response.strip().lower() == "significant":
-                filtered_enabler_occurrences[enabler].append((page_num, keyword, paragraph))
-                normalized_paragraph = paragraph.strip()
-                if normalized_paragraph not in seen_paragraphs[enabler]:
-                    seen_paragraphs[enabler].add(normalized_paragraph)
-                    if significant_files and enabler in significant_files:
-                        try:
-                            with significant_files[enabler].open("a", encoding="utf-8") as handle:
-                                handle.write(paragraph)
-                                handle.write("\n\n")
-                        except OSError as exc:  # pragma: no cover - defensive logging
-                            print(
-                                Fore.RED
-                                + f"Warning: Failed to append significant paragraph for '{enabler}': {exc}"
-                                + Style.RESET_ALL
-                            )
+                + Style.RESET_ALL
+            )
+    except Exception as exc:  # pragma: no cover - defensive logging
+        print(
+            Fore.RED
+            + f"Warning: LLM call failed for keyword occurrence filtering: {exc}"
+            + Style.RESET_ALL
+        )
+        new_verdicts = [None] * len(todo)
+
+    for index, verdict in zip(todo, new_verdicts):
+        verdicts[index] = verdict
+    if dedup is not None:
+        # Members waiting for a representative asked in this same chunk.
+        position = {(chunk[index][1], chunk[index][3]): index for index in undecided}
+        for index, verdict in zip(todo, new_verdicts):
+            for _page_num, keyword, _paragraph, start in dedup.resolve(enabler, chunk[index], verdict):
+                verdicts[position[(keyword, start)]] = verdict
+    if journal is not None and undecided:
+        journal.record_verdicts(
+            enabler, [chunk[index] for index in undecided], [verdicts[index] for index in undecided]
+        )
+
+    for (page_num, keyword, paragraph, _start), verdict in zip(chunk, verdicts):
+        if not verdict:
+            continue
+        filtered_enabler_occurrences[enabler].append((page_num, keyword, paragraph))
+        normalized_paragraph = paragraph.strip()
+        if normalized_paragraph not in seen_paragraphs[enabler]:
+            seen_paragraphs[enabler].add(normalized_paragraph)
+            if significant_files and enabler in significant_files:
+                try:
+                    with significant_files[enabler].open("a", encoding="utf-8") as handle:
+                        handle.write(paragraph)
+                        handle.write("\n\n")
+                except OSError as exc:  # pragma: no cover - defensive logging
+                    print(
+                        Fore.RED
+                        + f"Warning: Failed to append significant paragraph for '{enabler}': {exc}"
+                        + Style.RESET_ALL
+                    )
+
+
+def analyze_occurrences_streaming(
+    stream: OccurrenceStream,
+    keyword_occurrence_prompt: str,
+    llm_analyzer: LLMAnalyzer,
+    model_name: str | None,
+    debug: bool,
+    significant_files: SignificantFileMap | None = None,
+    enabler_descriptions: Dict[str, str] | None = None,
+    batch_size: int = 1,
+    journal: PdfJournal | None = None,
+    prefilter: DocumentPreFilter | None = None,
+) -> FilteredOccurrencesByEnabler:
+    """Streaming counterpart of :func:`analyze_occurrences` (``--stream``).
+
+    Consumes a :class:`streaming.OccurrenceStream`, so the first LLM call
+    is sent while later pages are still being extracted. Chunks are built
+    per enabler in the same order as the barrier path, so the returned map
+    and the significant files are identical; only the console output is
+    interleaved across categories (in page order). The total number of
+    occurrences is unknown until the stream ends and is shown as ``?``.
+    """
+
+    enablers = list(stream.enabler_occurrences)
+    filtered_enabler_occurrences: FilteredOccurrencesByEnabler = {enabler: [] for enabler in enablers}
+    seen_paragraphs: Dict[str, set[str]] = {enabler: set() for enabler in enablers}
+    pending: Dict[str, List[Tuple[Occurrence, str]]] = {enabler: [] for enabler in enablers}
+    dedup = ContextDedup()
+    current_occurrence = 0
+
+    def flush(enabler: str) -> None:
+        chunk = [occurrence for occurrence, _context in pending[enabler]]
+        batch_items = [(occurrence[1], context) for occurrence, context in pending[enabler]]
+        pending[enabler] = []
+        desc = enabler_descriptions.get(enabler, "") if enabler_descriptions else ""
+        _filter_chunk(
+            enabler, chunk, batch_items, desc, keyword_occurrence_prompt, llm_analyzer,
+            model_name, filtered_enabler_occurrences, seen_paragraphs, significant_files, batch_size,
+            journal, prefilter, dedup,
+        )
+
+    print(Fore.YELLOW + "\n\n--------> Streaming occurrences as pages are extracted" + Style.RESET_ALL)
+    for enabler, occurrence, extended_context in stream:
+        current_occurrence += 1
+        page_num, keyword, _paragraph, _start = occurrence
+        _announce_occurrence(current_occurrence, None, page_num, keyword, extended_context, debug)
+        pending[enabler].append((occurrence, extended_context))
+        if len(pending[enabler]) >= batch_size:
+            flush(enabler)
 
+    for enabler in enablers:
+        if pending[enabler]:
+            flush(enabler)
+
+    if stream.first_occurrence_s is not None:
+        print(
+            Fore.CYAN
+            + f"First occurrence ready after {stream.first_occurrence_s:.2f}s "
+            + f"({stream.total_occurrences} occurrences streamed)"
+            + Style.RESET_ALL
+        )
     return filtered_enabler_occurrences
 
 
@@ -246,8 +457,13 @@ def write_occurrences_summary(
     filtered_enabler_occurrences: FilteredOccurrencesByEnabler,
     classified_keywords: Dict[str, Counter],
     output_dir: Path | None = None,
+    prefilter_skipped: Counter | None = None,
 ) -> None:
-    """Write a *_occurrences.txt file summarising raw and significant occurrences per category."""
+    """Write a *_occurrences.txt file summarising raw and significant occurrences per category.
+
+    ``prefilter_skipped`` (occurrences decided by ``--prefilter``, by
+    reason) adds a PRE-FILTER section.
+    """
 
     _output_dir = output_dir if output_dir is not None else pdf_path.parent
 
@@ -295,8 +511,16 @@ def write_occurrences_summary(
         f"TOTALS",
         f"  Total occurrences found (before LLM filter):  {total_found:>5}",
         f"  Total significant occurrences (after filter): {total_significant:>5}",
-        sep,
     ]
+    if prefilter_skipped is not None:
+        lines += [
+            thin,
+            "PRE-FILTER (no LLM call)",
+            f"  Occurrences skipped:                          {sum(prefilter_skipped.values()):>5}",
+        ]
+        for reason, count in sorted(prefilter_skipped.items()):
+            lines.append(f"    {reason}: {count}")
+    lines.append(sep)
 
     output_path = _output_dir / f"{pdf_path.stem}_occurrences.txt"
     try:
@@ -407,8 +631,25 @@ def process_single_pdf(
     output_dir: Path | None = None,
     provider: str = "openrouter",
     local_url: str | None = None,
+    llm_cache: str | None = None,
+    batch_size: int = 1,
+    stream: bool = False,
+    extract_workers: int = 1,
+    journal_path: Path | str | None = None,
+    prefilter: PreFilterSettings | None = None,
+    cascade: CascadeSettings | None = None,
 ) -> None:
-    """Process a single PDF document and produce per-category analyses."""
+    """Process a single PDF document and produce per-category analyses.
+
+    With ``stream=True`` extraction, keyword search and occurrence filtering
+    are pipelined (see ``streaming.py``): the first LLM call is sent while
+    later pages are still being parsed. ``journal_path`` is the run journal
+    (see ``run_journal``) that records and replays verdicts and category
+    analyses. With ``prefilter`` the hits of ``prefilter.py`` (references,
+    citations, headers/footers) are rejected without an LLM call. With
+    ``cascade`` each occurrence is asked to the cheapest model first and
+    escalated only when unsure (see ``cascade.py``).
+    """
 
     pdf_path = Path(file_path)
     keywords_file_path = Path(keywords_path)
@@ -424,28 +665,48 @@ def process_single_pdf(
 
     load_dotenv()
     effective_model = None if model_name == "random" else model_name
+    journal = RunJournal(journal_path).for_pdf(pdf_path) if journal_path is not None else None
+    if journal is not None and journal.replayable:
+        print(
+            Fore.CYAN
+            + f"Resuming {pdf_path.name}: {journal.replayable} verdict(s) recorded in the run journal."
+            + Style.RESET_ALL
+        )
 
-    print(Fore.CYAN + f"Reading PDF file: {pdf_path}" + Style.RESET_ALL)
-    pdf_text = read_pdf(pdf_path)
-    print(Fore.BLUE + "\n\n\n-------------> PDF text extraction completed!!\n\n" + Style.RESET_ALL)
+    if stream:
+        # Keywords first: the search runs page by page during extraction.
+        print(Fore.CYAN + f"Loading keywords from: {keywords_file_path}" + Style.RESET_ALL)
+        enabler_keywords = load_enabler_keywords(keywords_file_path)
+        enabler_descriptions = load_enabler_descriptions(keywords_file_path)
+        print(Fore.GREEN + f"Loaded {len(enabler_keywords)} enabler categories." + Style.RESET_ALL)
+    else:
+        print(Fore.CYAN + f"Reading PDF file: {pdf_path}" + Style.RESET_ALL)
+        pdf_text = read_pdf(pdf_path, extract_workers)
+        print(Fore.BLUE + "\n\n\n-------------> PDF text extraction completed!!\n\n" + Style.RESET_ALL)
 
-    print(Fore.CYAN + f"Loading keywords from: {keywords_file_path}" + Style.RESET_ALL)
-    enabler_keywords = load_enabler_keywords(keywords_file_path)
-    enabler_descriptions = load_enabler_descriptions(keywords_file_path)
-    print(Fore.GREEN + f"Loaded {len(enabler_keywords)} enabler categories." + Style.RESET_ALL)
+        print(Fore.CYAN + f"Loading keywords from: {keywords_file_path}" + Style.RESET_ALL)
+        enabler_keywords = load_enabler_keywords(keywords_file_path)
+        enabler_descriptions = load_enabler_descriptions(keywords_file_path)
+        print(Fore.GREEN + f"Loaded {len(enabler_keywords)} enabler categories." + Style.RESET_ALL)
 
+        sentence_index = SentenceIndex(pdf_text)
     keyword_searcher = KeywordSearcher(enabler_keywords)
-    print(Fore.BLUE + "\n\n -> Searching for keyword occurrences in PDF text..." + Style.RESET_ALL)
-    enabler_occurrences = keyword_searcher.check_enabler_occurrences(pdf_text)
-    total_occurrences = sum(len(occ) for occ in enabler_occurrences.values())
-    print(Fore.GREEN + f"Total keyword occurrences found: {total_occurrences}\n\n" + Style.RESET_ALL)
-
-    llm_analyzer = LLMAnalyzer(temperature=temperature, top_p=top_p, provider=provider, local_base_url=local_url)
+    if not stream:
+        print(Fore.BLUE + "\n\n -> Searching for keyword occurrences in PDF text..." + Style.RESET_ALL)
+        enabler_occurrences = keyword_searcher.check_enabler_occurrences(pdf_text, sentence_index)
+        total_occurrences = sum(len(occ) for occ in enabler_occurrences.values())
+        print(Fore.GREEN + f"Total keyword occurrences found: {total_occurrences}\n\n" + Style.RESET_ALL)
+
+    llm_analyzer = LLMAnalyzer(
+        temperature=temperature, top_p=top_p, provider=provider, local_base_url=local_url,
+        response_cache_path=llm_cache,
+    )
+    llm_analyzer.cascade = cascade
     keyword_occurrence_prompt = llm_analyzer.load_prompt("keyword_occurrence_prompt.txt")
 
     significant_files: SignificantFileMap = {}
 
-    for index, enabler in enumerate(enabler_occurrences.keys(), start=1):
+    for index, enabler in enumerate(enabler_keywords.keys(), start=1):
         file_path_candidate = (
             output_dir
             / f"{pdf_path.stem}_significant_paragraphs_category_{index}.txt"
@@ -454,17 +715,49 @@ def process_single_pdf(
         if file_path_candidate.exists():
             file_path_candidate.unlink()
 
-    filtered_enabler_occurrences = analyze_occurrences(
-        pdf_text,
-        enabler_occurrences,
-        keyword_occurrence_prompt,
-        llm_analyzer,
-        effective_model,
-        debug,
-        significant_files,
-        total_occurrences,
-        enabler_descriptions,
-    )
+    if stream:
+        print(Fore.CYAN + f"Streaming PDF file: {pdf_path}" + Style.RESET_ALL)
+        occurrence_stream = OccurrenceStream(
+            pdf_path, keyword_searcher, extract_workers=extract_workers
+        )
+        pdf_prefilter = document_prefilter(prefilter, occurrence_stream.sentence_index)
+        filtered_enabler_occurrences = analyze_occurrences_streaming(
+            occurrence_stream,
+            keyword_occurrence_prompt,
+            llm_analyzer,
+            effective_model,
+            debug,
+            significant_files,
+            enabler_descriptions,
+            batch_size,
+            journal,
+            pdf_prefilter,
+        )
+        enabler_occurrences = occurrence_stream.enabler_occurrences
+        total_occurrences = occurrence_stream.total_occurrences
+        print(Fore.BLUE + "\n\n\n-------------> PDF text extraction completed!!\n\n" + Style.RESET_ALL)
+        print(Fore.GREEN + f"Total keyword occurrences found: {total_occurrences}\n\n" + Style.RESET_ALL)
+    else:
+        pdf_prefilter = document_prefilter(prefilter, sentence_index)
+        filtered_enabler_occurrences = analyze_occurrences(
+            pdf_text,
+            enabler_occurrences,
+            keyword_occurrence_prompt,
+            llm_analyzer,
+            effective_model,
+            debug,
+            significant_files,
+            total_occurrences,
+            enabler_descriptions,
+            sentence_index,
+            batch_size,
+            journal,
+            pdf_prefilter,
+        )
+
+    prefilter_skipped = prefilter_counts(pdf_prefilter)
+    if prefilter_skipped is not None:
+        print(Fore.CYAN + describe_counts(prefilter_skipped) + Style.RESET_ALL)
 
     total_matches_summary = print_occurrences(filtered_enabler_occurrences)
 
@@ -477,7 +770,7 @@ def process_single_pdf(
         write_occurrences_summary(
             pdf_path, enabler_keywords, enabler_occurrences,
             filtered_enabler_occurrences, {},
-            output_dir=output_dir,
+            output_dir=output_dir, prefilter_skipped=prefilter_skipped,
         )
         return
 
@@ -497,7 +790,7 @@ def process_single_pdf(
         write_occurrences_summary(
             pdf_path, enabler_keywords, enabler_occurrences,
             filtered_enabler_occurrences, classified_keywords,
-            output_dir=output_dir,
+            output_dir=output_dir, prefilter_skipped=prefilter_skipped,
         )
         return
 
@@ -537,11 +830,18 @@ def process_single_pdf(
             "{significant_paragraphs}", significant_paragraphs_str
         )
 
-        # Get the model used
-        selected_model = effective_model if effective_model else llm_analyzer.get_random_model()
-        
-        # Call LLM and collect output
-        analysis = llm_analyzer.analyze({}, final_prompt_with_paragraphs, None, selected_model)
+        recorded = journal.category_analysis(category_index) if journal is not None else None
+        if recorded is not None:
+            selected_model, analysis = recorded
+            print(Fore.CYAN + "Replayed category analysis from the run journal." + Style.RESET_ALL)
+        else:
+            # Get the model used
+            selected_model = effective_model if effective_model else llm_analyzer.get_random_model()
+
+            # Call LLM and collect output
+            analysis = llm_analyzer.analyze({}, final_prompt_with_paragraphs, None, selected_model)
+            if journal is not None:
+                journal.record_category_analysis(category_index, enabler, selected_model, analysis)
 
         # Format the output like the screen
         category_output = (
@@ -588,7 +888,7 @@ def process_single_pdf(
     write_occurrences_summary(
         pdf_path, enabler_keywords, enabler_occurrences,
         filtered_enabler_occurrences, classified_keywords,
-        output_dir=output_dir,
+        output_dir=output_dir, prefilter_skipped=prefilter_skipped,
     )
 
     # Print token usage summary and save to file
@@ -626,6 +926,27 @@ def process_single_pdf(
         pass
 
 
+def method1_fingerprint(args: argparse.Namespace, keywords_path: Path) -> str:
+    """Fingerprint of everything that determines a PDF's Method 1 outputs (``--incremental``)."""
+    return config_fingerprint(
+        method="method1",
+        keywords=content_digest(keywords_path),
+        keyword_occurrence_prompt=content_digest("keyword_occurrence_prompt.txt"),
+        final_prompt=content_digest("final_prompt.txt"),
+        model=args.model,
+        temperature=args.temperature,
+        top_p=args.top_p,
+        provider=args.provider,
+        local_url=args.local_url,
+        min_representative_matches=args.min_representative_matches,
+        batch_size=args.batch_size,
+        prefilter=args.prefilter,
+        prefilter_model=content_digest(args.prefilter_model) if args.prefilter_model else None,
+        cascade=args.cascade,
+        cascade_min_confidence=args.cascade_min_confidence if args.cascade else None,
+    )
+
+
 def parse_arguments() -> argparse.Namespace:
     """Parse command-line arguments."""
 
@@ -722,6 +1043,116 @@ def parse_arguments() -> argparse.Namespace:
         dest="local_url",
         help="Override the local LLM base URL (default: http://192.168.0.200:8080/v1).",
     )
+    parser.add_argument(
+        "--llm-cache",
+        default=None,
+        dest="llm_cache",
+        metavar="PATH",
+        help="Opt-in SQLite file caching LLM replies by provider, model, sampling params "
+             "and prompt. Repeated requests are replayed at zero cost (best with --temperature 0).",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1,
+        dest="batch_size",
+        help="Occurrences of one enabler classified per LLM call (default: 1 = one call per "
+             "occurrence, valid range: 1..50). Unparseable batch replies fall back to single calls.",
+    )
+    parser.add_argument(
+        "--async-llm",
+        action="store_true",
+        dest="async_llm",
+        help="With --parallel, run the occurrence filter on one asyncio event loop "
+             "(AsyncOpenAI) instead of a thread pool; see --max-concurrency.",
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=100,
+        dest="max_concurrency",
+        help="In-flight LLM requests per process with --async-llm (default: 100, "
+             "valid range: 1..1000).",
+    )
+    parser.add_argument(
+        "--rate-limit-rpm",
+        type=float,
+        default=None,
+        dest="rate_limit_rpm",
+        metavar="RPM",
+        help="With --parallel, pace LLM requests with an adaptive limiter shared by all "
+             "threads and processes, starting at RPM requests/min per model and adjusting "
+             "from 429s and rate-limit headers (default: off).",
+    )
+    parser.add_argument(
+        "--scheduler",
+        choices=["per-pdf", "global"],
+        default="per-pdf",
+        help="With --parallel: 'per-pdf' (default) pins one PDF per process and drains one "
+             "thread pool per category; 'global' feeds the occurrences of all PDFs and "
+             "categories to one fleet of max-workers x num-processes threads.",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Pipeline PDF extraction, keyword search and occurrence filtering: LLM calls "
+             "start while later pages are still being parsed (sequential or --parallel "
+             "with the default scheduler; not with --async-llm).",
+    )
+    parser.add_argument(
+        "--extract-workers",
+        type=int,
+        default=1,
+        dest="extract_workers",
+        help="Processes that parse one PDF in page-range shards (default: 1; 0 = all cores). "
+             "With --parallel each of the --num-processes workers uses this many.",
+    )
+    parser.add_argument(
+        "--resume",
+        default=None,
+        metavar="RUN_DIR",
+        help="Continue an interrupted run in RUN_DIR (a Results/<timestamp> directory): "
+             "finished PDFs are skipped and recorded verdicts and category analyses are "
+             "replayed from its run journal. Use the same arguments as the original run.",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only process PDFs that are new or changed since an earlier --incremental run "
+             "(or whose keywords, prompts, model or sampling options changed); the outputs "
+             "of the others are linked into the new run directory from Results/manifest_method1.json.",
+    )
+    parser.add_argument(
+        "--prefilter",
+        action="store_true",
+        help="Reject obvious reference-list, citation and header/footer hits locally as "
+             "'not significant' instead of asking the LLM (see prefilter.py).",
+    )
+    parser.add_argument(
+        "--prefilter-model",
+        default=None,
+        dest="prefilter_model",
+        metavar="PATH",
+        help="With --prefilter: also skip hits that this model (trained with "
+             "'python prefilter.py train') rejects with high confidence.",
+    )
+    parser.add_argument(
+        "--cascade",
+        default=None,
+        metavar="MODELS",
+        help="Comma-separated models, cheapest first (e.g. 'openai/gpt-4.1-nano,openai/gpt-4.1'). "
+             "Each occurrence is asked to the first model; replies below "
+             "--cascade-min-confidence (from token logprobs) escalate to the next one. "
+             "Replaces --model for the occurrence filter only. Requires --batch-size 1.",
+    )
+    parser.add_argument(
+        "--cascade-min-confidence",
+        type=float,
+        default=DEFAULT_MIN_CONFIDENCE,
+        dest="cascade_min_confidence",
+        help=f"Minimum reply probability a cascade tier needs to stop "
+             f"(default: {DEFAULT_MIN_CONFIDENCE}).",
+    )
     return parser.parse_args()
 
 
@@ -763,14 +1194,112 @@ def main() -> None:
                 + Style.RESET_ALL
             )
 
+    if args.async_llm:
+        if not args.parallel:
+            print(
+                Fore.RED + "Error: --async-llm requires --parallel." + Style.RESET_ALL
+            )
+            sys.exit(1)
+        if args.max_concurrency < 1 or args.max_concurrency > 1000:
+            print(
+                Fore.RED
+                + f"Error: --max-concurrency must be between 1 and 1000 (got {args.max_concurrency})."
+                + Style.RESET_ALL
+            )
+            sys.exit(1)
+
+    if args.scheduler == "global":
+        if not args.parallel:
+            print(
+                Fore.RED + "Error: --scheduler global requires --parallel." + Style.RESET_ALL
+            )
+            sys.exit(1)
+        if args.async_llm:
+            print(
+                Fore.RED
+                + "Error: --scheduler global cannot be combined with --async-llm."
+                + Style.RESET_ALL
+            )
+            sys.exit(1)
+
+    if args.stream and (args.async_llm or args.scheduler == "global"):
+        print(
+            Fore.RED
+            + "Error: --stream cannot be combined with --async-llm or --scheduler global."
+            + Style.RESET_ALL
+        )
+        sys.exit(1)
+
+    if args.rate_limit_rpm is not None:
+        if not args.parallel:
+            print(
+                Fore.RED + "Error: --rate-limit-rpm requires --parallel." + Style.RESET_ALL
+            )
+            sys.exit(1)
+        if args.rate_limit_rpm <= 0:
+            print(
+                Fore.RED
+                + f"Error: --rate-limit-rpm must be > 0 (got {args.rate_limit_rpm})."
+                + Style.RESET_ALL
+            )
+            sys.exit(1)
+
+    if args.extract_workers < 0:
+        print(
+            Fore.RED
+            + f"Error: --extract-workers must be >= 0 (got {args.extract_workers})."
+            + Style.RESET_ALL
+        )
+        sys.exit(1)
+    from sharded_extraction import resolve_workers
+    args.extract_workers = resolve_workers(args.extract_workers)
+
+    if args.batch_size < 1 or args.batch_size > 50:
+        print(
+            Fore.RED
+            + f"Error: --batch-size must be between 1 and 50 (got {args.batch_size})."
+            + Style.RESET_ALL
+        )
+        sys.exit(1)
+
+    prefilter = None
+    if args.prefilter_model is not None:
+        if not args.prefilter:
+            print(Fore.RED + "Error: --prefilter-model requires --prefilter." + Style.RESET_ALL)
+            sys.exit(1)
+        if not Path(args.prefilter_model).is_file():
+            print(
+                Fore.RED
+                + f"Error: Pre-filter model not found: {args.prefilter_model}"
+                + Style.RESET_ALL
+            )
+            sys.exit(1)
+    if args.prefilter:
+        prefilter = PreFilterSettings(model_path=args.prefilter_model)
+
+    cascade = None
+    if args.cascade is not None:
+        if args.batch_size != 1:
+            print(Fore.RED + "Error: --cascade requires --batch-size 1." + Style.RESET_ALL)
+            sys.exit(1)
+        try:
+            cascade = CascadeSettings.parse(args.cascade, args.cascade_min_confidence)
+        except ValueError as e:
+            print(Fore.RED + f"Error: {e}" + Style.RESET_ALL)
+            sys.exit(1)
+
     source_folder = Path(args.source_folder)
     keywords_path = Path(args.keywords_path)
 
     # -- STATISTICS_SPEC v1.3 — Etapa E8 (CLI sampling validation) --
-    if args.model != "random":
+    checked_models = [args.model] if args.model != "random" else []
+    if cascade is not None:
+        checked_models += cascade.tiers
+    if checked_models:
         from llm_query import validate_sampling_for_model
         try:
-            validate_sampling_for_model(args.model, args.temperature, args.top_p, strict=True)
+            for checked_model in checked_models:
+                validate_sampling_for_model(checked_model, args.temperature, args.top_p, strict=True)
         except ValueError as e:
             print(Fore.RED + str(e) + Style.RESET_ALL)
             sys.exit(2)
@@ -815,17 +1344,59 @@ def main() -> None:
         print(f"  {relative_index}: {file_path.name}")
 
     # -- STATISTICS_SPEC v1.3 — R7 (Results directory with timestamped runs) --
-    from datetime import datetime as _dt
-    results_base = source_folder / "Results"
-    run_timestamp = _dt.now().strftime("%Y-%m-%d_%H-%M-%S")
-    run_dir = results_base / run_timestamp
-    run_dir.mkdir(parents=True, exist_ok=True)
-    print(Fore.GREEN + f"Results will be saved to: {run_dir}" + Style.RESET_ALL)
-
-    # -- PARALLELIZATION_SPEC v2.0 — Etapa 5 (routing) --
-    if args.parallel:
-        from parallel import run_pipeline_parallel
-        run_pipeline_parallel(
+    if args.resume is not None:
+        run_dir = Path(args.resume)
+        if not journal_path_for(run_dir).is_file():
+            print(
+                Fore.RED
+                + f"Error: No run journal found in {run_dir} (expected {JOURNAL_FILE_NAME})."
+                + Style.RESET_ALL
+            )
+            sys.exit(1)
+        print(Fore.GREEN + f"Resuming run in: {run_dir}" + Style.RESET_ALL)
+    else:
+        from datetime import datetime as _dt
+        results_base = source_folder / "Results"
+        run_timestamp = _dt.now().strftime("%Y-%m-%d_%H-%M-%S")
+        run_dir = results_base / run_timestamp
+        run_dir.mkdir(parents=True, exist_ok=True)
+        print(Fore.GREEN + f"Results will be saved to: {run_dir}" + Style.RESET_ALL)
+
+    # Crash-safe run journal (see run_journal.py); always written so any
+    # run can be resumed.
+    journal_path = journal_path_for(run_dir)
+    run_journal = RunJournal(journal_path)
+    finished = run_journal.finished_pdfs()
+    skipped: List[Path] = []
+    if finished:
+        skipped = [path for path in files_to_process if path.name in finished]
+        files_to_process = [path for path in files_to_process if path.name not in finished]
+        print(
+            Fore.CYAN
+            + f"Skipping {len(skipped)} PDF(s) already finished in this run."
+            + Style.RESET_ALL
+        )
+
+    # Incremental corpus mode (see corpus_manifest.py): unchanged PDFs reuse
+    # the outputs recorded in the manifest instead of being processed again.
+    manifest = None
+    if args.incremental:
+        manifest = CorpusManifest(source_folder / "Results", "method1")
+        fingerprint = method1_fingerprint(args, keywords_path)
+        files_to_process, reused = manifest.partition(files_to_process, fingerprint, run_dir)
+        if reused:
+            print(
+                Fore.CYAN
+                + f"Reusing the outputs of {len(reused)} unchanged PDF(s): "
+                + ", ".join(path.name for path in reused)
+                + Style.RESET_ALL
+            )
+
+    if not files_to_process:
+        print(Fore.GREEN + "All selected files were already processed." + Style.RESET_ALL)
+    elif args.parallel and args.scheduler == "global":
+        from global_scheduler import run_pipeline_global
+        run_pipeline_global(
             files=files_to_process,
             keywords_path=keywords_path,
             max_workers=args.max_workers,
@@ -839,34 +1410,90 @@ def main() -> None:
             output_dir=run_dir,
             provider=args.provider,
             local_url=args.local_url,
+            llm_cache=args.llm_cache,
+            batch_size=args.batch_size,
+            rate_limit_rpm=args.rate_limit_rpm,
+            extract_workers=args.extract_workers,
+            journal_path=str(journal_path),
+            prefilter=prefilter,
+            cascade=cascade,
         )
-        return
-
-    for file_path in files_to_process:
-        print(
-            Fore.BLUE
-            + f"\n\n-------------> Starting processing for file: {file_path.name}"
-            + Style.RESET_ALL
-        )
-        process_single_pdf(
-            file_path,
-            keywords_path,
+    elif args.parallel:
+        from parallel import run_pipeline_parallel
+        run_pipeline_parallel(
+            files=files_to_process,
+            keywords_path=keywords_path,
+            max_workers=args.max_workers,
+            num_processes=args.num_processes,
             min_representative_matches=args.min_representative_matches,
             model_name=args.model,
-            debug=args.debug,
+            log_level=args.log_level,
+            profile=args.profile,
             temperature=args.temperature,
             top_p=args.top_p,
             output_dir=run_dir,
             provider=args.provider,
             local_url=args.local_url,
+            llm_cache=args.llm_cache,
+            batch_size=args.batch_size,
+            async_llm=args.async_llm,
+            max_concurrency=args.max_concurrency,
+            rate_limit_rpm=args.rate_limit_rpm,
+            stream=args.stream,
+            extract_workers=args.extract_workers,
+            journal_path=str(journal_path),
+            prefilter=prefilter,
+            cascade=cascade,
         )
-        print(
-            Fore.BLUE
-            + f"\n-------------> Finished processing for file: {file_path.name}\n\n"
-            + Style.RESET_ALL
-        )
+    else:
+        for file_path in files_to_process:
+            print(
+                Fore.BLUE
+                + f"\n\n-------------> Starting processing for file: {file_path.name}"
+                + Style.RESET_ALL
+            )
+            process_single_pdf(
+                file_path,
+                keywords_path,
+                min_representative_matches=args.min_representative_matches,
+                model_name=args.model,
+                debug=args.debug,
+                temperature=args.temperature,
+                top_p=args.top_p,
+                output_dir=run_dir,
+                provider=args.provider,
+                local_url=args.local_url,
+                llm_cache=args.llm_cache,
+                batch_size=args.batch_size,
+                stream=args.stream,
+                extract_workers=args.extract_workers,
+                journal_path=journal_path,
+                prefilter=prefilter,
+                cascade=cascade,
+            )
+            run_journal.mark_finished(file_path)
+            print(
+                Fore.BLUE
+                + f"\n-------------> Finished processing for file: {file_path.name}\n\n"
+                + Style.RESET_ALL
+            )
 
-    print(Fore.GREEN + "All selected files processed." + Style.RESET_ALL)
+        print(Fore.GREEN + "All selected files processed." + Style.RESET_ALL)
+
+    if manifest is not None:
+        finished = run_journal.finished_pdfs()
+        # PDFs finished before a --resume were dropped from files_to_process
+        # above; their outputs are in run_dir too.
+        manifest.record_all(
+            skipped + [path for path in files_to_process if path.name in finished], fingerprint, run_dir
+        )
+        manifest.save()
+        # Aggregate tables over the full corpus (processed + reused PDFs).
+        try:
+            from generate_notes_table import generate_latex_table
+            generate_latex_table(str(run_dir), str(keywords_path))
+        except ImportError:
+            pass
 
 
 if __name__ == "__main__":  # pragma: no cover - CLI entry point
@@ -0,0 +1,160 @@
+"""Multi-category requests for Method 2 (``full_pdf_analyzer.py --multi-category``).
+
+By default ``FullPDFAnalyzer`` sends one request per (PDF, category), so the
+full paper text is uploaded once per category. With ``--multi-category``
+the categories are packed into as few requests as fit the prompt budget
+(see ``chunked_analysis.context_window``), usually one per PDF, and the
+model answers with one JSON object holding a paragraph and a note for every
+category in the request (:data:`MULTI_CATEGORY_PREFIX` +
+:data:`MULTI_CATEGORY_SUFFIX`).
+
+The paper text comes first and the category list last, so the requests of
+one PDF share a prefix that providers can cache (``prompt_layout``).
+
+:func:`parse_multi_category_reply` accepts code fences, text around the
+object, a bare ``{category: {...}}`` mapping or a list of entries, loosely
+matched category names and notes such as ``"8/10"``. A category whose
+paragraph or note cannot be read is asked again on its own with the usual
+per-category prompt, so a bad reply costs extra calls but never a result.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from prompt_layout import CacheablePrompt
+
+# Completion tokens kept free per category in a request (one paragraph + JSON).
+REPLY_TOKENS_PER_CATEGORY = 400
+
+MULTI_CATEGORY_PREFIX = """You are an expert assistant analyzing a scientific paper for coverage of technological criteria.
+
+FULL PAPER TEXT:
+{pdf_text}
+"""
+
+MULTI_CATEGORY_SUFFIX = """
+CONTEXT:
+You are going to analyse the following enablers/categories, each listed with its associated keywords:
+{category_list}
+
+TASK:
+For EACH category above, considering the paper text, write no more than ONE SINGLE PARAGRAPH summarizing how well the paper covers the category based on its keywords and the general content. Considering all above and the current state of the art in the article area, give each category a note between 0 and 10.
+
+Answer in English with ONLY a JSON object and no other text, using the category names exactly as listed:
+{{"categories": {{"<category>": {{"paragraph": "<single paragraph>", "note": <number between 0 and 10>}}}}}}"""
+
+_NOTE_RE = re.compile(r"-?\d+(?:\.\d+)?")
+
+
+def build_multi_category_prompt(pdf_text: str, categories: Mapping[str, Sequence[str]]) -> CacheablePrompt:
+    """Prompt asking for every category of *categories* at once."""
+    category_list = "\n".join(f"- {name}: {', '.join(keywords)}" for name, keywords in categories.items())
+    return CacheablePrompt(
+        MULTI_CATEGORY_PREFIX.format(pdf_text=pdf_text),
+        MULTI_CATEGORY_SUFFIX.format(category_list=category_list),
+    )
+
+
+def group_categories(
+    pdf_text: str,
+    categories: Mapping[str, Sequence[str]],
+    budget: int,
+    count: Callable[[str], int],
+    max_per_request: Optional[int] = None,
+) -> List[List[str]]:
+    """Pack the category names, in order, into requests that fit *budget* tokens.
+
+    Each category costs its line in the prompt plus
+    :data:`REPLY_TOKENS_PER_CATEGORY` of reply. A category that does not fit
+    even on its own gets a group of its own (the caller analyses it alone).
+    """
+    overhead = count(str(build_multi_category_prompt(pdf_text, {})))
+    groups: List[List[str]] = []
+    current: List[str] = []
+    used = overhead
+    for name, keywords in categories.items():
+        cost = count(f"- {name}: {', '.join(keywords)}\n") + REPLY_TOKENS_PER_CATEGORY
+        full = max_per_request is not None and len(current) >= max_per_request
+        if current and (full or used + cost > budget):
+            groups.append(current)
+            current, used = [], overhead
+        current.append(name)
+        used += cost
+    if current:
+        groups.append(current)
+    return groups
+
+
+def parse_multi_category_reply(reply: str, names: Sequence[str]) -> Dict[str, Tuple[str, float]]:
+    """Return ``{category: (paragraph, note)}`` for the categories read from *reply*.
+
+    Categories of *names* that are missing or malformed are left out.
+    """
+    data = _load_json_object(reply or "")
+    if data is None:
+        return {}
+    entries = data.get("categories", data) if isinstance(data, dict) else data
+    if isinstance(entries, list):
+        entries = {
+            entry.get("category") or entry.get("name"): entry
+            for entry in entries
+            if isinstance(entry, dict)
+        }
+    if not isinstance(entries, dict):
+        return {}
+
+    by_key = {_name_key(name): name for name in names}
+    parsed: Dict[str, Tuple[str, float]] = {}
+    for raw_name, entry in entries.items():
+        name = by_key.get(_name_key(str(raw_name)))
+        if name is None or name in parsed or not isinstance(entry, dict):
+            continue
+        paragraph = entry.get("paragraph")
+        note = _parse_note(entry.get("note"))
+        if isinstance(paragraph, str) and paragraph.strip() and note is not None:
+            parsed[name] = (paragraph.strip(), note)
+    return parsed
+
+
+def format_category_response(paragraph: str, note: float) -> str:
+    """The per-category reply text, in the format of the single-category prompt."""
+    return f"{paragraph}\nNOTE: {note:g}"
+
+
+def _load_json_object(reply: str):
+    text = reply.strip()
+    if text.startswith("```"):
+        text = re.sub(r"^```[a-zA-Z]*\s*|\s*```$", "", text)
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end <= start:
+        return None
+    try:
+        return json.loads(text[start:end + 1])
+    except ValueError:
+        return None
+
+
+def _name_key(name: str) -> str:
+    return re.sub(r"\s+", " ", name.strip().strip("'\"")).lower()
+
+
+def _parse_note(value) -> Optional[float]:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        note = float(value)
+    elif isinstance(value, str):
+        match = _NOTE_RE.search(value)
+        if match is None:
+            return None
+        note = float(match.group(0))
+    else:
+        return None
+    return min(10.0, max(0.0, note))
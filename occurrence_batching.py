@@ -0,0 +1,206 @@
+"""Batched occurrence classification for Method 1's significance filter.
+
+Instead of one chat completion per keyword hit, up to ``batch_size``
+occurrences of the same enabler are packed into one request as numbered
+passages. The ``keyword_occurrence_prompt.txt`` preamble is sent once per
+batch and the reply is parsed back into one verdict per passage.
+
+Fallback contract: if the batched call fails or its reply cannot be parsed,
+every passage without a verdict is re-asked with the regular single-item
+prompt (``build_occurrence_prompt``), so a batch can never lose occurrences
+compared to the unbatched path. ``openai.RateLimitError`` is re-raised
+untouched so the parallel layer can apply its 429 retry policy.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from typing import Awaitable, Callable, List, Optional, Sequence, Tuple
+
+from openai import RateLimitError
+
+from prompt_layout import CacheablePrompt
+
+# (keyword, extended_context) for one passage of a batch
+BatchItem = Tuple[str, str]
+
+_VERDICT_LINE_RE = re.compile(
+    r"^\W*(?:passage\s*)?\[?(\d+)\]?\s*[:.)\-=]+\s*\**\s*"
+    r"(not[\s_-]+significant|non[\s_-]*significant|insignificant|significant)\b",
+    re.IGNORECASE,
+)
+
+
+def build_occurrence_prompt(
+    prompt_template: str,
+    enabler: str,
+    keyword: str,
+    extended_context: str,
+    description: str = "",
+) -> str:
+    """Return the single-occurrence prompt used by the unbatched filter.
+
+    Everything up to the description is the same for every occurrence of
+    *enabler* and forms the cacheable prefix (see ``prompt_layout``).
+    """
+    desc_line = f"\nDescription: {description}" if description else ""
+    return CacheablePrompt(
+        f"{prompt_template}\n\nEnabler: {enabler}{desc_line}\n",
+        f"Keyword: {keyword}\nContext:\n{extended_context}",
+    )
+
+
+def build_batch_prompt(
+    prompt_template: str,
+    enabler: str,
+    items: Sequence[BatchItem],
+    description: str = "",
+) -> str:
+    """Return one prompt asking for a verdict on every numbered passage in *items*."""
+    desc_line = f"\nDescription: {description}" if description else ""
+    passages = "\n\n".join(
+        f"[{number}]\nKeyword: {keyword}\nContext:\n{extended_context}"
+        for number, (keyword, extended_context) in enumerate(items, start=1)
+    )
+    count = len(items)
+    return CacheablePrompt(
+        f"{prompt_template}\n\nEnabler: {enabler}{desc_line}\n\n",
+        f"BATCH MODE: evaluate each of the {count} numbered passages below independently, "
+        f"applying the criteria above to its own Keyword and Context.\n\n"
+        f"{passages}\n\n"
+        f"Output: exactly {count} lines, one per passage in order, each formatted as "
+        f'"<number>: significant" or "<number>: not significant". No other text.'
+    )
+
+
+def parse_batch_verdicts(reply: str | None, count: int) -> List[Optional[bool]]:
+    """Parse a batched reply into one verdict per passage.
+
+    Returns a list of length *count* holding ``True`` (significant),
+    ``False`` (not significant) or ``None`` when the passage has no usable
+    verdict (missing, out of range or contradictory).
+    """
+    verdicts: List[Optional[bool]] = [None] * count
+    conflicting: set[int] = set()
+    for line in (reply or "").splitlines():
+        match = _VERDICT_LINE_RE.match(line.strip())
+        if not match:
+            continue
+        index = int(match.group(1)) - 1
+        if not 0 <= index < count:
+            continue
+        verdict = match.group(2).lower() == "significant"
+        if verdicts[index] is not None and verdicts[index] != verdict:
+            conflicting.add(index)
+        verdicts[index] = verdict
+    for index in conflicting:
+        verdicts[index] = None
+    return verdicts
+
+
+def classify_occurrence_batch(
+    llm_analyzer,
+    prompt_template: str,
+    enabler: str,
+    items: Sequence[BatchItem],
+    model_name: str | None,
+    description: str = "",
+    single_call: Callable[[str], str] | None = None,
+) -> List[Optional[bool]]:
+    """Classify *items* with one batched call, falling back to single calls.
+
+    Returns one entry per item: ``True``/``False`` for a verdict, ``None``
+    when even the single-item fallback failed (the unbatched path skips such
+    occurrences too). *single_call* sends one single-item prompt and returns
+    the reply; it defaults to ``llm_analyzer.analyze_single_occurrence`` and
+    lets callers wrap it with their own retry policy.
+    """
+    if single_call is None:
+        def single_call(prompt_text: str) -> str:
+            return llm_analyzer.analyze_single_occurrence(prompt_text, model_name)
+
+    verdicts: List[Optional[bool]] = [None] * len(items)
+    if len(items) > 1:
+        batch_prompt = build_batch_prompt(prompt_template, enabler, items, description)
+        try:
+            reply = llm_analyzer.analyze_single_occurrence(batch_prompt, model_name)
+            verdicts = parse_batch_verdicts(reply, len(items))
+        except RateLimitError:
+            raise
+        except Exception as exc:  # pragma: no cover - defensive
+            logging.debug("Batched LLM call failed for enabler=%r: %s", enabler, exc)
+
+    for index in _missing_verdicts(verdicts, enabler):
+        keyword, extended_context = items[index]
+        prompt_text = build_occurrence_prompt(
+            prompt_template, enabler, keyword, extended_context, description
+        )
+        try:
+            reply = single_call(prompt_text)
+        except RateLimitError:
+            raise
+        except Exception as exc:  # pragma: no cover - defensive
+            logging.debug("LLM call failed for keyword=%r: %s", keyword, exc)
+            continue
+        verdicts[index] = _is_significant(reply)
+    return verdicts
+
+
+async def aclassify_occurrence_batch(
+    llm_analyzer,
+    prompt_template: str,
+    enabler: str,
+    items: Sequence[BatchItem],
+    model_name: str | None,
+    description: str = "",
+    single_call: Callable[[str], Awaitable[str]] | None = None,
+) -> List[Optional[bool]]:
+    """Coroutine counterpart of :func:`classify_occurrence_batch`.
+
+    *llm_analyzer* must be an ``llm_query.AsyncLLMAnalyzer``; *single_call*
+    is an async callable and defaults to its ``aanalyze_single_occurrence``.
+    """
+    if single_call is None:
+        async def single_call(prompt_text: str) -> str:
+            return await llm_analyzer.aanalyze_single_occurrence(prompt_text, model_name)
+
+    verdicts: List[Optional[bool]] = [None] * len(items)
+    if len(items) > 1:
+        batch_prompt = build_batch_prompt(prompt_template, enabler, items, description)
+        try:
+            reply = await llm_analyzer.aanalyze_single_occurrence(batch_prompt, model_name)
+            verdicts = parse_batch_verdicts(reply, len(items))
+        except RateLimitError:
+            raise
+        except Exception as exc:  # pragma: no cover - defensive
+            logging.debug("Batched LLM call failed for enabler=%r: %s", enabler, exc)
+
+    for index in _missing_verdicts(verdicts, enabler):
+        keyword, extended_context = items[index]
+        prompt_text = build_occurrence_prompt(
+            prompt_template, enabler, keyword, extended_context, description
+        )
+        try:
+            reply = await single_call(prompt_text)
+        except RateLimitError:
+            raise
+        except Exception as exc:  # pragma: no cover - defensive
+            logging.debug("LLM call failed for keyword=%r: %s", keyword, exc)
+            continue
+        verdicts[index] = _is_significant(reply)
+    return verdicts
+
+
+def _missing_verdicts(verdicts: List[Optional[bool]], enabler: str) -> List[int]:
+    missing = [index for index, verdict in enumerate(verdicts) if verdict is None]
+    if missing and len(verdicts) > 1:
+        logging.debug(
+            "Batch reply for enabler=%r unusable for %d/%d passages; falling back to single calls",
+            enabler, len(missing), len(verdicts),
+        )
+    return missing
+
+
+def _is_significant(reply: str | None) -> bool:
+    return bool(reply) and reply.strip().lower() == "significant"
@@ -0,0 +1,97 @@
+"""Context-level deduplication of keyword occurrences before the LLM filter.
+
+A sentence holding three keywords of one enabler, or a boilerplate
+sentence repeated on every page, yields several occurrences whose
+extended contexts are identical. The paragraph dedup of the filters
+(``seen_paragraphs`` / ``SharedAccumulator.record_significant``) only
+drops them *after* each one was sent to the LLM.
+
+:class:`ContextDedup` groups the occurrences of one PDF by ``(enabler,
+normalized extended context)`` before any call: the first occurrence of a
+group is asked, and its verdict is fanned out to the other members. Every
+member still lands in the filtered map (``classify_keywords`` counts are
+unchanged) and in the run journal; only the duplicate calls disappear.
+The prompt of a group carries its first member's keyword.
+
+Safe to share between the worker threads of one PDF.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+Occurrence = Tuple[int, str, str, int]              # (page, keyword, paragraph, abs_start)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def context_key(extended_context: str) -> str:
+    """Normalize an extended context for grouping (case and whitespace)."""
+    return _WHITESPACE.sub(" ", extended_context).strip().casefold()
+
+
+class _Group:
+    __slots__ = ("representative", "verdict", "waiting")
+
+    def __init__(self, representative: Occurrence) -> None:
+        self.representative = representative
+        self.verdict: Optional[bool] = None
+        self.waiting: List[Occurrence] = []
+
+
+class ContextDedup:
+    """Verdict sharing between the occurrences of one PDF with the same context."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._groups: Dict[Tuple[str, str], _Group] = {}
+        self._represented: Dict[Tuple[str, str, int], Tuple[str, str]] = {}
+        self.shared = 0  # occurrences decided by another member's call
+
+    def claim(self, enabler: str, occurrence: Occurrence, extended_context: str) -> Tuple[bool, Optional[bool]]:
+        """Register *occurrence*; return ``(ask, verdict)``.
+
+        ``ask`` is True when *occurrence* opens a new group and must be sent
+        to the LLM (then :meth:`resolve` it). Otherwise ``verdict`` is the
+        group's verdict, or None while its representative is still in
+        flight: the occurrence is then returned by that :meth:`resolve`.
+        """
+        group_key = (enabler, context_key(extended_context))
+        with self._lock:
+            group = self._groups.get(group_key)
+            if group is None:
+                group = self._groups[group_key] = _Group(occurrence)
+                self._represented[(enabler, occurrence[1], occurrence[3])] = group_key
+                return True, None
+            self.shared += 1
+            if group.verdict is None:
+                group.waiting.append(occurrence)
+            return False, group.verdict
+
+    def plan(self, enabler: str, occurrences: List[Occurrence], contexts: List[str]) -> List[Occurrence]:
+        """Claim every occurrence of *enabler*; return the ones to send, in order."""
+        return [
+            occurrence
+            for occurrence, extended_context in zip(occurrences, contexts)
+            if self.claim(enabler, occurrence, extended_context)[0]
+        ]
+
+    def resolve(self, enabler: str, occurrence: Occurrence, verdict: Optional[bool]) -> List[Occurrence]:
+        """Record the verdict of a representative; return the members waiting for it.
+
+        A failed call (``verdict=None``) releases its waiting members
+        undecided and lets the next member of the group be asked.
+        """
+        with self._lock:
+            group_key = self._represented.pop((enabler, occurrence[1], occurrence[3]), None)
+            if group_key is None:
+                return []
+            group = self._groups[group_key]
+            waiting, group.waiting = group.waiting, []
+            if verdict is None:
+                del self._groups[group_key]
+            else:
+                group.verdict = verdict
+            return waiting
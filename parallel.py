@@ -6,6 +6,9 @@ in ``PARALLELIZATION_SPEC.md`` v2.0. The full pipeline is split into
 ``SharedAccumulator`` (thread-safe result collection), the
 ``analyze_occurrences_parallel`` coordinator (per-category thread pool +
 post-pool file writes), and the multi-PDF driver filled in by later steps.
+``parallel_async.py`` provides the asyncio variant of the coordinator used
+with ``--async-llm``; ``analyze_occurrences_streaming_parallel`` is the
+pipelined variant used with ``--stream`` (see ``streaming.py``).
 
 Design contracts (do not change without spec update):
     * ``_evaluate_one_occurrence`` mirrors the prompt construction used by
@@ -26,6 +29,7 @@ import logging
 import re
 import threading
 import time
+from dataclasses import dataclass
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple
 
@@ -33,6 +37,11 @@ from colorama import Fore, Style
 from openai import RateLimitError
 from tqdm import tqdm
 
+from occurrence_batching import build_occurrence_prompt, classify_occurrence_batch
+from occurrence_dedup import ContextDedup
+from prefilter import decided_verdict, describe_counts, document_prefilter, prefilter_counts
+from run_journal import RunJournal
+
 if TYPE_CHECKING:
     # Only needed for type-checking of SignificantFileMap values; imported
     # lazily to avoid forcing the path dependency on every load.
@@ -69,11 +78,18 @@ def _evaluate_one_occurrence(
     abs_start: int,
     prompt_template: str,
     model_name,
+    sentence_index=None,
+    extended_context: str | None = None,
+    journal=None,
 ) -> FilteredOccurrence | None:
     """Call the LLM to decide whether one keyword occurrence is significant.
 
     Returns ``(page_num, keyword, paragraph)`` if the LLM answer (case
     insensitive, stripped) equals ``"significant"``, else ``None``.
+    ``extended_context`` skips the context lookup when the caller already
+    has it (the streaming path, whose sentence index is still growing).
+    The verdict is appended to the run ``journal`` (a
+    :class:`run_journal.PdfJournal`) when one is given.
 
     Retry policy:
         * ``openai.RateLimitError`` (HTTP 429): exponential backoff
@@ -89,38 +105,118 @@ def _evaluate_one_occurrence(
     # fully loaded.
     from main import extract_extended_context
 
-    extended_context = extract_extended_context(
-        pdf_text, abs_start, abs_start + len(keyword)
-    )
-    prompt_text = (
-        f"{prompt_template}\n\n"
-        f"Enabler: {enabler}\n"
-        f"Keyword: {keyword}\n"
-        f"Context:\n{extended_context}"
+    if extended_context is None:
+        extended_context = extract_extended_context(
+            pdf_text, abs_start, abs_start + len(keyword), sentence_index
+        )
+    prompt_text = build_occurrence_prompt(
+        prompt_template, enabler, keyword, extended_context
     )
 
+    try:
+        response = _retry_on_rate_limit(
+            lambda: llm_analyzer.analyze_single_occurrence(prompt_text, model_name),
+            f"keyword={keyword!r} page={page_num}",
+            paced=_is_paced(llm_analyzer),
+        )
+    except Exception as exc:  # pragma: no cover - defensive
+        logging.debug(
+            "LLM call failed (non-429) for keyword=%r page=%d: %s",
+            keyword, page_num, exc,
+        )
+        return None
+    significant = bool(response) and response.strip().lower() == "significant"
+    if journal is not None:
+        journal.record_verdicts(
+            enabler, [(page_num, keyword, paragraph, abs_start)], [significant]
+        )
+    if significant:
+        return (page_num, keyword, paragraph)
+    return None
+
+
+def _retry_on_rate_limit(call, label: str, paced: bool = False):
+    """Run ``call()`` retrying ``openai.RateLimitError`` with capped backoff forever.
+
+    With ``paced=True`` the analyzer has a ``rate_limiter`` that already
+    pauses the (provider, model) key after a 429, so the retry is sent
+    straight back to it instead of sleeping here as well.
+    """
     backoff = _BACKOFF_INITIAL
     while True:
         try:
-            response = llm_analyzer.analyze_single_occurrence(
-                prompt_text, model_name
-            )
-            if response and response.strip().lower() == "significant":
-                return (page_num, keyword, paragraph)
-            return None
+            return call()
         except RateLimitError:
-            logging.debug(
-                "429 rate limit for keyword=%r page=%d; sleeping %.1fs",
-                keyword, page_num, backoff,
-            )
+            if paced:
+                logging.debug("429 rate limit for %s; retrying through the rate limiter", label)
+                continue
+            logging.debug("429 rate limit for %s; sleeping %.1fs", label, backoff)
             time.sleep(backoff)
             backoff = min(backoff * 2.0, _BACKOFF_CAP)
-        except Exception as exc:  # pragma: no cover - defensive
-            logging.debug(
-                "LLM call failed (non-429) for keyword=%r page=%d: %s",
-                keyword, page_num, exc,
+
+
+def _is_paced(llm_analyzer) -> bool:
+    return getattr(llm_analyzer, "rate_limiter", None) is not None
+
+
+def _evaluate_occurrence_batch(
+    llm_analyzer,
+    enabler: str,
+    occurrences: List[Occurrence],
+    pdf_text: str,
+    prompt_template: str,
+    model_name,
+    sentence_index=None,
+    contexts: List[str] | None = None,
+    journal=None,
+) -> List[FilteredOccurrence | None]:
+    """Batched counterpart of ``_evaluate_one_occurrence``.
+
+    Classifies all *occurrences* (same enabler) with one LLM call through
+    :func:`occurrence_batching.classify_occurrence_batch` and returns one
+    entry per occurrence, in order: ``(page_num, keyword, paragraph)`` if
+    significant, else ``None``. The batched call and every single-item
+    fallback call get the same infinite 429 retry as the unbatched worker.
+    ``contexts`` are precomputed extended contexts, one per occurrence.
+    Decided verdicts are appended to the run ``journal`` when one is given.
+    """
+    from main import extract_extended_context
+
+    if contexts is None:
+        contexts = [
+            extract_extended_context(
+                pdf_text, abs_start, abs_start + len(keyword), sentence_index
             )
-            return None
+            for (_page_num, keyword, _paragraph, abs_start) in occurrences
+        ]
+    items = [
+        (keyword, extended_context)
+        for (_page_num, keyword, _paragraph, _abs_start), extended_context in zip(occurrences, contexts)
+    ]
+    label = f"enabler={enabler!r} batch of {len(items)}"
+    paced = _is_paced(llm_analyzer)
+    try:
+        verdicts = _retry_on_rate_limit(
+            lambda: classify_occurrence_batch(
+                llm_analyzer, prompt_template, enabler, items, model_name,
+                single_call=lambda prompt_text: _retry_on_rate_limit(
+                    lambda: llm_analyzer.analyze_single_occurrence(prompt_text, model_name),
+                    label,
+                    paced,
+                ),
+            ),
+            label,
+            paced,
+        )
+    except Exception as exc:  # pragma: no cover - defensive
+        logging.debug("Batched LLM evaluation failed for %s: %s", label, exc)
+        return [None] * len(occurrences)
+    if journal is not None:
+        journal.record_verdicts(enabler, occurrences, verdicts)
+    return [
+        (page_num, keyword, paragraph) if verdict else None
+        for (page_num, keyword, paragraph, _abs_start), verdict in zip(occurrences, verdicts)
+    ]
 
 
 # ---------------------------------------------------------------------------
@@ -217,6 +313,141 @@ class SharedAccumulator:
             return {enabler: len(items) for enabler, items in self._filtered.items()}
 
 
+def _write_significant_files(
+    accumulator: SharedAccumulator,
+    significant_files: SignificantFileMap,
+) -> None:
+    """Replace the per-enabler significant files with the accumulator's paragraphs.
+
+    Must run after every worker has finished (single writer, no I/O race).
+    """
+    # 1) Delete old files
+    for enabler, file_path in significant_files.items():
+        try:
+            if file_path.exists():
+                file_path.unlink()
+        except OSError as exc:  # pragma: no cover - defensive
+            logging.warning(
+                "Failed to delete old significant file %s: %s",
+                file_path, exc,
+            )
+
+    # 2) Write new files from the accumulator (single-threaded)
+    sig_paragraphs = accumulator.snapshot_significant_paragraphs()
+    for enabler, paragraphs in sig_paragraphs.items():
+        if not paragraphs:
+            continue
+        file_path = significant_files.get(enabler)
+        if file_path is None:
+            continue
+        try:
+            with file_path.open("w", encoding="utf-8") as handle:
+                for paragraph in paragraphs:
+                    handle.write(paragraph)
+                    handle.write("\n\n")
+        except OSError as exc:  # pragma: no cover - defensive
+            logging.warning(
+                "Failed to write significant file %s: %s",
+                file_path, exc,
+            )
+
+
+def _replay_journal(
+    journal,
+    prefilter,
+    enabler_occurrences: OccurrencesByEnabler,
+    accumulator: SharedAccumulator,
+) -> OccurrencesByEnabler:
+    """Feed the journal's recorded significant verdicts into *accumulator*.
+
+    Returns the occurrences that still need an LLM verdict: those neither
+    recorded in *journal* nor rejected by *prefilter* (a
+    :class:`prefilter.DocumentPreFilter`). Either may be None.
+    """
+    pending = enabler_occurrences
+    if journal is not None:
+        pending, replayed = journal.split(pending)
+        for enabler, occurrences in replayed.items():
+            for page_num, keyword, paragraph, _abs_start in occurrences:
+                accumulator.record_significant(enabler, page_num, keyword, paragraph)
+    if prefilter is not None:
+        # The pre-filter only ever rejects, so nothing reaches the accumulator.
+        pending = {
+            enabler: [
+                occurrence for occurrence in occurrences
+                if prefilter.verdict(enabler, occurrence) is None
+            ]
+            for enabler, occurrences in pending.items()
+        }
+    return pending
+
+
+def _dedup_pending(
+    dedup: ContextDedup,
+    pending: OccurrencesByEnabler,
+    pdf_text: str,
+    sentence_index,
+) -> OccurrencesByEnabler:
+    """Keep one occurrence per (enabler, extended context) in *pending*.
+
+    The others wait in *dedup* for their representative's verdict (see
+    :func:`_share_verdict`).
+    """
+    from main import extract_extended_context
+
+    return {
+        enabler: dedup.plan(
+            enabler,
+            occurrences,
+            [
+                extract_extended_context(pdf_text, abs_start, abs_start + len(keyword), sentence_index)
+                for (_page_num, keyword, _paragraph, abs_start) in occurrences
+            ],
+        )
+        for enabler, occurrences in pending.items()
+    }
+
+
+def _apply_verdict(
+    journal,
+    accumulator: SharedAccumulator,
+    enabler: str,
+    occurrences: List[Occurrence],
+    verdict: bool,
+) -> None:
+    """Record a verdict decided without an LLM call of its own."""
+    if journal is not None:
+        journal.record_verdicts(enabler, occurrences, [verdict] * len(occurrences))
+    if verdict:
+        for page_num, keyword, paragraph, _abs_start in occurrences:
+            accumulator.record_significant(enabler, page_num, keyword, paragraph)
+
+
+def _share_verdict(
+    dedup: ContextDedup,
+    journal,
+    accumulator: SharedAccumulator,
+    enabler: str,
+    occurrence: Occurrence,
+    item: FilteredOccurrence | None,
+) -> None:
+    """Fan the verdict of representative *occurrence* out to its duplicates.
+
+    *item* is the worker's result for it. A non-significant result is told
+    apart from a failed call through the journal; without one both count
+    as not significant, as for the representative itself.
+    """
+    if item is not None:
+        verdict = True
+    elif journal is not None:
+        verdict = journal.verdict(enabler, occurrence)
+    else:
+        verdict = False
+    duplicates = dedup.resolve(enabler, occurrence, verdict)
+    if duplicates and verdict is not None:
+        _apply_verdict(journal, accumulator, enabler, duplicates, verdict)
+
+
 # ---------------------------------------------------------------------------
 # Step 2 — per-category thread pool + post-pool file write
 # ---------------------------------------------------------------------------
@@ -232,6 +463,10 @@ def analyze_occurrences_parallel(
     significant_files: Optional[SignificantFileMap] = None,
     pdf_stem: Optional[str] = None,
     log_level: str = "normal",
+    sentence_index=None,
+    batch_size: int = 1,
+    journal=None,
+    prefilter=None,
 ) -> FilteredOccurrencesByEnabler:
     """Same contract as ``main.analyze_occurrences`` but parallelized.
 
@@ -251,16 +486,42 @@ def analyze_occurrences_parallel(
     concurrently to the same file (see spec §5 / §11 risk
     "Significant file write race").
 
+    With ``batch_size > 1`` each task classifies a chunk of that many
+    occurrences in one LLM call (``_evaluate_occurrence_batch``) instead
+    of one call per occurrence.
+
+    ``sentence_index`` is the document's precomputed
+    :class:`keyword_search.SentenceIndex`; when omitted it is built once
+    here and shared read-only by all worker threads, so each extended
+    context lookup is a binary search instead of a full re-split.
+
+    With a run ``journal`` (:class:`run_journal.PdfJournal`), recorded
+    verdicts are replayed into the accumulator before the pool starts and
+    only the remaining occurrences are submitted; so are only those the
+    ``prefilter`` (:class:`prefilter.DocumentPreFilter`) does not reject. Occurrences of one
+    enabler with the same extended context are submitted once
+    (:class:`occurrence_dedup.ContextDedup`).
+
     The function returns the same shape as ``analyze_occurrences``:
     ``{enabler: [(page, keyword, paragraph), …]}`` with paragraphs
     deduplicated.
     """
+    from keyword_search import SentenceIndex
+
     accumulator = SharedAccumulator(enabler_occurrences.keys())
     show_progress = log_level != "quiet"
-
-    for category_index, (enabler, occurrences) in enumerate(
+    # One sentence index per document, shared read-only by every worker.
+    if sentence_index is None:
+        sentence_index = SentenceIndex(pdf_text)
+    pending = _replay_journal(journal, prefilter, enabler_occurrences, accumulator)
+    # Identical contexts are asked once (see occurrence_dedup).
+    dedup = ContextDedup()
+    pending = _dedup_pending(dedup, pending, pdf_text, sentence_index)
+
+    for category_index, (enabler, all_occurrences) in enumerate(
         enabler_occurrences.items(), start=1
     ):
+        occurrences = pending[enabler]
         if not occurrences:
             continue
 
@@ -274,39 +535,59 @@ def analyze_occurrences_parallel(
         with concurrent.futures.ThreadPoolExecutor(
             max_workers=max_workers
         ) as executor:
-            future_to_occ = {
-                executor.submit(
-                    _evaluate_one_occurrence,
-                    llm_analyzer,
-                    enabler,
-                    page_num,
-                    keyword,
-                    paragraph,
-                    pdf_text,
-                    abs_start,
-                    prompt_template,
-                    model_name,
-                ): (page_num, keyword, paragraph)
-                for (page_num, keyword, paragraph, abs_start) in occurrences
-            }
+            if batch_size > 1:
+                # Batch mode: one task (and one LLM call) per chunk of
+                # ``batch_size`` occurrences of this enabler.
+                future_to_occ = {
+                    executor.submit(
+                        _evaluate_occurrence_batch,
+                        llm_analyzer,
+                        enabler,
+                        occurrences[chunk_start:chunk_start + batch_size],
+                        pdf_text,
+                        prompt_template,
+                        model_name,
+                        sentence_index,
+                        None,
+                        journal,
+                    ): occurrences[chunk_start:chunk_start + batch_size]
+                    for chunk_start in range(0, len(occurrences), batch_size)
+                }
+            else:
+                future_to_occ = {
+                    executor.submit(
+                        _evaluate_one_occurrence,
+                        llm_analyzer,
+                        enabler,
+                        page_num,
+                        keyword,
+                        paragraph,
+                        pdf_text,
+                        abs_start,
+                        prompt_template,
+                        model_name,
+                        sentence_index,
+                        None,
+                        journal,
+                    ): [(page_num, keyword, paragraph, abs_start)]
+                    for (page_num, keyword, paragraph, abs_start) in occurrences
+                }
 
             # ``as_completed`` lets the function also surface non-significant
             # (None) results without forcing every future to be awaited
             # before any thread can finish — keeps tail latency low when
             # 429s are hitting only some threads. The tqdm bar advances
-            # once per completed future so the user sees per-occurrence
-            # progress in real time.
-            futures_iter = concurrent.futures.as_completed(future_to_occ)
-            if show_progress:
-                futures_iter = tqdm(
-                    futures_iter,
-                    total=len(future_to_occ),
-                    desc=prefix,
-                    unit="occ",
-                )
-            for fut in futures_iter:
-                # _occ not used; kept for future verbose logging
-                _occ = future_to_occ[fut]
+            # by the number of occurrences each completed future covered,
+            # so the user sees per-occurrence progress in real time.
+            progress = (
+                tqdm(total=len(occurrences), desc=prefix, unit="occ")
+                if show_progress
+                else None
+            )
+            for fut in concurrent.futures.as_completed(future_to_occ):
+                occ_chunk = future_to_occ[fut]
+                if progress is not None:
+                    progress.update(len(occ_chunk))
                 try:
                     result = fut.result()
                 except Exception as exc:  # pragma: no cover - defensive
@@ -315,16 +596,21 @@ def analyze_occurrences_parallel(
                         exc,
                     )
                     continue
-                if result is not None:
-                    page_num, keyword, paragraph = result
-                    accumulator.record_significant(
-                        enabler, page_num, keyword, paragraph
-                    )
+                results = result if batch_size > 1 else [result]
+                for occurrence, item in zip(occ_chunk, results):
+                    if item is not None:
+                        page_num, keyword, paragraph = item
+                        accumulator.record_significant(
+                            enabler, page_num, keyword, paragraph
+                        )
+                    _share_verdict(dedup, journal, accumulator, enabler, occurrence, item)
+            if progress is not None:
+                progress.close()
 
         if log_level == "verbose":
             print(
                 Fore.CYAN
-                + f"  [{prefix}] {accumulator.counts().get(enabler, 0)}/{len(occurrences)} significant"
+                + f"  [{prefix}] {accumulator.counts().get(enabler, 0)}/{len(all_occurrences)} significant"
                 + Style.RESET_ALL
             )
 
@@ -334,36 +620,142 @@ def analyze_occurrences_parallel(
     filtered = accumulator.snapshot_filtered()
 
     if significant_files:
-        # 1) Delete old files
-        for enabler, file_path in significant_files.items():
-            try:
-                if file_path.exists():
-                    file_path.unlink()
-            except OSError as exc:  # pragma: no cover - defensive
-                logging.warning(
-                    "Failed to delete old significant file %s: %s",
-                    file_path, exc,
+        _write_significant_files(accumulator, significant_files)
+
+    return filtered
+
+
+def analyze_occurrences_streaming_parallel(
+    occurrence_stream,
+    prompt_template: str,
+    llm_analyzer: ParallelLLM,
+    model_name,
+    max_workers: int,
+    significant_files: Optional[SignificantFileMap] = None,
+    pdf_stem: Optional[str] = None,
+    log_level: str = "normal",
+    batch_size: int = 1,
+    journal=None,
+    prefilter=None,
+) -> FilteredOccurrencesByEnabler:
+    """Streaming counterpart of :func:`analyze_occurrences_parallel` (``--stream``).
+
+    Consumes a :class:`streaming.OccurrenceStream` and submits each
+    occurrence (or each full chunk of ``batch_size`` occurrences of one
+    enabler) to one ``max_workers`` thread pool as soon as its context is
+    final, while later pages are still being extracted. At most
+    ``2 * max_workers`` tasks are queued or running; beyond that the stream
+    waits, which in turn stalls extraction through its bounded page queue.
+
+    Contexts are computed by the stream, never by the workers, because the
+    sentence index is still growing while they run. Same return shape,
+    context and paragraph dedup and single-writer significant files as the
+    barrier path.
+    """
+    accumulator = SharedAccumulator(occurrence_stream.enabler_occurrences.keys())
+    dedup = ContextDedup()
+    in_flight = threading.BoundedSemaphore(max(1, max_workers) * 2)
+    pending: Dict[str, List[Tuple[Occurrence, str]]] = {
+        enabler: [] for enabler in occurrence_stream.enabler_occurrences
+    }
+    progress = (
+        tqdm(total=None, desc=pdf_stem or "occurrences", unit="occ")
+        if log_level != "quiet"
+        else None
+    )
+    progress_lock = threading.Lock()
+
+    def collect(enabler: str, chunk: List[Occurrence], fut: concurrent.futures.Future) -> None:
+        in_flight.release()
+        if progress is not None:
+            with progress_lock:
+                progress.update(len(chunk))
+        try:
+            results = fut.result()
+        except Exception as exc:  # pragma: no cover - defensive
+            logging.debug("Worker raised in analyze_occurrences_streaming_parallel: %s", exc)
+            return
+        for occurrence, item in zip(chunk, results if isinstance(results, list) else [results]):
+            if item is not None:
+                page_num, keyword, paragraph = item
+                accumulator.record_significant(enabler, page_num, keyword, paragraph)
+            _share_verdict(dedup, journal, accumulator, enabler, occurrence, item)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        def submit(enabler: str) -> None:
+            chunk = [occurrence for occurrence, _context in pending[enabler]]
+            contexts = [context for _occurrence, context in pending[enabler]]
+            pending[enabler] = []
+            in_flight.acquire()
+            if batch_size > 1:
+                fut = executor.submit(
+                    _evaluate_occurrence_batch, llm_analyzer, enabler, chunk, "",
+                    prompt_template, model_name, None, contexts, journal,
+                )
+            else:
+                page_num, keyword, paragraph, abs_start = chunk[0]
+                fut = executor.submit(
+                    _evaluate_one_occurrence, llm_analyzer, enabler, page_num, keyword,
+                    paragraph, "", abs_start, prompt_template, model_name, None, contexts[0],
+                    journal,
                 )
+            fut.add_done_callback(
+                lambda done, enabler=enabler, chunk=chunk: collect(enabler, chunk, done)
+            )
 
-        # 2) Write new files from the accumulator (single-threaded)
-        sig_paragraphs = accumulator.snapshot_significant_paragraphs()
-        for enabler, paragraphs in sig_paragraphs.items():
-            if not paragraphs:
+        for enabler, occurrence, extended_context in occurrence_stream:
+            verdict = decided_verdict(journal, prefilter, enabler, occurrence)
+            if verdict is not None:
+                # Replayed from the run journal or rejected by the pre-filter: no LLM call.
+                if verdict:
+                    page_num, keyword, paragraph, _abs_start = occurrence
+                    accumulator.record_significant(enabler, page_num, keyword, paragraph)
+                if progress is not None:
+                    with progress_lock:
+                        progress.update(1)
                 continue
-            file_path = significant_files.get(enabler)
-            if file_path is None:
+            ask, shared = dedup.claim(enabler, occurrence, extended_context)
+            if not ask:
+                # Same context as an earlier occurrence: its verdict is
+                # reused, now or when that call completes.
+                if shared is not None:
+                    _apply_verdict(journal, accumulator, enabler, [occurrence], shared)
+                if progress is not None:
+                    with progress_lock:
+                        progress.update(1)
                 continue
-            try:
-                with file_path.open("w", encoding="utf-8") as handle:
-                    for paragraph in paragraphs:
-                        handle.write(paragraph)
-                        handle.write("\n\n")
-            except OSError as exc:  # pragma: no cover - defensive
-                logging.warning(
-                    "Failed to write significant file %s: %s",
-                    file_path, exc,
+            pending[enabler].append((occurrence, extended_context))
+            if len(pending[enabler]) >= batch_size:
+                submit(enabler)
+        for enabler in pending:
+            if pending[enabler]:
+                submit(enabler)
+
+    if progress is not None:
+        progress.close()
+
+    if log_level == "verbose":
+        if occurrence_stream.first_occurrence_s is not None:
+            print(
+                Fore.CYAN
+                + f"  [{pdf_stem}] first occurrence ready after {occurrence_stream.first_occurrence_s:.2f}s"
+                + Style.RESET_ALL
+            )
+        counts = accumulator.counts()
+        for category_index, (enabler, occurrences) in enumerate(
+            occurrence_stream.enabler_occurrences.items(), start=1
+        ):
+            if occurrences:
+                prefix = f"{pdf_stem} cat{category_index}" if pdf_stem else f"cat{category_index}"
+                print(
+                    Fore.CYAN
+                    + f"  [{prefix}] {counts.get(enabler, 0)}/{len(occurrences)} significant"
+                    + Style.RESET_ALL
                 )
 
+    filtered = accumulator.snapshot_filtered()
+    if significant_files:
+        _write_significant_files(accumulator, significant_files)
     return filtered
 
 
@@ -383,12 +775,27 @@ def process_single_pdf_v2(
     output_dir = None,
     provider: str = "openrouter",
     local_url: str | None = None,
+    llm_cache: str | None = None,
+    batch_size: int = 1,
+    async_llm: bool = False,
+    max_concurrency: int = 100,
+    rate_limiter=None,
+    stream: bool = False,
+    extract_workers: int = 1,
+    journal_path: str | None = None,
+    prefilter=None,
+    cascade=None,
 ) -> None:
     """Process a single PDF using the parallel occurrence filter.
 
     Behaviorally identical to :func:`main.process_single_pdf` except that
     the occurrence-significance step runs through
-    :func:`analyze_occurrences_parallel` with ``max_workers`` threads.
+    :func:`analyze_occurrences_parallel` with ``max_workers`` threads, or
+    with ``async_llm=True`` through
+    :func:`parallel_async.analyze_occurrences_async` with up to
+    ``max_concurrency`` requests in flight on one event loop. With
+    ``stream=True`` extraction, search and filtering are pipelined through
+    :func:`analyze_occurrences_streaming_parallel`.
 
     All side effects (significant files, cost file, category results, notes,
     occurrences summary) match the sequential path:
@@ -407,20 +814,156 @@ def process_single_pdf_v2(
         2. Total significant < ``min_representative_matches`` → write
            summary, return.
     """
+    run = prepare_pdf_v2(
+        file_path,
+        keywords_path,
+        model_name=model_name,
+        temperature=temperature,
+        top_p=top_p,
+        output_dir=output_dir,
+        provider=provider,
+        local_url=local_url,
+        llm_cache=llm_cache,
+        async_llm=async_llm,
+        rate_limiter=rate_limiter,
+        stream=stream,
+        extract_workers=extract_workers,
+        journal_path=journal_path,
+        prefilter=prefilter,
+        cascade=cascade,
+    )
+
+    if run.occurrence_stream is not None:
+        filtered_enabler_occurrences = analyze_occurrences_streaming_parallel(
+            run.occurrence_stream,
+            run.keyword_occurrence_prompt,
+            run.llm_analyzer,
+            run.effective_model,
+            max_workers=max_workers,
+            significant_files=run.significant_files,
+            pdf_stem=run.pdf_path.stem,
+            log_level=log_level,
+            batch_size=batch_size,
+            journal=run.journal,
+            prefilter=run.prefilter,
+        )
+        run.pdf_text = run.occurrence_stream.pdf_text
+        run.total_occurrences = run.occurrence_stream.total_occurrences
+        print(
+            Fore.GREEN
+            + f"Total keyword occurrences found: {run.total_occurrences}\n\n"
+            + Style.RESET_ALL
+        )
+        finish_pdf_v2(run, filtered_enabler_occurrences, min_representative_matches)
+        if run.journal is not None:
+            run.journal.mark_finished()
+        return
+
+    filter_kwargs = dict(
+        pdf_text=run.pdf_text,
+        enabler_occurrences=run.enabler_occurrences,
+        prompt_template=run.keyword_occurrence_prompt,
+        llm_analyzer=run.llm_analyzer,
+        model_name=run.effective_model,
+        total_occurrences=run.total_occurrences,
+        significant_files=run.significant_files,
+        pdf_stem=run.pdf_path.stem,
+        log_level=log_level,
+        sentence_index=run.sentence_index,
+        batch_size=batch_size,
+        journal=run.journal,
+        prefilter=run.prefilter,
+    )
+    if async_llm:
+        from parallel_async import analyze_occurrences_async
+        filtered_enabler_occurrences = analyze_occurrences_async(
+            max_concurrency=max_concurrency, **filter_kwargs
+        )
+    else:
+        filtered_enabler_occurrences = analyze_occurrences_parallel(
+            max_workers=max_workers, **filter_kwargs
+        )
+
+    finish_pdf_v2(run, filtered_enabler_occurrences, min_representative_matches)
+    if run.journal is not None:
+        run.journal.mark_finished()
+
+
+@dataclass
+class PdfRun:
+    """Per-PDF state handed from :func:`prepare_pdf_v2` to :func:`finish_pdf_v2`.
+
+    Between the two phases the occurrences are filtered, either by one of
+    the per-PDF coordinators or by the global scheduler
+    (``global_scheduler.py``).
+    """
+    pdf_path: Path
+    keywords_file_path: Path
+    output_dir: Path
+    pdf_text: str
+    sentence_index: Any
+    enabler_keywords: Dict[str, List[str]]
+    keyword_searcher: Any
+    enabler_occurrences: OccurrencesByEnabler
+    total_occurrences: int
+    llm_analyzer: Any
+    effective_model: Optional[str]
+    keyword_occurrence_prompt: str
+    significant_files: SignificantFileMap
+    # Set instead of the text/occurrence fields by ``prepare_pdf_v2(stream=True)``;
+    # they are filled in from the stream once it is exhausted.
+    occurrence_stream: Any = None
+    # run_journal.PdfJournal of this PDF (None without a run journal).
+    journal: Any = None
+    # prefilter.DocumentPreFilter of this PDF (None without --prefilter).
+    prefilter: Any = None
+
+
+def prepare_pdf_v2(
+    file_path,
+    keywords_path,
+    model_name = "random",
+    temperature: float = 1.0,
+    top_p: float = 1.0,
+    output_dir = None,
+    provider: str = "openrouter",
+    local_url: str | None = None,
+    llm_cache: str | None = None,
+    async_llm: bool = False,
+    rate_limiter=None,
+    pdf_text: str | None = None,
+    stream: bool = False,
+    extract_workers: int = 1,
+    journal_path: str | None = None,
+    prefilter=None,
+    cascade=None,
+) -> PdfRun:
+    """First phase of :func:`process_single_pdf_v2`: read, search, set up the LLM.
+
+    Reads the PDF (skipped when *pdf_text* was already extracted), finds
+    the keyword occurrences and creates the per-PDF ``LLMAnalyzer`` whose
+    ``call_records`` feed this PDF's cost file. With ``stream=True``
+    nothing is read yet: the run carries a :class:`streaming.OccurrenceStream`
+    and empty text/occurrence fields. ``journal_path`` opens this PDF's
+    part of the run journal (``run_journal``); ``prefilter`` (a
+    :class:`prefilter.PreFilterSettings`) gives it its local
+    pre-classifier; ``cascade`` (a :class:`cascade.CascadeSettings`) makes the
+    occurrence calls go through the model cascade.
+    """
     # Lazy import everything main-side that we touch. ``process_single_pdf``
     # in main is the canonical reference; importing only what we need keeps
     # the circular main↔parallel dependency one-directional.
     from main import (
-        Counter,
         Fore,
         KeywordSearcher,
         LLMAnalyzer,
+        SentenceIndex,
         Style,
         load_enabler_keywords,
         read_pdf,
-        write_occurrences_summary,
     )
     from dotenv import load_dotenv
+    from llm_query import AsyncLLMAnalyzer
     from pathlib import Path as _Path
 
     pdf_path = _Path(file_path)
@@ -445,39 +988,65 @@ def process_single_pdf_v2(
     load_dotenv()
     effective_model = None if model_name == "random" else model_name
 
-    print(Fore.CYAN + f"Reading PDF file: {pdf_path}" + Style.RESET_ALL)
-    pdf_text = read_pdf(pdf_path)
-    print(
-        Fore.BLUE
-        + "\n\n\n-------------> PDF text extraction completed!!\n\n"
-        + Style.RESET_ALL
-    )
+    if pdf_text is None and not stream:
+        print(Fore.CYAN + f"Reading PDF file: {pdf_path}" + Style.RESET_ALL)
+        pdf_text = read_pdf(pdf_path, extract_workers)
+        print(
+            Fore.BLUE
+            + "\n\n\n-------------> PDF text extraction completed!!\n\n"
+            + Style.RESET_ALL
+        )
 
     print(Fore.CYAN + f"Loading keywords from: {keywords_file_path}" + Style.RESET_ALL)
     enabler_keywords = load_enabler_keywords(keywords_file_path)
     print(Fore.GREEN + f"Loaded {len(enabler_keywords)} enabler categories." + Style.RESET_ALL)
 
     keyword_searcher = KeywordSearcher(enabler_keywords)
-    print(
-        Fore.BLUE
-        + "\n\n -> Searching for keyword occurrences in PDF text..."
-        + Style.RESET_ALL
-    )
-    enabler_occurrences = keyword_searcher.check_enabler_occurrences(pdf_text)
-    total_occurrences = sum(len(occ) for occ in enabler_occurrences.values())
-    print(
-        Fore.GREEN
-        + f"Total keyword occurrences found: {total_occurrences}\n\n"
-        + Style.RESET_ALL
-    )
+    occurrence_stream = None
+    if stream:
+        from streaming import OccurrenceStream
+
+        print(Fore.CYAN + f"Streaming PDF file: {pdf_path}" + Style.RESET_ALL)
+        occurrence_stream = OccurrenceStream(
+            pdf_path, keyword_searcher, extract_workers=extract_workers
+        )
+        pdf_text = ""
+        sentence_index = occurrence_stream.sentence_index
+        enabler_occurrences = occurrence_stream.enabler_occurrences
+        total_occurrences = 0
+    else:
+        sentence_index = SentenceIndex(pdf_text)
+        print(
+            Fore.BLUE
+            + "\n\n -> Searching for keyword occurrences in PDF text..."
+            + Style.RESET_ALL
+        )
+        enabler_occurrences = keyword_searcher.check_enabler_occurrences(
+            pdf_text, sentence_index
+        )
+        total_occurrences = sum(len(occ) for occ in enabler_occurrences.values())
+        print(
+            Fore.GREEN
+            + f"Total keyword occurrences found: {total_occurrences}\n\n"
+            + Style.RESET_ALL
+        )
 
-    llm_analyzer = LLMAnalyzer(temperature=temperature, top_p=top_p, provider=provider, local_base_url=local_url)
+    # ``--async-llm`` swaps in the AsyncOpenAI-backed subclass; the final
+    # category analysis below keeps using the synchronous methods.
+    analyzer_cls = AsyncLLMAnalyzer if async_llm else LLMAnalyzer
+    llm_analyzer = analyzer_cls(
+        temperature=temperature, top_p=top_p, provider=provider, local_base_url=local_url,
+        response_cache_path=llm_cache,
+    )
     # PARALLELIZATION_SPEC v2.0 — Etapa 6 (print suppression):
     # In parallel mode the per-call ``[Cost]`` and ``Selected model:``
     # prints would interleave across threads and processes. Route them
     # to ``logging.debug`` instead. ``--log-level debug`` still works
     # because the log handler can write the same lines to a file.
     llm_analyzer.quiet = True
+    # Shared AdaptiveRateLimiter (or manager proxy) from the coordinator.
+    llm_analyzer.rate_limiter = rate_limiter
+    llm_analyzer.cascade = cascade
     keyword_occurrence_prompt = llm_analyzer.load_prompt(
         "keyword_occurrence_prompt.txt"
     )
@@ -492,19 +1061,52 @@ def process_single_pdf_v2(
             / f"{pdf_path.stem}_significant_paragraphs_category_{index}.txt"
         )
 
-    filtered_enabler_occurrences = analyze_occurrences_parallel(
+    return PdfRun(
+        pdf_path=pdf_path,
+        keywords_file_path=keywords_file_path,
+        output_dir=_output_dir,
         pdf_text=pdf_text,
+        sentence_index=sentence_index,
+        enabler_keywords=enabler_keywords,
+        keyword_searcher=keyword_searcher,
         enabler_occurrences=enabler_occurrences,
-        prompt_template=keyword_occurrence_prompt,
-        llm_analyzer=llm_analyzer,
-        model_name=effective_model,
-        max_workers=max_workers,
         total_occurrences=total_occurrences,
+        llm_analyzer=llm_analyzer,
+        effective_model=effective_model,
+        keyword_occurrence_prompt=keyword_occurrence_prompt,
         significant_files=significant_files,
-        pdf_stem=pdf_path.stem,
-        log_level=log_level,
+        occurrence_stream=occurrence_stream,
+        journal=RunJournal(journal_path).for_pdf(pdf_path) if journal_path else None,
+        prefilter=document_prefilter(prefilter, sentence_index),
     )
 
+
+def finish_pdf_v2(
+    run: PdfRun,
+    filtered_enabler_occurrences: FilteredOccurrencesByEnabler,
+    min_representative_matches: int = 1,
+) -> None:
+    """Last phase of :func:`process_single_pdf_v2`: everything after the filter.
+
+    Prints the filtered occurrences, runs the final per-category analysis
+    and writes the results, notes, occurrences summary, cost file, summary
+    JSON and LaTeX table.
+    """
+    from main import Counter, Fore, Style, write_occurrences_summary
+
+    pdf_path = run.pdf_path
+    keywords_file_path = run.keywords_file_path
+    _output_dir = run.output_dir
+    enabler_keywords = run.enabler_keywords
+    enabler_occurrences = run.enabler_occurrences
+    keyword_searcher = run.keyword_searcher
+    llm_analyzer = run.llm_analyzer
+    effective_model = run.effective_model
+
+    prefilter_skipped = prefilter_counts(run.prefilter)
+    if prefilter_skipped is not None:
+        print(Fore.CYAN + describe_counts(prefilter_skipped) + Style.RESET_ALL)
+
     # Mirror main.print_occurrences to keep the screen output consistent.
     from main import print_occurrences  # lazy
     total_matches_summary = print_occurrences(filtered_enabler_occurrences)
@@ -519,7 +1121,7 @@ def process_single_pdf_v2(
         write_occurrences_summary(
             pdf_path, enabler_keywords, enabler_occurrences,
             filtered_enabler_occurrences, {},
-            output_dir=_output_dir,
+            output_dir=_output_dir, prefilter_skipped=prefilter_skipped,
         )
         return
 
@@ -560,7 +1162,7 @@ def process_single_pdf_v2(
         write_occurrences_summary(
             pdf_path, enabler_keywords, enabler_occurrences,
             filtered_enabler_occurrences, classified_keywords,
-            output_dir=_output_dir,
+            output_dir=_output_dir, prefilter_skipped=prefilter_skipped,
         )
         return
 
@@ -606,17 +1208,29 @@ def process_single_pdf_v2(
             "{significant_paragraphs}", significant_paragraphs_str
         )
 
-        # Get the model used
-        selected_model = (
-            effective_model
-            if effective_model
-            else llm_analyzer.get_random_model()
+        recorded = (
+            run.journal.category_analysis(category_index)
+            if run.journal is not None
+            else None
         )
+        if recorded is not None:
+            selected_model, analysis = recorded
+        else:
+            # Get the model used
+            selected_model = (
+                effective_model
+                if effective_model
+                else llm_analyzer.get_random_model()
+            )
 
-        # Call LLM and collect output
-        analysis = llm_analyzer.analyze(
-            {}, final_prompt_with_paragraphs, None, selected_model
-        )
+            # Call LLM and collect output
+            analysis = llm_analyzer.analyze(
+                {}, final_prompt_with_paragraphs, None, selected_model
+            )
+            if run.journal is not None:
+                run.journal.record_category_analysis(
+                    category_index, enabler, selected_model, analysis
+                )
 
         category_output = (
             f"-------------> Processing category {category_index}: {enabler}\n"
@@ -675,7 +1289,7 @@ def process_single_pdf_v2(
     write_occurrences_summary(
         pdf_path, enabler_keywords, enabler_occurrences,
         filtered_enabler_occurrences, classified_keywords,
-        output_dir=_output_dir,
+        output_dir=_output_dir, prefilter_skipped=prefilter_skipped,
     )
 
     # Print token usage summary and save to file. ``print_usage_summary``
@@ -759,6 +1373,16 @@ def _worker_process_entry(
     output_dir = None,
     provider: str = "openrouter",
     local_url: str | None = None,
+    llm_cache: str | None = None,
+    batch_size: int = 1,
+    async_llm: bool = False,
+    max_concurrency: int = 100,
+    rate_limiter=None,
+    stream: bool = False,
+    extract_workers: int = 1,
+    journal_path: str | None = None,
+    prefilter=None,
+    cascade=None,
 ) -> str:
     """Top-level picklable worker used by ``ProcessPoolExecutor``.
 
@@ -788,6 +1412,16 @@ def _worker_process_entry(
         output_dir=output_dir,
         provider=provider,
         local_url=local_url,
+        llm_cache=llm_cache,
+        batch_size=batch_size,
+        async_llm=async_llm,
+        max_concurrency=max_concurrency,
+        rate_limiter=rate_limiter,
+        stream=stream,
+        extract_workers=extract_workers,
+        journal_path=journal_path,
+        prefilter=prefilter,
+        cascade=cascade,
     )
     return str(pdf_path)
 
@@ -806,6 +1440,16 @@ def run_pipeline_parallel(
     output_dir = None,
     provider: str = "openrouter",
     local_url: str | None = None,
+    llm_cache: str | None = None,
+    batch_size: int = 1,
+    async_llm: bool = False,
+    max_concurrency: int = 100,
+    rate_limit_rpm: float | None = None,
+    stream: bool = False,
+    extract_workers: int = 1,
+    journal_path: str | None = None,
+    prefilter=None,
+    cascade=None,
 ) -> None:
     """Coordinate the multi-PDF pipeline (Layer C: process pool).
 
@@ -815,6 +1459,21 @@ def run_pipeline_parallel(
     Otherwise each file is dispatched to a worker that calls
     :func:`_worker_process_entry` in a forked child.
 
+    With ``rate_limit_rpm`` set, every LLM request is paced by one
+    :class:`rate_limiter.AdaptiveRateLimiter` starting at that many
+    requests per minute per (provider, model); with several processes it
+    lives in a manager process so all workers share the learned budget.
+
+    ``extract_workers`` processes parse each PDF in page-range shards
+    (``sharded_extraction``), so up to ``num_processes * extract_workers``
+    extraction processes can be busy at once.
+
+    ``journal_path`` is the run journal (``run_journal``) shared by every
+    worker: verdicts, category analyses and finished PDFs are recorded as
+    they complete and replayed by a resumed run. ``prefilter`` rejects
+    obvious reference/citation/header hits without an LLM call, and
+    ``cascade`` sends each occurrence to a cheap model first.
+
     After all PDFs are processed, the function aggregates the per-PDF
     ``*_cost.txt`` files into a single summary. With ``profile=True`` it
     also prints the wall-clock time.
@@ -844,6 +1503,19 @@ def run_pipeline_parallel(
 
     start = _mono() if profile else None
 
+    # Adaptive rate limiter: a plain instance for the inline path, a
+    # manager-hosted one when several worker processes share the budget.
+    rate_limiter = None
+    limiter_manager = None
+    if rate_limit_rpm is not None:
+        from rate_limiter import AdaptiveRateLimiter, start_shared_rate_limiter
+        if M == 1:
+            rate_limiter = AdaptiveRateLimiter(initial_rpm=rate_limit_rpm)
+        else:
+            limiter_manager, rate_limiter = start_shared_rate_limiter(
+                initial_rpm=rate_limit_rpm
+            )
+
     if M == 1:
         # Inline path — no fork, no ProcessPoolExecutor. The single PDF
         # runs in the calling process and creates its own LLMAnalyzer.
@@ -860,6 +1532,16 @@ def run_pipeline_parallel(
                 output_dir,
                 provider,
                 local_url,
+                llm_cache,
+                batch_size,
+                async_llm,
+                max_concurrency,
+                rate_limiter,
+                stream,
+                extract_workers,
+                journal_path,
+                prefilter,
+                cascade,
             )
     else:
         with concurrent.futures.ProcessPoolExecutor(max_workers=M) as executor:
@@ -877,6 +1559,16 @@ def run_pipeline_parallel(
                     output_dir,
                     provider,
                     local_url,
+                    llm_cache,
+                    batch_size,
+                    async_llm,
+                    max_concurrency,
+                    rate_limiter,
+                    stream,
+                    extract_workers,
+                    journal_path,
+                    prefilter,
+                    cascade,
                 ): pdf_path
                 for pdf_path in files
             }
@@ -893,6 +1585,27 @@ def run_pipeline_parallel(
                         + Style.RESET_ALL
                     )
 
+    limiter_stats = rate_limiter.snapshot() if rate_limiter is not None else {}
+    if limiter_manager is not None:
+        limiter_manager.shutdown()
+
+    _print_pipeline_summary(
+        files,
+        output_dir,
+        f"PARALLEL PIPELINE SUMMARY ({len(files)} PDF(s), M={M}, A={max_workers})",
+        limiter_stats,
+        _mono() - start if profile and start is not None else None,
+    )
+
+
+def _print_pipeline_summary(
+    files,
+    output_dir,
+    title: str,
+    limiter_stats: Dict[str, dict],
+    elapsed: float | None,
+) -> None:
+    """Aggregate the per-PDF ``*_cost.txt`` files and print the run summary."""
     # Aggregate cost by scanning the output directory.
     total_calls = 0
     total_cost = 0.0
@@ -921,7 +1634,7 @@ def run_pipeline_parallel(
     )
     print(
         Fore.CYAN
-        + f"PARALLEL PIPELINE SUMMARY ({len(files)} PDF(s), M={M}, A={max_workers})"
+        + title
         + Style.RESET_ALL
     )
     print(
@@ -934,8 +1647,15 @@ def run_pipeline_parallel(
         + f"  Total cost:      ${total_cost:.8f} USD"
         + Style.RESET_ALL
     )
-    if profile and start is not None:
-        elapsed = _mono() - start
+    for key, stats in sorted(limiter_stats.items()):
+        tpm = f", {stats['tpm']:,.0f} tokens/min" if stats["tpm"] else ""
+        print(
+            Fore.GREEN
+            + f"  Rate limit {key}: {stats['rpm']:,.1f} req/min{tpm} "
+            + f"({stats['requests']:,} requests, {stats['throttled']:,} throttled)"
+            + Style.RESET_ALL
+        )
+    if elapsed is not None:
         print(
             Fore.GREEN
             + f"  Wall-clock time: {elapsed:.2f} s"
@@ -0,0 +1,302 @@
+"""Asyncio variant of the Layer A occurrence filter (``--async-llm``).
+
+``analyze_occurrences_async`` has the same contract as
+:func:`parallel.analyze_occurrences_parallel` — same return shape, same
+per-enabler paragraph dedup through :class:`parallel.SharedAccumulator`,
+same significant files written once after all work has finished — but the
+LLM calls are coroutines of an :class:`llm_query.AsyncLLMAnalyzer` running
+on one event loop instead of one blocked OS thread per in-flight request.
+
+Design contracts:
+    * Concurrency is bounded by one ``asyncio.Semaphore(max_concurrency)``
+      shared by every category of the document, so all occurrences of the
+      PDF compete for the same pool of in-flight requests. Categories are
+      not processed one after the other as in the threaded path; the dedup
+      is per enabler, so this does not change which paragraphs are kept.
+    * A semaphore slot is held only while a request is being sent (including
+      any ``rate_limiter`` pacing delay). The infinite 429 retry sleeps with
+      ``asyncio.sleep`` outside the slot.
+    * Prompts and verdict parsing are shared with the threaded path
+      (``occurrence_batching``), and every call is recorded by the same
+      ``LLMAnalyzer`` accounting (``call_records``, response cache).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, List, Optional, TypeVar
+
+from colorama import Fore, Style
+from openai import RateLimitError
+from tqdm import tqdm
+
+from occurrence_batching import aclassify_occurrence_batch, build_occurrence_prompt
+from occurrence_dedup import ContextDedup
+from parallel import (
+    _BACKOFF_CAP,
+    _BACKOFF_INITIAL,
+    FilteredOccurrence,
+    FilteredOccurrencesByEnabler,
+    Occurrence,
+    OccurrencesByEnabler,
+    SharedAccumulator,
+    SignificantFileMap,
+    _dedup_pending,
+    _is_paced,
+    _replay_journal,
+    _share_verdict,
+    _write_significant_files,
+)
+
+T = TypeVar("T")
+
+DEFAULT_MAX_CONCURRENCY = 100
+
+
+async def _aretry_on_rate_limit(
+    call: Callable[[], Awaitable[T]],
+    semaphore: asyncio.Semaphore | None,
+    label: str,
+    paced: bool = False,
+) -> T:
+    """Await ``call()`` under *semaphore*, retrying ``RateLimitError`` forever.
+
+    Same capped exponential backoff as ``parallel._retry_on_rate_limit``
+    (including its ``paced`` shortcut when the analyzer has a rate
+    limiter); the slot is released while sleeping so other requests can
+    proceed. ``semaphore=None`` retries without taking a slot.
+    """
+    backoff = _BACKOFF_INITIAL
+    while True:
+        try:
+            if semaphore is None:
+                return await call()
+            async with semaphore:
+                return await call()
+        except RateLimitError:
+            if paced:
+                logging.debug("429 rate limit for %s; retrying through the rate limiter", label)
+                continue
+            logging.debug("429 rate limit for %s; sleeping %.1fs", label, backoff)
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2.0, _BACKOFF_CAP)
+
+
+async def _aevaluate_one_occurrence(
+    llm_analyzer,
+    enabler: str,
+    occurrence: Occurrence,
+    pdf_text: str,
+    prompt_template: str,
+    model_name,
+    sentence_index,
+    semaphore: asyncio.Semaphore,
+    journal=None,
+) -> List[FilteredOccurrence | None]:
+    """Coroutine counterpart of ``parallel._evaluate_one_occurrence``."""
+    from main import extract_extended_context
+
+    page_num, keyword, paragraph, abs_start = occurrence
+    extended_context = extract_extended_context(
+        pdf_text, abs_start, abs_start + len(keyword), sentence_index
+    )
+    prompt_text = build_occurrence_prompt(
+        prompt_template, enabler, keyword, extended_context
+    )
+    try:
+        response = await _aretry_on_rate_limit(
+            lambda: llm_analyzer.aanalyze_single_occurrence(prompt_text, model_name),
+            semaphore,
+            f"keyword={keyword!r} page={page_num}",
+            _is_paced(llm_analyzer),
+        )
+    except Exception as exc:  # pragma: no cover - defensive
+        logging.debug(
+            "LLM call failed (non-429) for keyword=%r page=%d: %s",
+            keyword, page_num, exc,
+        )
+        return [None]
+    significant = bool(response) and response.strip().lower() == "significant"
+    if journal is not None:
+        journal.record_verdicts(enabler, [occurrence], [significant])
+    if significant:
+        return [(page_num, keyword, paragraph)]
+    return [None]
+
+
+async def _aevaluate_occurrence_batch(
+    llm_analyzer,
+    enabler: str,
+    occurrences: List[Occurrence],
+    pdf_text: str,
+    prompt_template: str,
+    model_name,
+    sentence_index,
+    semaphore: asyncio.Semaphore,
+    journal=None,
+) -> List[FilteredOccurrence | None]:
+    """Coroutine counterpart of ``parallel._evaluate_occurrence_batch``."""
+    from main import extract_extended_context
+
+    items = [
+        (keyword, extract_extended_context(
+            pdf_text, abs_start, abs_start + len(keyword), sentence_index
+        ))
+        for (_page_num, keyword, _paragraph, abs_start) in occurrences
+    ]
+    label = f"enabler={enabler!r} batch of {len(items)}"
+    paced = _is_paced(llm_analyzer)
+
+    async def single_call(prompt_text: str) -> str:
+        # Runs inside the batch's semaphore slot (see below), so it must
+        # not acquire another one; it only needs its own 429 retry.
+        return await _aretry_on_rate_limit(
+            lambda: llm_analyzer.aanalyze_single_occurrence(prompt_text, model_name),
+            None,
+            label,
+            paced,
+        )
+
+    try:
+        verdicts = await _aretry_on_rate_limit(
+            lambda: aclassify_occurrence_batch(
+                llm_analyzer, prompt_template, enabler, items, model_name,
+                single_call=single_call,
+            ),
+            semaphore,
+            label,
+            paced,
+        )
+    except Exception as exc:  # pragma: no cover - defensive
+        logging.debug("Batched LLM evaluation failed for %s: %s", label, exc)
+        return [None] * len(occurrences)
+    if journal is not None:
+        journal.record_verdicts(enabler, occurrences, verdicts)
+    return [
+        (page_num, keyword, paragraph) if verdict else None
+        for (page_num, keyword, paragraph, _abs_start), verdict in zip(occurrences, verdicts)
+    ]
+
+
+async def _analyze_occurrences_async(
+    pdf_text: str,
+    enabler_occurrences: OccurrencesByEnabler,
+    prompt_template: str,
+    llm_analyzer,
+    model_name,
+    max_concurrency: int,
+    pdf_stem: Optional[str],
+    log_level: str,
+    sentence_index,
+    batch_size: int,
+    journal,
+    prefilter,
+) -> SharedAccumulator:
+    accumulator = SharedAccumulator(enabler_occurrences.keys())
+    semaphore = asyncio.Semaphore(max_concurrency)
+    pending = _replay_journal(journal, prefilter, enabler_occurrences, accumulator)
+    dedup = ContextDedup()
+    pending = _dedup_pending(dedup, pending, pdf_text, sentence_index)
+
+    async def run(enabler: str, chunk: List[Occurrence]):
+        if batch_size > 1:
+            results = await _aevaluate_occurrence_batch(
+                llm_analyzer, enabler, chunk, pdf_text, prompt_template,
+                model_name, sentence_index, semaphore, journal,
+            )
+        else:
+            results = await _aevaluate_one_occurrence(
+                llm_analyzer, enabler, chunk[0], pdf_text, prompt_template,
+                model_name, sentence_index, semaphore, journal,
+            )
+        return enabler, chunk, results
+
+    step = max(1, batch_size)
+    tasks = [
+        asyncio.ensure_future(run(enabler, occurrences[start:start + step]))
+        for enabler, occurrences in pending.items()
+        for start in range(0, len(occurrences), step)
+    ]
+    total = sum(len(occurrences) for occurrences in pending.values())
+    progress = (
+        tqdm(total=total, desc=pdf_stem or "occurrences", unit="occ")
+        if log_level != "quiet" and total
+        else None
+    )
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            try:
+                enabler, chunk, results = await next_done
+            except Exception as exc:  # pragma: no cover - defensive
+                logging.debug("Task raised in analyze_occurrences_async: %s", exc)
+                continue
+            if progress is not None:
+                progress.update(len(chunk))
+            for occurrence, item in zip(chunk, results):
+                if item is not None:
+                    page_num, keyword, paragraph = item
+                    accumulator.record_significant(enabler, page_num, keyword, paragraph)
+                _share_verdict(dedup, journal, accumulator, enabler, occurrence, item)
+    finally:
+        if progress is not None:
+            progress.close()
+        for task in tasks:
+            task.cancel()
+        await llm_analyzer.aclose()
+    return accumulator
+
+
+def analyze_occurrences_async(
+    pdf_text: str,
+    enabler_occurrences: OccurrencesByEnabler,
+    prompt_template: str,
+    llm_analyzer,
+    model_name,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    total_occurrences: Optional[int] = None,
+    significant_files: Optional[SignificantFileMap] = None,
+    pdf_stem: Optional[str] = None,
+    log_level: str = "normal",
+    sentence_index=None,
+    batch_size: int = 1,
+    journal=None,
+    prefilter=None,
+) -> FilteredOccurrencesByEnabler:
+    """Same contract as ``parallel.analyze_occurrences_parallel``, on asyncio.
+
+    *llm_analyzer* must be an :class:`llm_query.AsyncLLMAnalyzer`. At most
+    ``max_concurrency`` requests are in flight at once across all
+    categories. Runs its own event loop (``asyncio.run``), so it must be
+    called from synchronous code.
+    """
+    from keyword_search import SentenceIndex
+
+    del total_occurrences  # kept for signature parity with the threaded path
+    if sentence_index is None:
+        sentence_index = SentenceIndex(pdf_text)
+
+    accumulator = asyncio.run(_analyze_occurrences_async(
+        pdf_text, enabler_occurrences, prompt_template, llm_analyzer,
+        model_name, max_concurrency, pdf_stem, log_level, sentence_index,
+        batch_size, journal, prefilter,
+    ))
+
+    if log_level == "verbose":
+        counts = accumulator.counts()
+        for category_index, (enabler, occurrences) in enumerate(
+            enabler_occurrences.items(), start=1
+        ):
+            if not occurrences:
+                continue
+            prefix = f"{pdf_stem} cat{category_index}" if pdf_stem else f"cat{category_index}"
+            print(
+                Fore.CYAN
+                + f"  [{prefix}] {counts.get(enabler, 0)}/{len(occurrences)} significant"
+                + Style.RESET_ALL
+            )
+
+    filtered = accumulator.snapshot_filtered()
+    if significant_files:
+        _write_significant_files(accumulator, significant_files)
+    return filtered
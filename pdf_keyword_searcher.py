@@ -1,19 +1,39 @@
 import argparse
+import bisect
+import json
 import re
 import sys
 import os
 from colorama import init, Fore, Style
 import pdfplumber
+from pdfplumber.page import test_proposed_bbox
+from pdfplumber.utils import chars_to_textmap, clip_obj, get_bbox_overlap, obj_to_bbox
+
+try:
+    import numpy as np
+except ImportError:  # optional: the pure-Python path gives the same text, more slowly
+    np = None
+
+from pdf_text_cache import get_default_cache
 
 # Initialize colorama for colored output
 init(autoreset=True)
 
+# Cache identity of extract_text_smartly; bump the version whenever its
+# output changes so cached pages from the old layout logic are not reused.
+SMART_EXTRACTOR = "pdfplumber-smart"
+SMART_EXTRACTOR_VERSION = "1"
+
 
 def extract_text_smartly(page):
     """
     Extracts text from a page respecting multi-column layouts.
     Detects regions where text spans across columns (like titles) vs two-column regions.
     For two-column regions, reads left column then right column.
+
+    The page is not cropped per region: its chars are indexed once and every
+    region takes the chars that a crop would keep (same overlap and clipping
+    rules), so each char is visited about once instead of once per crop.
     """
     words = page.extract_words()
     width = page.width
@@ -21,30 +41,9 @@ def extract_text_smartly(page):
     center = width / 2
     epsilon = 10  # Buffer for center crossing detection
 
-    # Identify words that cross the center gutter (spanning words)
-    # A word crosses if it starts before center-buffer and ends after center+buffer
-    spanning_words = [
-        w for w in words 
-        if w['x0'] < center - epsilon and w['x1'] > center + epsilon
-    ]
-
-    # Create Y-intervals covered by spanning words
-    spanning_intervals = []
-    for w in spanning_words:
-        spanning_intervals.append((w['top'], w['bottom']))
-
-    # Merge overlapping vertical intervals
-    spanning_intervals.sort()
-    merged = []
-    if spanning_intervals:
-        curr_start, curr_end = spanning_intervals[0]
-        for start, end in spanning_intervals[1:]:
-            if start <= curr_end + 2:  # 2 points vertical tolerance
-                curr_end = max(curr_end, end)
-            else:
-                merged.append((curr_start, curr_end))
-                curr_start, curr_end = start, end
-        merged.append((curr_start, curr_end))
+    # Y-intervals covered by words that cross the center gutter (titles,
+    # full-width figures), merged with a 2 points vertical tolerance
+    merged = _spanning_intervals(words, center, epsilon)
 
     # Construct the full sequence of intervals (Spanning vs Column)
     final_intervals = []
@@ -60,78 +59,250 @@ def extract_text_smartly(page):
     if curr_y < height:
         final_intervals.append({'type': 'cols', 'top': curr_y, 'bottom': height})
 
+    chars = _CharIndex(page.chars)
     full_text = []
     for interval in final_intervals:
         if interval['bottom'] - interval['top'] < 1:
             continue
-        
-        # Define the vertical slice for this interval
-        # Use crop to isolate the region
+
+        # Regions a crop would reject (zero area, outside the page) are skipped
         crop_box = (0, interval['top'], width, interval['bottom'])
-        
-        # Safety check for invalid boxes
-        if crop_box[1] >= crop_box[3]:
-            continue
-            
-        try:
-            cropped_page = page.crop(crop_box)
-        except Exception:
+        if not _valid_region(page, crop_box):
             continue
 
         if interval['type'] == 'span':
-            # Extract normally
-            text = cropped_page.extract_text(x_tolerance=2, y_tolerance=2)
+            regions = [crop_box]
+        else:
+            # Left column, then right column
+            regions = [
+                (0, interval['top'], center, interval['bottom']),
+                (center, interval['top'], width, interval['bottom']),
+            ]
+        for region in regions:
+            if not _valid_region(page, region):
+                continue
+            text = _region_text(chars.overlapping(region), region)
             if text:
                 full_text.append(text)
-        else:
-            # Split into Left and Right columns
-            # Left Column
-            left_box = (0, interval['top'], center, interval['bottom'])
-            try:
-                left_crop = page.crop(left_box)
-                t1 = left_crop.extract_text(x_tolerance=2, y_tolerance=2)
-                if t1:
-                    full_text.append(t1)
-            except Exception:
-                pass
-            
-            # Right Column
-            right_box = (center, interval['top'], width, interval['bottom'])
-            try:
-                right_crop = page.crop(right_box)
-                t2 = right_crop.extract_text(x_tolerance=2, y_tolerance=2)
-                if t2:
-                    full_text.append(t2)
-            except Exception:
-                pass
 
     return "\n".join(full_text)
 
 
+def _spanning_intervals(words, center, epsilon):
+    """
+    Returns the merged (top, bottom) extents of the words crossing the center gutter.
+    A word crosses if it starts before center-epsilon and ends after center+epsilon;
+    intervals closer than 2 points are merged.
+    """
+    if np is None or not words:
+        return _merge_intervals(sorted(
+            (w['top'], w['bottom']) for w in words
+            if w['x0'] < center - epsilon and w['x1'] > center + epsilon
+        ))
+    x0, x1, top, bottom = (np.array([w[key] for w in words], dtype=float) for key in ('x0', 'x1', 'top', 'bottom'))
+    spanning = (x0 < center - epsilon) & (x1 > center + epsilon)
+    top, bottom = top[spanning], bottom[spanning]
+    if not len(top):
+        return []
+    order = np.lexsort((bottom, top))
+    top, bottom = top[order], bottom[order]
+    # An interval starts a new group when it begins more than 2 points below
+    # everything before it; a group ends at the running maximum of bottoms
+    reach = np.maximum.accumulate(bottom)
+    starts = np.flatnonzero(np.r_[True, top[1:] > reach[:-1] + 2])
+    ends = np.r_[starts[1:], len(top)] - 1
+    return list(zip(top[starts].tolist(), reach[ends].tolist()))
+
+
+def _merge_intervals(intervals):
+    merged = []
+    if intervals:
+        curr_start, curr_end = intervals[0]
+        for start, end in intervals[1:]:
+            if start <= curr_end + 2:  # 2 points vertical tolerance
+                curr_end = max(curr_end, end)
+            else:
+                merged.append((curr_start, curr_end))
+                curr_start, curr_end = start, end
+        merged.append((curr_start, curr_end))
+    return merged
+
+
+def _valid_region(page, bbox):
+    try:
+        test_proposed_bbox(bbox, page.bbox)
+    except ValueError:
+        return False
+    return True
+
+
+def _region_text(chars, bbox):
+    """
+    Text of the chars in *bbox*, as page.crop(bbox).extract_text(x_tolerance=2, y_tolerance=2).
+    """
+    clipped = [clip_obj(char, bbox) for char in chars]
+    textmap = chars_to_textmap(
+        clipped,
+        layout_bbox=bbox,
+        layout_width=bbox[2] - bbox[0],
+        layout_height=bbox[3] - bbox[1],
+        x_tolerance=2,
+        y_tolerance=2,
+    )
+    return textmap.as_string
+
+
+class _CharIndex:
+    """
+    A page's chars sorted by top, to find the chars overlapping a region
+    without testing every char of the page (NumPy when installed).
+    """
+
+    def __init__(self, chars):
+        self.chars = chars
+        if not chars:
+            return
+        # A char overlapping a region starts at most one char height above it
+        self.reach = max(c['bottom'] - c['top'] for c in chars) + 1
+        if np is None:
+            self.order = sorted(range(len(chars)), key=lambda i: chars[i]['top'])
+            self.sorted_top = [chars[i]['top'] for i in self.order]
+            return
+        self.x0, self.x1, self.top, self.bottom = (
+            np.array([c[key] for c in chars], dtype=float) for key in ('x0', 'x1', 'top', 'bottom')
+        )
+        self.order = np.argsort(self.top, kind='stable')
+        self.sorted_top = self.top[self.order]
+
+    def overlapping(self, bbox):
+        """
+        Chars intersecting *bbox* by pdfplumber's crop rule, in page order.
+        """
+        if not self.chars:
+            return []
+        left, top, right, bottom = bbox
+        if np is None:
+            lo = bisect.bisect_left(self.sorted_top, top - self.reach)
+            hi = bisect.bisect_right(self.sorted_top, bottom)
+            return [
+                self.chars[i] for i in sorted(self.order[lo:hi])
+                if get_bbox_overlap(obj_to_bbox(self.chars[i]), bbox) is not None
+            ]
+        lo = np.searchsorted(self.sorted_top, top - self.reach, side='left')
+        hi = np.searchsorted(self.sorted_top, bottom, side='right')
+        candidates = self.order[lo:hi]
+        o_width = np.minimum(self.x1[candidates], right) - np.maximum(self.x0[candidates], left)
+        o_height = np.minimum(self.bottom[candidates], bottom) - np.maximum(self.top[candidates], top)
+        keep = np.sort(candidates[(o_height >= 0) & (o_width >= 0) & (o_height + o_width > 0)])
+        return [self.chars[i] for i in keep.tolist()]
+
+
+def _extract_pages_smartly(file_path):
+    with pdfplumber.open(file_path) as pdf:
+        return [extract_text_smartly(page) for page in pdf.pages]
+
+
+def extract_pages_smartly(file_path):
+    """
+    Returns the column-aware text of every page, using the shared extraction cache.
+    """
+    version = f"{SMART_EXTRACTOR_VERSION}/{pdfplumber.__version__}"
+    pages, _from_cache = get_default_cache().get_or_extract(
+        file_path, SMART_EXTRACTOR, version, _extract_pages_smartly
+    )
+    return pages
+
+
+def split_sentences(text):
+    """
+    Splits the text of one page into sentences (line breaks are treated as spaces).
+    """
+    # A more robust way to split sentences
+    return re.split(r'(?<!\w\.\w.)(?<![A-Z][a-z]\.)(?<=\.|\?|!)\s', text.replace('\n', ' '))
+
+
+def sentence_context(sentences, i):
+    """
+    Returns sentence *i* together with the sentences before and after it.
+    """
+    context = ""
+    if i > 0:
+        context += sentences[i-1].strip() + " "
+    context += sentences[i].strip()
+    if i < len(sentences) - 1:
+        context += " " + sentences[i+1].strip()
+    return context
+
+
 def find_keyword_contexts(file_path, keyword):
     """
     Finds all occurrences of a keyword in a PDF and extracts the sentences where it appears.
     Returns a list of tuples containing (page_num, sentence).
     """
     contexts = []
-    with pdfplumber.open(file_path) as pdf:
-        for page_num, page in enumerate(pdf.pages, start=1):
-            # Use smart extraction to handle columns
-            text = extract_text_smartly(page)
-            if text:
-                # A more robust way to split sentences
-                sentences = re.split(r'(?<!\w\.\w.)(?<![A-Z][a-z]\.)(?<=\.|\?|!)\s', text.replace('\n', ' '))
-                for i, sentence in enumerate(sentences):
-                    if re.search(re.escape(keyword), sentence, re.IGNORECASE):
-                        context = ""
-                        if i > 0:
-                            context += sentences[i-1].strip() + " "
-                        context += sentence.strip()
-                        if i < len(sentences) - 1:
-                            context += " " + sentences[i+1].strip()
-                        contexts.append((page_num, context))
+    # Use smart extraction to handle columns
+    for page_num, text in enumerate(extract_pages_smartly(file_path), start=1):
+        if text:
+            sentences = split_sentences(text)
+            for i, sentence in enumerate(sentences):
+                if re.search(re.escape(keyword), sentence, re.IGNORECASE):
+                    contexts.append((page_num, sentence_context(sentences, i)))
+    return contexts
+
+
+def find_keywords_contexts(file_path, keywords):
+    """
+    Finds the occurrences of several keywords in a PDF with one extraction and sentence split.
+    Returns {keyword: [(page_num, context), ...]} with contexts deduplicated per keyword
+    by normalize_text (first occurrence kept), in page order. Duplicate keywords are
+    searched once; each keyword gets the same matches as find_keyword_contexts.
+    """
+    unique_keywords = list(dict.fromkeys(keywords))
+    contexts = {kw: [] for kw in unique_keywords}
+    if not unique_keywords:
+        return contexts
+    patterns = {kw: re.compile(re.escape(kw), re.IGNORECASE) for kw in unique_keywords}
+    # One alternation first, so sentences without any keyword are skipped cheaply
+    any_keyword = re.compile(
+        "|".join(re.escape(kw) for kw in sorted(unique_keywords, key=len, reverse=True)),
+        re.IGNORECASE,
+    )
+    seen = {kw: set() for kw in unique_keywords}
+
+    for page_num, text in enumerate(extract_pages_smartly(file_path), start=1):
+        if not text:
+            continue
+        sentences = split_sentences(text)
+        for i, sentence in enumerate(sentences):
+            if not any_keyword.search(sentence):
+                continue
+            context = None
+            for kw, pattern in patterns.items():
+                if not pattern.search(sentence):
+                    continue
+                if context is None:
+                    context = sentence_context(sentences, i)
+                    normalized = normalize_text(context)
+                if normalized not in seen[kw]:
+                    seen[kw].add(normalized)
+                    contexts[kw].append((page_num, context))
     return contexts
 
+
+def load_keywords_file(path):
+    """
+    Loads keywords from a JSON taxonomy ({category: [keywords]}), a JSON list,
+    or a text file with one keyword per line.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    if path.lower().endswith('.json'):
+        data = json.loads(content)
+        if isinstance(data, dict):
+            return [kw for kw_list in data.values() for kw in kw_list]
+        return list(data)
+    return [line.strip() for line in content.splitlines() if line.strip()]
+
 def normalize_text(text):
     """
     Normalize text for comparison by removing extra spaces, hyphens, and other formatting
@@ -146,15 +317,40 @@ def normalize_text(text):
 
 
 
+def print_keyword_contexts(keyword, contexts):
+    """
+    Prints the occurrences of one keyword in the single-keyword CLI format.
+    """
+    if contexts:
+        print(Fore.GREEN + f"Found {len(contexts)} occurrence(s) of '{keyword}':" + Style.RESET_ALL)
+        for page_num, context in contexts:
+            print(Fore.YELLOW + f"Page {page_num}:" + Style.RESET_ALL)
+            print(Fore.WHITE + context + Style.RESET_ALL)
+    else:
+        print(Fore.RED + f"No occurrences of '{keyword}' found." + Style.RESET_ALL)
+
+
 def main():
     # Set up command-line argument parsing
     parser = argparse.ArgumentParser(
-        description="Search for a keyword in a PDF file and display the sentence containing each occurrence."
+        description="Search for keywords in a PDF file and display the sentence containing each occurrence."
     )
     parser.add_argument("pdf_file", help="Path to the PDF file to search")
-    parser.add_argument("keyword", help="Keyword to search for in the PDF file")
+    parser.add_argument("keywords", nargs="*", metavar="keyword", help="Keyword(s) to search for in the PDF file")
+    parser.add_argument(
+        "--keywords-file",
+        help="JSON taxonomy ({category: [keywords]}), JSON list, or text file with one keyword per line",
+    )
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON ({keyword: [{page, context}]})")
+    
+    # Keywords may come before or after the options (e.g. "paper.pdf --json cloud").
+    args = parser.parse_intermixed_args()
     
-    args = parser.parse_args()
+    keywords = list(args.keywords)
+    if args.keywords_file:
+        keywords.extend(load_keywords_file(args.keywords_file))
+    if not keywords:
+        parser.error("give at least one keyword or --keywords-file")
     
     # Check if the PDF file exists
     if not os.path.exists(args.pdf_file):
@@ -167,25 +363,23 @@ def main():
         sys.exit(1)
     
     try:
-        # Find keyword contexts
-        contexts = find_keyword_contexts(args.pdf_file, args.keyword)
+        # Find keyword contexts (one extraction for all keywords)
+        results = find_keywords_contexts(args.pdf_file, keywords)
         
         # Display results
-        if contexts:
-            unique_contexts = []
-            seen_sentences = set()
-            for page_num, sentence in contexts:
-                normalized_sentence = normalize_text(sentence)
-                if normalized_sentence not in seen_sentences:
-                    unique_contexts.append((page_num, sentence))
-                    seen_sentences.add(normalized_sentence)
-            
-            print(Fore.GREEN + f"Found {len(unique_contexts)} occurrence(s) of '{args.keyword}':" + Style.RESET_ALL)
-            for page_num, context in unique_contexts:
-                print(Fore.YELLOW + f"Page {page_num}:" + Style.RESET_ALL)
-                print(Fore.WHITE + context + Style.RESET_ALL)
+        if args.json:
+            print(json.dumps(
+                {kw: [{"page": page_num, "context": context} for page_num, context in contexts]
+                 for kw, contexts in results.items()},
+                ensure_ascii=False, indent=2,
+            ))
+        elif len(results) == 1:
+            keyword, contexts = next(iter(results.items()))
+            print_keyword_contexts(keyword, contexts)
         else:
-            print(Fore.RED + f"No occurrences of '{args.keyword}' found." + Style.RESET_ALL)
+            for keyword, contexts in results.items():
+                print(Fore.CYAN + f"--- Keyword: '{keyword}' ---" + Style.RESET_ALL)
+                print_keyword_contexts(keyword, contexts)
     
     except Exception as e:
         print(Fore.RED + f"Error: {str(e)}" + Style.RESET_ALL)
@@ -0,0 +1,324 @@
+"""Persistent, content-addressed cache for text extracted from PDFs.
+
+Every entry point that parses PDFs (``main.read_pdf``,
+``FullPDFAnalyzer.extract_text``, ``utils/pdf_keyword_ranker.extract_pdf_text``
+and ``pdf_keyword_searcher``) stores the per-page text it extracts here, so a
+re-run over the same corpus skips PDF parsing entirely.
+
+Entries are keyed by the SHA-256 of the PDF *content* (renaming or moving a
+file keeps its entry), the extractor name and the extractor version. Bumping
+an extractor's version therefore invalidates its entries without touching the
+others. The cache directory is bounded in size: after each write the least
+recently used entries are evicted until the total fits ``max_bytes``.
+
+Configuration (environment, e.g. via ``.env``):
+    * ``PDF_TEXT_CACHE_DIR`` — cache directory
+      (default: ``~/.cache/pdfanalyzer/pdf_text``).
+    * ``PDF_TEXT_CACHE_MAX_MB`` — size bound in MiB (default: 1024).
+    * ``PDF_TEXT_CACHE`` — set to ``off`` to bypass the cache.
+
+Maintenance CLI::
+
+    python pdf_text_cache.py stats
+    python pdf_text_cache.py clear
+    python pdf_text_cache.py invalidate path/to/file.pdf [...]
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Iterator, List, Tuple
+
+_DEFAULT_DIR = Path.home() / ".cache" / "pdfanalyzer" / "pdf_text"
+_DEFAULT_MAX_MB = 1024
+_HASH_CHUNK = 1 << 20  # 1 MiB
+
+# Extractor used by main.read_pdf, FullPDFAnalyzer and pdf_keyword_ranker:
+# the raw ``PdfReader.pages[i].extract_text()`` output, one string per page.
+PYPDF2_EXTRACTOR = "pypdf2"
+PYPDF2_EXTRACTOR_VERSION = "1"
+
+
+def file_digest(pdf_path: Path | str) -> str:
+    """Return the SHA-256 hex digest of the file content."""
+    digest = hashlib.sha256()
+    with open(pdf_path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(_HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class PdfTextCache:
+    """Directory of JSON entries holding the per-page text of one PDF each."""
+
+    def __init__(
+        self,
+        cache_dir: Path | str | None = None,
+        max_bytes: int | None = None,
+        enabled: bool | None = None,
+    ) -> None:
+        if cache_dir is None:
+            cache_dir = os.getenv("PDF_TEXT_CACHE_DIR") or _DEFAULT_DIR
+        if max_bytes is None:
+            max_mb = float(os.getenv("PDF_TEXT_CACHE_MAX_MB", _DEFAULT_MAX_MB))
+            max_bytes = int(max_mb * 1024 * 1024)
+        if enabled is None:
+            enabled = os.getenv("PDF_TEXT_CACHE", "on").lower() not in ("0", "off", "false", "no")
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._lock = threading.Lock()
+
+    # -- keys ---------------------------------------------------------------
+
+    @staticmethod
+    def _entry_name(digest: str, extractor: str, version: str) -> str:
+        version_tag = hashlib.sha1(version.encode("utf-8")).hexdigest()[:12]
+        return f"{digest}-{extractor}-{version_tag}.json"
+
+    # -- lookup / store -----------------------------------------------------
+
+    def get_or_extract(
+        self,
+        pdf_path: Path | str,
+        extractor: str,
+        version: str,
+        extract: Callable[[Path], List[str]],
+    ) -> Tuple[List[str], bool]:
+        """Return ``(pages, from_cache)`` for *pdf_path*.
+
+        On a miss ``extract(pdf_path)`` is called, its page list is stored
+        and returned with ``from_cache=False``. Cache I/O errors are logged
+        and never fail the extraction.
+        """
+        pdf_path = Path(pdf_path)
+        if not self.enabled:
+            return extract(pdf_path), False
+
+        digest, pages = self._lookup(pdf_path, extractor, version)
+        if pages is not None:
+            return pages, True
+
+        pages = extract(pdf_path)
+        self._store_pages(pdf_path, digest, extractor, version, pages)
+        return pages, False
+
+    def iter_or_extract(
+        self,
+        pdf_path: Path | str,
+        extractor: str,
+        version: str,
+        iter_extract: Callable[[Path], Iterator[str]],
+        on_hit: Callable[[int], None] | None = None,
+    ) -> Iterator[str]:
+        """Yield the pages of *pdf_path* one at a time.
+
+        Streaming counterpart of :meth:`get_or_extract`: on a hit the cached
+        pages are yielded (after calling ``on_hit(page_count)``); on a miss
+        ``iter_extract(pdf_path)`` is consumed page by page and the entry is
+        stored once the last page has been extracted.
+        """
+        pdf_path = Path(pdf_path)
+        if not self.enabled:
+            yield from iter_extract(pdf_path)
+            return
+
+        digest, pages = self._lookup(pdf_path, extractor, version)
+        if pages is not None:
+            if on_hit is not None:
+                on_hit(len(pages))
+            yield from pages
+            return
+
+        pages = []
+        for page in iter_extract(pdf_path):
+            pages.append(page)
+            yield page
+        self._store_pages(pdf_path, digest, extractor, version, pages)
+
+    def _lookup(
+        self, pdf_path: Path, extractor: str, version: str
+    ) -> Tuple[str, List[str] | None]:
+        """Return ``(digest, pages)``; ``pages`` is None on a miss."""
+        digest = file_digest(pdf_path)
+        entry = self.cache_dir / self._entry_name(digest, extractor, version)
+        try:
+            payload = json.loads(entry.read_text(encoding="utf-8"))
+            pages = payload["pages"]
+            os.utime(entry)  # LRU: a hit refreshes the entry's age
+            return digest, pages
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError) as exc:
+            logging.warning("Ignoring unreadable text cache entry %s: %s", entry, exc)
+        return digest, None
+
+    def _store_pages(
+        self, pdf_path: Path, digest: str, extractor: str, version: str, pages: List[str]
+    ) -> None:
+        entry = self.cache_dir / self._entry_name(digest, extractor, version)
+        self._store(entry, {
+            "source": pdf_path.name,
+            "sha256": digest,
+            "extractor": extractor,
+            "version": version,
+            "pages": pages,
+        })
+
+    def _store(self, entry: Path, payload: dict) -> None:
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            # Write-then-rename so concurrent processes never read a partial entry.
+            tmp_path = entry.with_name(f"{entry.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp_path.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp_path, entry)
+        except OSError as exc:
+            logging.warning("Failed to write text cache entry %s: %s", entry, exc)
+            return
+        self.evict()
+
+    # -- maintenance --------------------------------------------------------
+
+    def _entries(self) -> List[Path]:
+        if not self.cache_dir.is_dir():
+            return []
+        return list(self.cache_dir.glob("*.json"))
+
+    def evict(self) -> int:
+        """Delete least recently used entries until the cache fits ``max_bytes``.
+
+        Returns the number of entries removed.
+        """
+        with self._lock:
+            stats = []
+            for path in self._entries():
+                try:
+                    st = path.stat()
+                except OSError:
+                    continue
+                stats.append((st.st_mtime, st.st_size, path))
+            total = sum(size for _, size, _ in stats)
+            removed = 0
+            for _, size, path in sorted(stats):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    path.unlink()
+                except OSError:
+                    continue
+                total -= size
+                removed += 1
+            return removed
+
+    def invalidate(self, pdf_path: Path | str) -> int:
+        """Delete every entry (all extractors) for the content of *pdf_path*."""
+        digest = file_digest(pdf_path)
+        removed = 0
+        for path in self._entries():
+            if path.name.startswith(f"{digest}-"):
+                path.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+    def clear(self) -> int:
+        """Delete every entry. Returns the number of entries removed."""
+        removed = 0
+        for path in self._entries():
+            path.unlink(missing_ok=True)
+            removed += 1
+        return removed
+
+    def stats(self) -> dict:
+        entries = self._entries()
+        return {
+            "cache_dir": str(self.cache_dir),
+            "entries": len(entries),
+            "total_bytes": sum(path.stat().st_size for path in entries),
+            "max_bytes": self.max_bytes,
+            "enabled": self.enabled,
+        }
+
+
+_default_cache: PdfTextCache | None = None
+
+
+def get_default_cache() -> PdfTextCache:
+    """Return the process-wide cache configured from the environment."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = PdfTextCache()
+    return _default_cache
+
+
+def _iter_pypdf2_pages(pdf_path: Path, workers: int = 1) -> Iterator[str]:
+    # ``iter_pages_sharded`` falls back to a plain in-process loop for
+    # ``workers <= 1`` and short documents.
+    from sharded_extraction import iter_pages_sharded
+
+    return iter_pages_sharded(pdf_path, workers)
+
+
+def _pypdf2_version() -> str:
+    import PyPDF2
+
+    return f"{PYPDF2_EXTRACTOR_VERSION}/{PyPDF2.__version__}"
+
+
+def iter_pypdf2_pages(
+    pdf_path: Path | str,
+    on_hit: Callable[[int], None] | None = None,
+    workers: int = 1,
+) -> Iterator[str]:
+    """Yield the PyPDF2 text of every page as soon as it is extracted.
+
+    Same pages (and cache entries) as :func:`pypdf2_pages`; used by the
+    streaming pipeline (``streaming.py``).
+    """
+    return get_default_cache().iter_or_extract(
+        pdf_path, PYPDF2_EXTRACTOR, _pypdf2_version(),
+        lambda path: _iter_pypdf2_pages(path, workers), on_hit,
+    )
+
+
+def pypdf2_pages(pdf_path: Path | str, workers: int = 1) -> Tuple[List[str], bool]:
+    """Return ``(pages, from_cache)`` with the PyPDF2 text of every page.
+
+    Pages without text are returned as empty strings so callers can keep
+    their own page numbering and formatting. With ``workers > 1`` a miss is
+    extracted by page-range shards on a process pool
+    (``sharded_extraction``); the pages and the cache entry are the same.
+    """
+    return get_default_cache().get_or_extract(
+        pdf_path, PYPDF2_EXTRACTOR, _pypdf2_version(),
+        lambda path: list(_iter_pypdf2_pages(path, workers)),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Inspect or invalidate the extracted PDF text cache.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("stats", help="Show cache location, entry count and size.")
+    subparsers.add_parser("clear", help="Delete every cache entry.")
+    invalidate_parser = subparsers.add_parser("invalidate", help="Delete the entries of specific PDFs.")
+    invalidate_parser.add_argument("pdf_files", nargs="+", help="PDF files whose cached text should be dropped.")
+    args = parser.parse_args()
+
+    cache = get_default_cache()
+    if args.command == "stats":
+        for key, value in cache.stats().items():
+            print(f"{key}: {value}")
+    elif args.command == "clear":
+        print(f"Removed {cache.clear()} cache entries from {cache.cache_dir}")
+    else:
+        for pdf_file in args.pdf_files:
+            print(f"{pdf_file}: removed {cache.invalidate(pdf_file)} cache entries")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,392 @@
+"""Local pre-classifier for keyword occurrences (``--prefilter``).
+
+The occurrence prompt tells the LLM to reject sentences that summarize
+cited work, yet every hit in a bibliography or a running header is sent to
+it. :class:`DocumentPreFilter` runs between the keyword search and the LLM
+filter and rejects, without a call, the hits that are obviously "not
+significant":
+
+    * ``reference``     — inside the reference list (after a standalone
+      "References"/"Bibliography" heading, up to an appendix heading), or
+      on a line that looks like a bibliography entry;
+    * ``citation``      — sentences dominated by citation markers or
+      opening with a cited work ("[5] demonstrated ...", "Smith et al.
+      (2019) ...", "Previous works [1, 2] ...");
+    * ``header_footer`` — lines repeated at the top or bottom of many pages;
+    * ``model``         — with a trained :class:`NaiveBayesModel`, hits it
+      rejects with probability ``>= threshold``.
+
+The model is trained offline over the LLM verdicts of earlier runs, which
+the run journal stores with their paragraphs::
+
+    python prefilter.py train Results/*/ --output prefilter_model.json
+
+Every pipeline (sequential, ``--parallel``, ``--async-llm``,
+``--scheduler global``, ``--stream``) is handed the document's pre-filter
+next to its run journal and asks it about the hits without a recorded
+verdict (:func:`decided_verdict`), so all of them skip the same hits. Its
+verdicts are not recorded in the journal: the model only learns from the
+LLM.
+
+The document layout (reference section, repeated lines) is rescanned as
+the text grows, so under ``--stream`` a hit is judged on the pages parsed
+so far; a running header is only recognised once it has repeated.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import re
+import sys
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from keyword_search import KeywordSearcher
+
+Occurrence = Tuple[int, str, str, int]              # (page, keyword, paragraph, abs_start)
+
+DEFAULT_THRESHOLD = 0.98
+# The model is not trusted below this many verdicts of each class.
+MIN_VERDICTS_PER_CLASS = 50
+MODEL_VERSION = 1
+
+REFERENCE_HEADING = re.compile(
+    r"^[ \t]*(?:\d+\.?|[IVX]+\.)?[ \t]*"
+    r"(?:references|bibliography|works cited|literature cited|reference list)[ \t]*:?[ \t]*$",
+    re.IGNORECASE | re.MULTILINE,
+)
+AFTER_REFERENCES_HEADING = re.compile(
+    r"^[ \t]*(?:[A-Z]\.?[ \t]+)?(?:appendix|appendices|supplementary material)\b[^\n]{0,60}$",
+    re.IGNORECASE | re.MULTILINE,
+)
+NUMERIC_CITATION = re.compile(r"\[\d+(?:\s*[,;–-]\s*\d+)*\]")
+AUTHOR_YEAR_CITATION = re.compile(
+    r"\((?:[A-Z][^()]{0,80}?,?\s(?:19|20)\d{2}[a-z]?;?\s*)+\)"
+)
+CITED_WORK_OPENING = re.compile(
+    r"^(?:"
+    r"\[\d+[^\]]*\]"                                                    # [5] showed ...
+    r"|(?i:in)\s\[\d+[^\]]*\]"                                           # In [5], ...
+    r"|[A-Z][\w'-]+\s(?:et\sal\.|(?:and|&)\s[A-Z][\w'-]+)\s*"
+    r"(?:\[\d+[^\]]*\]|\((?:19|20)\d{2}[a-z]?\))"                       # Smith and Lee [5]
+    r"|[A-Z][\w'-]+\s\((?:19|20)\d{2}[a-z]?\)"                             # Smith (2019)
+    r"|(?i:previous|prior|earlier|recent|other|related)\s"
+    r"(?i:works?|studies|research|papers|approaches)\s*(?:\[\d|\()"     # Previous works [1, 2]
+    r")"
+)
+REFERENCE_ENTRY_SIGNALS = tuple(
+    re.compile(pattern, re.IGNORECASE)
+    for pattern in (
+        r"^\s*(?:\[\d+\]|\d+\.)\s+[A-Z]",
+        r"\bdoi\s*[:.]?\s*10\.\d{4,}|doi\.org/",
+        r"\barxiv\b",
+        r"\bin\s+proc(?:eedings|\.)",
+        r"\bvol\.\s*\d+|\bno\.\s*\d+",
+        r"\bpp\.\s*\d+",
+        r"\((?:19|20)\d{2}\)|,\s(?:19|20)\d{2}[.,]",
+        r"\bet al\.",
+        r"\b(?:journal of|transactions on|conference on|symposium on)\b",
+    )
+)
+# A line with this many bibliography signals is an entry even outside the
+# reference section (e.g. a footnote).
+MIN_ENTRY_SIGNALS = 4
+# Lines checked at the top and at the bottom of every page.
+EDGE_LINES = 2
+MAX_EDGE_LINE_CHARS = 150
+_DIGITS = re.compile(r"\d+")
+_SPACES = re.compile(r"\s+")
+_TOKEN = re.compile(r"[a-z][a-z0-9-]+")
+
+
+@dataclass(frozen=True)
+class PreFilterSettings:
+    """Picklable ``--prefilter`` options handed to worker processes."""
+    model_path: str | None = None
+    threshold: float = DEFAULT_THRESHOLD
+
+
+# -- model --------------------------------------------------------------------
+
+def _features(paragraph: str) -> List[str]:
+    text = NUMERIC_CITATION.sub(" zzcitation ", paragraph)
+    text = AUTHOR_YEAR_CITATION.sub(" zzcitation ", text)
+    text = re.sub(r"\b(?:19|20)\d{2}\b", " zzyear ", text)
+    return _TOKEN.findall(text.lower())
+
+
+class NaiveBayesModel:
+    """Multinomial naive Bayes over paragraph tokens (Laplace smoothing)."""
+
+    def __init__(self, docs: List[int] | None = None, tokens: List[Dict[str, int]] | None = None) -> None:
+        self.docs = docs or [0, 0]                  # [not significant, significant]
+        self.tokens = tokens or [{}, {}]
+        self._totals = [sum(counts.values()) for counts in self.tokens]
+        self._vocabulary = len(set(self.tokens[0]) | set(self.tokens[1])) or 1
+
+    @classmethod
+    def train(cls, labelled: Iterable[Tuple[str, bool]], min_count: int = 2) -> "NaiveBayesModel":
+        docs = [0, 0]
+        counts = [Counter(), Counter()]
+        for paragraph, significant in labelled:
+            docs[int(significant)] += 1
+            counts[int(significant)].update(_features(paragraph))
+        kept = {token for token, count in (counts[0] + counts[1]).items() if count >= min_count}
+        return cls(docs, [{token: c for token, c in cls_counts.items() if token in kept} for cls_counts in counts])
+
+    @property
+    def trusted(self) -> bool:
+        return min(self.docs) >= MIN_VERDICTS_PER_CLASS
+
+    def prob_not_significant(self, paragraph: str) -> float:
+        total_docs = sum(self.docs)
+        scores = []
+        for label in (0, 1):
+            score = math.log((self.docs[label] + 1) / (total_docs + 2))
+            denominator = self._totals[label] + self._vocabulary
+            for token in _features(paragraph):
+                score += math.log((self.tokens[label].get(token, 0) + 1) / denominator)
+            scores.append(score)
+        top = max(scores)
+        weights = [math.exp(score - top) for score in scores]
+        return weights[0] / sum(weights)
+
+    def save(self, path: Path | str) -> None:
+        Path(path).write_text(
+            json.dumps({"version": MODEL_VERSION, "docs": self.docs, "tokens": self.tokens}),
+            encoding="utf-8",
+        )
+
+    @classmethod
+    def load(cls, path: Path | str) -> "NaiveBayesModel":
+        payload = json.loads(Path(path).read_text(encoding="utf-8"))
+        if payload.get("version") != MODEL_VERSION:
+            raise ValueError(f"Unsupported pre-filter model version in {path}")
+        return cls(payload["docs"], payload["tokens"])
+
+
+@lru_cache(maxsize=None)
+def _load_model(path: str) -> NaiveBayesModel:
+    # Once per process: every PDF of a run shares the model.
+    return NaiveBayesModel.load(path)
+
+
+# -- heuristics ----------------------------------------------------------------
+
+def _normalize_line(line: str) -> str:
+    return _SPACES.sub(" ", _DIGITS.sub("#", line.strip().lower()))
+
+
+def is_citation_dominated(sentence: str) -> bool:
+    """True for sentences about cited work rather than the paper itself."""
+    stripped = sentence.strip()
+    if not stripped:
+        return False
+    if CITED_WORK_OPENING.match(stripped):
+        return True
+    markers = NUMERIC_CITATION.findall(stripped) + AUTHOR_YEAR_CITATION.findall(stripped)
+    if len(markers) >= 4:
+        return True
+    marker_chars = sum(len(marker) for marker in markers)
+    return marker_chars >= 0.3 * len(stripped.replace(" ", ""))
+
+
+def reference_signals(line: str) -> int:
+    """Number of bibliography-entry signals in *line*."""
+    return sum(1 for pattern in REFERENCE_ENTRY_SIGNALS if pattern.search(line))
+
+
+class DocumentPreFilter:
+    """The pre-filter of one document, bound to its (possibly growing) text.
+
+    *sentence_index* is the :class:`keyword_search.SentenceIndex` of the
+    document; under ``--stream`` it is the stream's live index.
+    """
+
+    def __init__(self, settings: PreFilterSettings, sentence_index) -> None:
+        self.settings = settings
+        self.sentence_index = sentence_index
+        self.model = _load_model(settings.model_path) if settings.model_path else None
+        if self.model is not None and not self.model.trusted:
+            self.model = None
+        self._lock = threading.Lock()
+        self._scanned = 0
+        self._pages = 0
+        self._edge_pages: Counter = Counter()        # normalized edge line -> pages
+        self._references_start: int | None = None
+        self._references_end: int | None = None
+        self._skipped: Dict[Tuple[str, str, int], str] = {}
+
+    # -- layout ----------------------------------------------------------------
+
+    def _scan(self) -> None:
+        # Both pipelines append whole "Page N:" sections, so the unscanned
+        # tail always starts at a page header.
+        text = self.sentence_index.text
+        if len(text) == self._scanned:
+            return
+        offset = self._scanned
+        for _page_num, content_start, content in KeywordSearcher._iter_pages(text[offset:]):
+            content_start += offset
+            self._pages += 1
+            lines = [line for line in content.splitlines() if line.strip()]
+            edges = {
+                _normalize_line(line)
+                for line in lines[:EDGE_LINES] + lines[-EDGE_LINES:]
+                if len(line) <= MAX_EDGE_LINE_CHARS
+            }
+            self._edge_pages.update(edges)
+            for match in REFERENCE_HEADING.finditer(content):
+                # The last heading wins (a table of contents may list one too).
+                self._references_start = content_start + match.end()
+                self._references_end = None
+            if self._references_start is not None and self._references_end is None:
+                for match in AFTER_REFERENCES_HEADING.finditer(content):
+                    if content_start + match.start() > self._references_start:
+                        self._references_end = content_start + match.start()
+                        break
+        self._scanned = len(text)
+
+    def _line_at(self, pos: int) -> str:
+        text = self.sentence_index.text
+        start = text.rfind("\n", 0, pos) + 1
+        end = text.find("\n", pos)
+        return text[start:end if end != -1 else len(text)]
+
+    def _in_references(self, pos: int) -> bool:
+        if self._references_start is None or pos < self._references_start:
+            return False
+        return self._references_end is None or pos < self._references_end
+
+    def _is_header_footer(self, line: str) -> bool:
+        if len(line) > MAX_EDGE_LINE_CHARS:
+            return False
+        pages = self._edge_pages.get(_normalize_line(line), 0)
+        return pages >= 3 and pages >= 0.3 * self._pages
+
+    # -- verdicts --------------------------------------------------------------
+
+    def reason(self, occurrence: Occurrence) -> Optional[str]:
+        """Return why *occurrence* needs no LLM call, or None."""
+        _page, _keyword, paragraph, abs_start = occurrence
+        with self._lock:
+            self._scan()
+            line = self._line_at(abs_start)
+            if self._in_references(abs_start) or reference_signals(line) >= MIN_ENTRY_SIGNALS:
+                return "reference"
+            if self._is_header_footer(line):
+                return "header_footer"
+        if is_citation_dominated(paragraph):
+            return "citation"
+        if self.model is not None and self.model.prob_not_significant(paragraph) >= self.settings.threshold:
+            return "model"
+        return None
+
+    def verdict(self, enabler: str, occurrence: Occurrence) -> Optional[bool]:
+        """``False`` (not significant) for a pre-filtered hit, None otherwise."""
+        reason = self.reason(occurrence)
+        if reason is None:
+            return None
+        _page, keyword, _paragraph, abs_start = occurrence
+        with self._lock:
+            self._skipped[(enabler, keyword, abs_start)] = reason
+        return False
+
+    def skipped_counts(self) -> Counter:
+        """Occurrences decided without an LLM call, by reason."""
+        with self._lock:
+            return Counter(self._skipped.values())
+
+
+def document_prefilter(settings: PreFilterSettings | None, sentence_index) -> DocumentPreFilter | None:
+    """Return the :class:`DocumentPreFilter` of one document, or None without *settings*."""
+    if settings is None:
+        return None
+    return DocumentPreFilter(settings, sentence_index)
+
+
+def decided_verdict(journal, prefilter, enabler: str, occurrence: Occurrence) -> Optional[bool]:
+    """Return the verdict of *occurrence* that needs no LLM call, or None.
+
+    That is the verdict recorded in the run *journal* (a
+    :class:`run_journal.PdfJournal`), else the *prefilter*'s; either may
+    be None.
+    """
+    verdict = journal.verdict(enabler, occurrence) if journal is not None else None
+    if verdict is None and prefilter is not None:
+        verdict = prefilter.verdict(enabler, occurrence)
+    return verdict
+
+
+def prefilter_counts(prefilter: DocumentPreFilter | None) -> Counter | None:
+    """The skipped-occurrence counts of *prefilter*, if there is one."""
+    if prefilter is None:
+        return None
+    return prefilter.skipped_counts()
+
+
+def describe_counts(counts: Counter) -> str:
+    """One-line report of the occurrences decided without an LLM call, by reason."""
+    reasons = ", ".join(f"{reason}: {count}" for reason, count in sorted(counts.items()))
+    return (
+        f"Pre-filter: {sum(counts.values())} occurrence(s) decided without an LLM call"
+        + (f" ({reasons})" if reasons else "")
+    )
+
+
+# -- training CLI ----------------------------------------------------------------
+
+def _journal_files(paths: Iterable[str]) -> List[Path]:
+    from run_journal import JOURNAL_FILE_NAME
+
+    files = []
+    for raw in paths:
+        path = Path(raw)
+        files.append(path / JOURNAL_FILE_NAME if path.is_dir() else path)
+    return [path for path in files if path.is_file()]
+
+
+def _train(args: argparse.Namespace) -> int:
+    from run_journal import RunJournal
+
+    journals = _journal_files(args.runs)
+    if not journals:
+        print("No run journals found.", file=sys.stderr)
+        return 1
+    labelled = [row for path in journals for row in RunJournal(path).labelled_paragraphs()]
+    model = NaiveBayesModel.train(labelled)
+    model.save(args.output)
+
+    skipped = [significant for paragraph, significant in labelled
+               if model.prob_not_significant(paragraph) >= args.threshold]
+    print(f"Trained on {len(labelled)} verdict(s) from {len(journals)} journal(s): "
+          f"{model.docs[0]} not significant, {model.docs[1]} significant.")
+    if not model.trusted:
+        print(f"Warning: fewer than {MIN_VERDICTS_PER_CLASS} verdicts of one class; "
+              "the model will not be used.")
+    print(f"At threshold {args.threshold}: {len(skipped)} training verdict(s) would be skipped, "
+          f"{sum(skipped)} of them significant.")
+    print(f"Saved model to {args.output}")
+    return 0
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Occurrence pre-filter model")
+    sub = parser.add_subparsers(dest="command", required=True)
+    train = sub.add_parser("train", help="Train the model over the verdicts of earlier runs")
+    train.add_argument("runs", nargs="+", help="Results/<timestamp> directories or run_journal.sqlite files")
+    train.add_argument("--output", default="prefilter_model.json", help="Model file to write")
+    train.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                       help=f"Report the training verdicts skipped at this probability (default: {DEFAULT_THRESHOLD})")
+    args = parser.parse_args(argv)
+    return _train(args)
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI entry point
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""Prompt layout for provider-side prompt (KV) caching.
+
+Providers cache the longest prefix shared with an earlier request:
+OpenAI, DeepSeek and Grok models on OpenRouter do it automatically,
+Anthropic and Gemini models only up to an explicit ``cache_control``
+breakpoint, and llama.cpp reuses a slot's KV cache when ``cache_prompt`` is
+set. Method 1 sends thousands of occurrence prompts that differ only in
+their last lines, so the invariant part must come first and stay
+byte-identical:
+
+    system message                 (constant)
+    keyword_occurrence_prompt.txt  (constant)
+    Enabler / Description          (constant per category)
+    ---- cache breakpoint ----
+    Keyword / Context              (per occurrence)
+
+``occurrence_batching`` builds its prompts as :class:`CacheablePrompt`, a
+``str`` that remembers where its invariant prefix ends. The text is the
+same as before, so response-cache keys, token estimates and logging are
+unaffected. ``LLMAnalyzer`` turns it into the provider-specific request
+with :func:`user_content` and :func:`cache_hints`, and records the
+provider's cached-token count in ``CallRecord.cached_tokens``.
+"""
+
+from __future__ import annotations
+
+from typing import List, Union
+
+# Model prefixes that need an explicit breakpoint on OpenRouter.
+CACHE_CONTROL_MODEL_PREFIXES = ("anthropic/", "google/gemini")
+
+
+class CacheablePrompt(str):
+    """A user message whose first ``len(prefix)`` characters are shared by many requests."""
+
+    prefix: str
+
+    def __new__(cls, prefix: str, suffix: str) -> "CacheablePrompt":
+        prompt = super().__new__(cls, prefix + suffix)
+        prompt.prefix = prefix
+        return prompt
+
+    def __reduce__(self):
+        return (CacheablePrompt, (self.prefix, self.suffix))
+
+    @property
+    def suffix(self) -> str:
+        return str(self)[len(self.prefix):]
+
+
+def supports_cache_control(provider: str, model_name: str) -> bool:
+    """True when *model_name* on *provider* honours ``cache_control`` breakpoints."""
+    return provider == "openrouter" and model_name.lower().startswith(CACHE_CONTROL_MODEL_PREFIXES)
+
+
+def user_content(provider: str, model_name: str, message: str) -> Union[str, List[dict]]:
+    """Return the ``content`` of the user message for one request.
+
+    A :class:`CacheablePrompt` sent to a model that needs explicit
+    breakpoints becomes two text parts with ``cache_control`` on the
+    prefix; everything else is sent as plain text.
+    """
+    if (
+        isinstance(message, CacheablePrompt)
+        and message.prefix
+        and supports_cache_control(provider, model_name)
+    ):
+        return [
+            {"type": "text", "text": message.prefix, "cache_control": {"type": "ephemeral"}},
+            {"type": "text", "text": message.suffix},
+        ]
+    return str(message)
+
+
+def cache_hints(provider: str) -> dict:
+    """Extra ``chat.completions.create`` arguments that enable prompt caching."""
+    if provider == "local":
+        # llama.cpp server: reuse the slot's KV cache for the common prefix.
+        return {"extra_body": {"cache_prompt": True}}
+    return {}
@@ -0,0 +1,353 @@
+"""Adaptive client-side rate limiter shared by threads and processes.
+
+One :class:`AdaptiveRateLimiter` paces every LLM request of a run per
+``(provider, model)`` key instead of letting each worker discover 429s on
+its own and back off blindly:
+
+    * **Pacing** — each key has a requests-per-minute budget and, once known,
+      a tokens-per-minute budget (GCRA / virtual-scheduling token bucket
+      with a small burst allowance). :func:`wait_for_slot` and
+      :func:`await_slot` block until the key has a free slot.
+    * **AIMD** — until the first 429 a key is in slow start (each success
+      raises its budget by ``slow_start_step``, i.e. exponential growth with
+      traffic); afterwards every success raises it additively (about
+      ``increase_rpm`` per minute of traffic). A 429 sets the budget to
+      ``decrease_factor`` times the lower of the budget and the throughput
+      actually achieved over the last few seconds (at most once per
+      ``decrease_cooldown`` seconds, so a burst of concurrent 429s counts as
+      one congestion signal) and pauses the key for the provider's
+      ``Retry-After``.
+    * **Headers** — OpenAI-style ``x-ratelimit-limit-requests`` /
+      ``x-ratelimit-limit-tokens`` cap the learned budgets;
+      ``x-ratelimit-remaining-*`` of 0 and OpenRouter's
+      ``X-RateLimit-Remaining`` / ``X-RateLimit-Reset`` pause the key until
+      the window resets.
+
+Sharing: threads of one process share an instance directly (all state is
+behind one lock). ``run_pipeline_parallel`` starts the limiter in a
+``multiprocessing`` manager process (:func:`start_shared_rate_limiter`) and
+hands the proxy to every worker, so all processes draw from the same budget.
+Methods take and return only plain values so the proxy calls stay cheap.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from multiprocessing.managers import BaseManager
+from typing import Deque, Dict, Mapping, Tuple
+
+_WINDOW_S = 60.0
+_OBSERVED_S = 10.0   # throughput window used for multiplicative decrease
+_MAX_POLL_S = 5.0    # longest single sleep while waiting for a slot
+
+# Response headers consulted by the limiter (lower-case).
+_HEADER_NAMES = (
+    "retry-after",
+    "retry-after-ms",
+    "x-ratelimit-limit-requests",
+    "x-ratelimit-remaining-requests",
+    "x-ratelimit-reset-requests",
+    "x-ratelimit-limit-tokens",
+    "x-ratelimit-remaining-tokens",
+    "x-ratelimit-reset-tokens",
+    "x-ratelimit-remaining",
+    "x-ratelimit-reset",
+)
+
+_DURATION_PART_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+
+
+def rate_limit_headers(headers) -> Dict[str, str]:
+    """Return the rate-limit related subset of *headers* as a plain dict.
+
+    *headers* may be any mapping (``httpx.Headers``, dict) or None.
+    """
+    if not headers:
+        return {}
+    found = {}
+    for name in _HEADER_NAMES:
+        value = headers.get(name)
+        if value is not None:
+            found[name] = str(value)
+    return found
+
+
+def estimate_tokens(*texts: str) -> int:
+    """Rough prompt size (~4 characters per token) used to reserve tokens."""
+    return max(1, sum(len(text) for text in texts) // 4)
+
+
+def _parse_duration(value: str | None) -> float | None:
+    """Parse ``"1.5"``, ``"20ms"``, ``"6m0s"`` style durations into seconds."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    parts = _DURATION_PART_RE.findall(value)
+    if not parts:
+        return None
+    scale = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+    return sum(float(number) * scale[unit] for number, unit in parts)
+
+
+def _parse_float(value: str | None) -> float | None:
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+@dataclass
+class _KeyState:
+    rpm: float
+    tpm: float | None = None
+    rpm_ceiling: float | None = None
+    tpm_ceiling: float | None = None
+    request_tat: float = 0.0          # theoretical arrival time of the next request
+    token_tat: float = 0.0            # same for the token bucket
+    paused_until: float = 0.0
+    last_decrease: float = 0.0
+    slow_start: bool = True
+    window: Deque[Tuple[float, int]] = field(default_factory=deque)
+    requests: int = 0
+    throttled: int = 0
+
+
+class AdaptiveRateLimiter:
+    """AIMD token-bucket limiter keyed by ``"<provider>|<model>"``."""
+
+    def __init__(
+        self,
+        initial_rpm: float = 60.0,
+        min_rpm: float = 1.0,
+        max_rpm: float = 10_000.0,
+        increase_rpm: float = 30.0,
+        slow_start_step: float = 0.05,
+        decrease_factor: float = 0.8,
+        decrease_cooldown: float = 2.0,
+        burst: int = 5,
+    ) -> None:
+        self.initial_rpm = initial_rpm
+        self.min_rpm = min_rpm
+        self.max_rpm = max_rpm
+        self.increase_rpm = increase_rpm
+        self.slow_start_step = slow_start_step
+        self.decrease_factor = decrease_factor
+        self.decrease_cooldown = decrease_cooldown
+        self.burst = max(1, burst)
+        self._states: Dict[str, _KeyState] = {}
+        self._lock = threading.Lock()
+
+    def _state(self, key: str) -> _KeyState:
+        state = self._states.get(key)
+        if state is None:
+            state = self._states[key] = _KeyState(rpm=self.initial_rpm)
+        return state
+
+    # -- pacing -------------------------------------------------------------
+
+    def try_acquire(self, key: str, est_tokens: int = 0) -> float:
+        """Take one request slot (and *est_tokens* tokens) for *key* if free.
+
+        Returns ``0.0`` when the slot was taken, otherwise the number of
+        seconds until the next slot may be free (nothing is reserved, so
+        a budget change applies to every waiter immediately). Callers use
+        :func:`wait_for_slot` / :func:`await_slot` rather than this method.
+        """
+        with self._lock:
+            now = time.monotonic()
+            state = self._state(key)
+            if state.paused_until > now:
+                return state.paused_until - now
+
+            interval = _WINDOW_S / state.rpm
+            tolerance = (self.burst - 1) * interval
+            request_tat = max(state.request_tat, now)
+            wait = request_tat - tolerance - now
+
+            token_tat = max(state.token_tat, now)
+            if state.tpm:
+                # Allow up to ~1/6 of a minute's token budget in one burst.
+                wait = max(wait, token_tat - _WINDOW_S / 6 - now)
+            if wait > 0:
+                return wait
+
+            state.request_tat = request_tat + interval
+            if state.tpm:
+                state.token_tat = token_tat + est_tokens * _WINDOW_S / state.tpm
+            state.requests += 1
+            return 0.0
+
+    # -- feedback -----------------------------------------------------------
+
+    def record_success(
+        self,
+        key: str,
+        tokens: int,
+        est_tokens: int = 0,
+        headers: Mapping[str, str] | None = None,
+    ) -> None:
+        """Additive increase after a successful request of *tokens* tokens."""
+        with self._lock:
+            now = time.monotonic()
+            state = self._state(key)
+            state.window.append((now, tokens))
+            while state.window and state.window[0][0] < now - _WINDOW_S:
+                state.window.popleft()
+
+            if state.tpm:
+                # Correct the token reservation by the real usage.
+                state.token_tat += (tokens - est_tokens) * _WINDOW_S / state.tpm
+
+            if state.slow_start:
+                growth = self.slow_start_step
+            else:
+                growth = self.increase_rpm / state.rpm / state.rpm
+            if state.tpm and state.tpm_ceiling is None:
+                state.tpm *= 1.0 + growth
+            state.rpm = min(
+                state.rpm * (1.0 + growth), state.rpm_ceiling or self.max_rpm, self.max_rpm
+            )
+            self._apply_headers(state, headers or {}, now)
+
+    def record_rate_limited(
+        self,
+        key: str,
+        headers: Mapping[str, str] | None = None,
+        message: str = "",
+    ) -> None:
+        """Multiplicative decrease and pause after a 429 for *key*."""
+        headers = headers or {}
+        with self._lock:
+            now = time.monotonic()
+            state = self._state(key)
+            state.throttled += 1
+
+            retry_after = _parse_duration(headers.get("retry-after-ms"))
+            if retry_after is not None:
+                retry_after /= 1000.0
+            else:
+                retry_after = _parse_duration(headers.get("retry-after"))
+            if retry_after:
+                state.paused_until = max(state.paused_until, now + retry_after)
+            self._apply_headers(state, headers, now)
+
+            if now - state.last_decrease < self.decrease_cooldown:
+                return
+            state.last_decrease = now
+            state.slow_start = False
+            observed_rpm, observed_tpm = self._observed_rates(state, now)
+            base_rpm = min(state.rpm, observed_rpm) if observed_rpm else state.rpm
+            state.rpm = max(self.min_rpm, base_rpm * self.decrease_factor)
+            if "token" in message.lower():
+                if state.tpm is None:
+                    state.tpm = observed_tpm
+                elif observed_tpm:
+                    state.tpm = min(state.tpm, observed_tpm)
+                if state.tpm:
+                    state.tpm = max(1.0, state.tpm * self.decrease_factor)
+            # Pace the next requests from the end of the pause at the new rate.
+            state.request_tat = max(state.paused_until, now)
+            state.token_tat = state.request_tat
+
+    @staticmethod
+    def _observed_rates(state: _KeyState, now: float) -> Tuple[float | None, float | None]:
+        """Successful requests/min and tokens/min over the last few seconds."""
+        recent = [(t, tokens) for t, tokens in state.window if t >= now - _OBSERVED_S]
+        if not recent:
+            return None, None
+        span = max(1.0, now - recent[0][0])
+        scale = _WINDOW_S / span
+        tokens = sum(tokens for _, tokens in recent)
+        return len(recent) * scale, (tokens * scale or None)
+
+    def _apply_headers(self, state: _KeyState, headers: Mapping[str, str], now: float) -> None:
+        limit_requests = _parse_float(headers.get("x-ratelimit-limit-requests"))
+        if limit_requests:
+            state.rpm_ceiling = limit_requests
+            state.rpm = min(state.rpm, limit_requests)
+        limit_tokens = _parse_float(headers.get("x-ratelimit-limit-tokens"))
+        if limit_tokens:
+            state.tpm_ceiling = limit_tokens
+            state.tpm = min(state.tpm or limit_tokens, limit_tokens)
+
+        for kind in ("requests", "tokens"):
+            if _parse_float(headers.get(f"x-ratelimit-remaining-{kind}")) == 0:
+                reset = _parse_duration(headers.get(f"x-ratelimit-reset-{kind}"))
+                if reset:
+                    state.paused_until = max(state.paused_until, now + reset)
+
+        # OpenRouter: X-RateLimit-Reset is an epoch timestamp in milliseconds.
+        if _parse_float(headers.get("x-ratelimit-remaining")) == 0:
+            reset_ms = _parse_float(headers.get("x-ratelimit-reset"))
+            if reset_ms:
+                wait = reset_ms / 1000.0 - time.time()
+                if 0 < wait < 3600:
+                    state.paused_until = max(state.paused_until, now + wait)
+
+    # -- reporting ----------------------------------------------------------
+
+    def snapshot(self) -> Dict[str, dict]:
+        """Return the learned budgets and counters of every key."""
+        with self._lock:
+            return {
+                key: {
+                    "rpm": round(state.rpm, 2),
+                    "tpm": round(state.tpm, 1) if state.tpm else None,
+                    "requests": state.requests,
+                    "throttled": state.throttled,
+                }
+                for key, state in self._states.items()
+            }
+
+
+def wait_for_slot(limiter, key: str, est_tokens: int = 0) -> float:
+    """Block until *limiter* grants a slot for *key*; return the seconds waited."""
+    waited = 0.0
+    while True:
+        wait = limiter.try_acquire(key, est_tokens)
+        if wait <= 0:
+            return waited
+        # A little jitter keeps waiters that woke together from colliding.
+        wait = min(wait, _MAX_POLL_S) * (1.0 + 0.1 * random.random())
+        time.sleep(wait)
+        waited += wait
+
+
+async def await_slot(limiter, key: str, est_tokens: int = 0) -> float:
+    """Coroutine counterpart of :func:`wait_for_slot`."""
+    waited = 0.0
+    while True:
+        wait = limiter.try_acquire(key, est_tokens)
+        if wait <= 0:
+            return waited
+        wait = min(wait, _MAX_POLL_S) * (1.0 + 0.1 * random.random())
+        await asyncio.sleep(wait)
+        waited += wait
+
+
+class _RateLimiterManager(BaseManager):
+    pass
+
+
+_RateLimiterManager.register("AdaptiveRateLimiter", AdaptiveRateLimiter)
+
+
+def start_shared_rate_limiter(**kwargs) -> Tuple[BaseManager, AdaptiveRateLimiter]:
+    """Start a manager process hosting one limiter; return ``(manager, proxy)``.
+
+    The proxy is picklable and can be passed to ``ProcessPoolExecutor``
+    workers. Call ``manager.shutdown()`` once every worker is done.
+    """
+    manager = _RateLimiterManager()
+    manager.start()
+    return manager, manager.AdaptiveRateLimiter(**kwargs)
@@ -0,0 +1,235 @@
+"""Crash-safe run journal for Method 1 (``--resume``).
+
+Every run writes ``run_journal.sqlite`` into its ``Results/<timestamp>``
+directory and records, as soon as each piece of work completes:
+
+    * each occurrence verdict (significant or not), keyed by PDF name,
+      enabler, keyword and absolute offset in the extracted text, with its
+      paragraph (training data of the ``prefilter.py`` model);
+    * each final category analysis (selected model + LLM reply);
+    * each finished PDF (all of its output files written).
+
+``python main.py ... --resume Results/<timestamp>`` writes into that
+directory again: finished PDFs are skipped, recorded verdicts are replayed
+instead of re-asked (in the original order, so the paragraph dedup and the
+significant files come out the same), and recorded category analyses are
+reused. Only the missing work is sent to the LLM, so the cost files of a
+resumed run cover that work only. Resume with the same source folder,
+keywords file and model options as the original run.
+
+Storage follows ``llm_cache.ResponseCache``: one SQLite connection per
+(process, thread), WAL mode, writers wait on SQLite's busy timeout, so the
+threads and worker processes of ``--parallel`` all append to one file. A
+failed LLM call is not a verdict and is not recorded; it is retried on
+resume.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+Occurrence = Tuple[int, str, str, int]              # (page, keyword, paragraph, abs_start)
+OccurrencesByEnabler = Dict[str, List[Occurrence]]
+VerdictKey = Tuple[str, str, int]                   # (enabler, keyword, abs_start)
+
+JOURNAL_FILE_NAME = "run_journal.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS verdicts (
+    pdf TEXT NOT NULL,
+    enabler TEXT NOT NULL,
+    keyword TEXT NOT NULL,
+    abs_start INTEGER NOT NULL,
+    page INTEGER NOT NULL,
+    significant INTEGER NOT NULL,
+    recorded_at REAL NOT NULL,
+    paragraph TEXT,
+    PRIMARY KEY (pdf, enabler, keyword, abs_start)
+);
+CREATE TABLE IF NOT EXISTS categories (
+    pdf TEXT NOT NULL,
+    category_index INTEGER NOT NULL,
+    enabler TEXT NOT NULL,
+    model TEXT,
+    analysis TEXT NOT NULL,
+    recorded_at REAL NOT NULL,
+    PRIMARY KEY (pdf, category_index)
+);
+CREATE TABLE IF NOT EXISTS pdfs (
+    pdf TEXT PRIMARY KEY,
+    finished_at REAL NOT NULL
+);
+"""
+
+
+def journal_path_for(run_dir: Path | str) -> Path:
+    """Return the journal file of the run stored in *run_dir*."""
+    return Path(run_dir) / JOURNAL_FILE_NAME
+
+
+class RunJournal:
+    """SQLite journal of one run directory."""
+
+    def __init__(self, path: Path | str, timeout: float = 30.0) -> None:
+        self.path = str(path)
+        self.timeout = timeout
+        self._local = threading.local()
+        conn = self._connect()
+        conn.executescript(_SCHEMA)
+        # Journals written before the paragraph column existed.
+        if "paragraph" not in {row[1] for row in conn.execute("PRAGMA table_info(verdicts)")}:
+            conn.execute("ALTER TABLE verdicts ADD COLUMN paragraph TEXT")
+
+    def _connect(self) -> sqlite3.Connection:
+        # Same policy as llm_cache.ResponseCache: connections must not cross
+        # threads or a fork.
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _write(self, sql: str, rows: Sequence[tuple]) -> None:
+        try:
+            conn = self._connect()
+            with conn:
+                conn.executemany(sql, rows)
+        except sqlite3.Error as exc:
+            logging.warning("Run journal write failed: %s", exc)
+
+    def _read(self, sql: str, params: tuple) -> List[tuple]:
+        try:
+            return self._connect().execute(sql, params).fetchall()
+        except sqlite3.Error as exc:
+            logging.warning("Run journal read failed: %s", exc)
+            return []
+
+    # -- PDFs -----------------------------------------------------------------
+
+    def finished_pdfs(self) -> Set[str]:
+        """Return the names of the PDFs whose outputs were all written."""
+        return {name for (name,) in self._read("SELECT pdf FROM pdfs", ())}
+
+    def mark_finished(self, pdf_path: Path | str) -> None:
+        self._write(
+            "INSERT OR REPLACE INTO pdfs VALUES (?, ?)",
+            [(Path(pdf_path).name, time.time())],
+        )
+
+    def for_pdf(self, pdf_path: Path | str) -> "PdfJournal":
+        return PdfJournal(self, Path(pdf_path).name)
+
+    def labelled_paragraphs(self) -> List[Tuple[str, bool]]:
+        """Return ``(paragraph, significant)`` for every recorded LLM verdict.
+
+        Training data of the pre-filter model (``prefilter.py``).
+        """
+        return [
+            (paragraph, bool(significant))
+            for paragraph, significant in self._read(
+                "SELECT paragraph, significant FROM verdicts WHERE paragraph IS NOT NULL", ()
+            )
+        ]
+
+
+class PdfJournal:
+    """The part of a :class:`RunJournal` that belongs to one PDF.
+
+    Recorded verdicts are loaded once at construction; lookups are
+    in-memory and safe from any thread.
+    """
+
+    def __init__(self, journal: RunJournal, pdf_name: str) -> None:
+        self.journal = journal
+        self.pdf_name = pdf_name
+        self._verdicts: Dict[VerdictKey, bool] = {
+            (enabler, keyword, abs_start): bool(significant)
+            for enabler, keyword, abs_start, significant in journal._read(
+                "SELECT enabler, keyword, abs_start, significant FROM verdicts WHERE pdf = ?",
+                (pdf_name,),
+            )
+        }
+
+    @property
+    def replayable(self) -> int:
+        """Number of verdicts recorded by earlier attempts of this run."""
+        return len(self._verdicts)
+
+    def verdict(self, enabler: str, occurrence: Occurrence) -> Optional[bool]:
+        """Return the recorded verdict of *occurrence*, or None if it was never decided."""
+        _page, keyword, _paragraph, abs_start = occurrence
+        return self._verdicts.get((enabler, keyword, abs_start))
+
+    def record_verdicts(
+        self,
+        enabler: str,
+        occurrences: Sequence[Occurrence],
+        verdicts: Sequence[Optional[bool]],
+    ) -> None:
+        """Record the decided verdicts of *occurrences* (``None`` entries are skipped)."""
+        rows = []
+        now = time.time()
+        for (page, keyword, paragraph, abs_start), verdict in zip(occurrences, verdicts):
+            if verdict is None:
+                continue
+            self._verdicts[(enabler, keyword, abs_start)] = bool(verdict)
+            rows.append(
+                (self.pdf_name, enabler, keyword, abs_start, page, int(bool(verdict)), now, paragraph)
+            )
+        if rows:
+            self.journal._write(
+                "INSERT OR REPLACE INTO verdicts "
+                "(pdf, enabler, keyword, abs_start, page, significant, recorded_at, paragraph) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def split(
+        self, enabler_occurrences: OccurrencesByEnabler
+    ) -> Tuple[OccurrencesByEnabler, Dict[str, List[Occurrence]]]:
+        """Return ``(pending, replayed_significant)`` for *enabler_occurrences*.
+
+        ``pending`` keeps the occurrences without a recorded verdict;
+        ``replayed_significant`` lists, in original order, the occurrences
+        recorded as significant.
+        """
+        pending: OccurrencesByEnabler = {}
+        replayed: Dict[str, List[Occurrence]] = {}
+        for enabler, occurrences in enabler_occurrences.items():
+            pending[enabler] = []
+            replayed[enabler] = []
+            for occurrence in occurrences:
+                verdict = self.verdict(enabler, occurrence)
+                if verdict is None:
+                    pending[enabler].append(occurrence)
+                elif verdict:
+                    replayed[enabler].append(occurrence)
+        return pending, replayed
+
+    def category_analysis(self, category_index: int) -> Optional[Tuple[str, str]]:
+        """Return the recorded ``(selected_model, analysis)`` of a category, if any."""
+        rows = self.journal._read(
+            "SELECT model, analysis FROM categories WHERE pdf = ? AND category_index = ?",
+            (self.pdf_name, category_index),
+        )
+        return (rows[0][0], rows[0][1]) if rows else None
+
+    def record_category_analysis(
+        self, category_index: int, enabler: str, selected_model: str | None, analysis: str
+    ) -> None:
+        self.journal._write(
+            "INSERT OR REPLACE INTO categories VALUES (?, ?, ?, ?, ?, ?)",
+            [(self.pdf_name, category_index, enabler, selected_model, analysis, time.time())],
+        )
+
+    def mark_finished(self) -> None:
+        self.journal.mark_finished(self.pdf_name)
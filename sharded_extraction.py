@@ -0,0 +1,90 @@
+"""Page-range sharded PDF text extraction on a process pool (``--extract-workers``).
+
+``PdfReader.pages[i].extract_text()`` is pure Python and CPU-bound, so one
+PDF is parsed on one core even when the LLM stage is parallel. Here the
+page range of one PDF is split into contiguous shards that worker
+processes extract independently (each opens its own ``PdfReader``; reader
+objects are not picklable), and the pages are reassembled in page order.
+
+The result is exactly the page list of the sequential extractor, so the
+``"Page N:\\n..."`` layout built by ``main.read_pdf`` and the entries of
+``pdf_text_cache`` are unchanged. Shards are submitted all at once but
+yielded strictly in order, which lets the streaming pipeline
+(``streaming.py``) consume page 1 while later shards are still being parsed.
+
+Sharding only pays off above a few dozen pages; shorter PDFs (or
+``workers <= 1``) are extracted in-process as before.
+"""
+
+from __future__ import annotations
+
+import concurrent.futures
+import os
+from pathlib import Path
+from typing import Iterator, List, Tuple
+
+# Pages per shard never drop below this: a shard re-opens the PDF, so tiny
+# shards spend more time parsing the document structure than the pages.
+MIN_SHARD_PAGES = 8
+# Shards per worker: more, smaller shards even out pages of uneven cost.
+SHARDS_PER_WORKER = 4
+
+
+def resolve_workers(workers: int) -> int:
+    """Map the CLI value to a process count (``0`` = every core)."""
+    if workers <= 0:
+        return os.cpu_count() or 1
+    return workers
+
+
+def plan_shards(page_count: int, workers: int) -> List[Tuple[int, int]]:
+    """Return contiguous ``[start, stop)`` page ranges covering *page_count* pages."""
+    if page_count <= 0:
+        return []
+    shard_count = max(1, min(workers * SHARDS_PER_WORKER, page_count // MIN_SHARD_PAGES))
+    size, extra = divmod(page_count, shard_count)
+    shards: List[Tuple[int, int]] = []
+    start = 0
+    for index in range(shard_count):
+        stop = start + size + (1 if index < extra else 0)
+        shards.append((start, stop))
+        start = stop
+    return shards
+
+
+def _extract_page_range(pdf_path: str, start: int, stop: int) -> List[str]:
+    """Picklable pool entry point: the text of pages ``[start, stop)``."""
+    from PyPDF2 import PdfReader
+
+    reader = PdfReader(pdf_path)
+    return [reader.pages[index].extract_text() or "" for index in range(start, stop)]
+
+
+def iter_pages_sharded(pdf_path: Path | str, workers: int) -> Iterator[str]:
+    """Yield the text of every page of *pdf_path*, in order, parsed by *workers* processes."""
+    from PyPDF2 import PdfReader
+
+    pdf_path = Path(pdf_path)
+    reader = PdfReader(str(pdf_path))
+    shards = plan_shards(len(reader.pages), workers)
+    if workers <= 1 or len(shards) <= 1:
+        for page in reader.pages:
+            yield page.extract_text() or ""
+        return
+    del reader
+
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=min(workers, len(shards))
+    ) as pool:
+        futures = [
+            pool.submit(_extract_page_range, str(pdf_path), start, stop)
+            for start, stop in shards
+        ]
+        try:
+            for future in futures:
+                yield from future.result()
+        finally:
+            # Abandoned early (consumer stopped or a shard failed): drop the
+            # shards that have not started yet.
+            for future in futures:
+                future.cancel()
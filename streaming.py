@@ -0,0 +1,187 @@
+"""Pipelined extraction → keyword search → LLM filtering (``--stream``).
+
+Without streaming, ``process_single_pdf`` and ``process_single_pdf_v2`` run
+three strict barriers: the whole PDF is extracted, then the whole text is
+searched, then the first LLM request goes out. :class:`OccurrenceStream`
+overlaps the stages instead:
+
+    extraction thread ──(bounded page queue)──▶ keyword search ──▶ occurrences
+
+* An extraction thread pulls pages one at a time from
+  :func:`pdf_text_cache.iter_pypdf2_pages` (cache hits replay the stored
+  pages) and puts them on a ``queue.Queue(maxsize=page_buffer)``, so the
+  parser never runs more than ``page_buffer`` pages ahead of the consumer
+  (plus the shards in flight with ``extract_workers > 1``).
+* The consumer appends each page to the document text exactly as
+  ``main.read_pdf`` lays it out (``"Page N:\\n<text>\\n"``), extends the
+  shared :class:`keyword_search.SentenceIndex` and searches only the new
+  page (:meth:`KeywordSearcher.iter_page_occurrences`).
+* An occurrence is yielded, with its extended context, as soon as that
+  context is final, i.e. the next non-blank sentence has been terminated
+  (:meth:`SentenceIndex.context_settled`). The LLM stage can start on page
+  one while the parser is still on page two.
+
+Outputs are identical to the barrier pipeline: the final text, sentence
+index and per-enabler occurrence lists (same order) are exposed on the
+stream once it is exhausted, and the ``<stem>.txt`` copy is written as by
+``read_pdf``. Occurrences of different enablers come interleaved in page
+order; within one enabler they keep the order of
+``check_enabler_occurrences``.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+from collections import deque
+from pathlib import Path
+from time import monotonic
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+
+from colorama import Fore, Style
+
+from keyword_search import PAGE_HEADER_PATTERN, KeywordSearcher, SentenceIndex
+from pdf_text_cache import iter_pypdf2_pages
+
+Occurrence = Tuple[int, str, str, int]              # (page, keyword, paragraph, abs_start)
+StreamedOccurrence = Tuple[str, Occurrence, str]    # (enabler, occurrence, extended_context)
+
+DEFAULT_PAGE_BUFFER = 8
+
+_DONE = object()
+
+
+class _ExtractionError:
+    def __init__(self, exc: BaseException) -> None:
+        self.exc = exc
+
+
+class OccurrenceStream:
+    """Iterate the keyword occurrences of one PDF while it is being extracted.
+
+    Yields ``(enabler, occurrence, extended_context)`` tuples. After the
+    iteration completes, ``pdf_text``, ``sentence_index``,
+    ``enabler_occurrences`` and ``total_occurrences`` hold the same values
+    as the barrier pipeline, and ``first_occurrence_s`` is the time from
+    the start of the iteration to the first yielded occurrence (None if
+    there was none).
+    """
+
+    def __init__(
+        self,
+        pdf_path: Path | str,
+        keyword_searcher: KeywordSearcher,
+        page_buffer: int = DEFAULT_PAGE_BUFFER,
+        save_text: bool = True,
+        extract_workers: int = 1,
+    ) -> None:
+        self.pdf_path = Path(pdf_path)
+        self.keyword_searcher = keyword_searcher
+        self.page_buffer = max(1, page_buffer)
+        self.save_text = save_text
+        self.extract_workers = extract_workers
+        self.sentence_index = SentenceIndex("")
+        self.enabler_occurrences: Dict[str, List[Occurrence]] = {
+            enabler: [] for enabler in keyword_searcher.enabler_keywords
+        }
+        self.total_occurrences = 0
+        self.first_occurrence_s: Optional[float] = None
+        self._from_cache = False
+        self._stop = threading.Event()
+
+    @property
+    def pdf_text(self) -> str:
+        return self.sentence_index.text
+
+    # -- extraction stage -----------------------------------------------------
+
+    def _on_cache_hit(self, page_count: int) -> None:
+        self._from_cache = True
+        print(Fore.CYAN + f"Loaded extracted text for {page_count} pages from cache." + Style.RESET_ALL)
+
+    def _put(self, pages: "queue.Queue", item) -> bool:
+        # Blocks while the consumer is ``page_buffer`` pages behind; gives up
+        # if the consumer stopped iterating.
+        while not self._stop.is_set():
+            try:
+                pages.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _extract(self, pages: "queue.Queue") -> None:
+        try:
+            for page_num, page_text in enumerate(
+                iter_pypdf2_pages(
+                    self.pdf_path, on_hit=self._on_cache_hit, workers=self.extract_workers
+                ),
+                start=1,
+            ):
+                if not self._put(pages, (page_num, page_text)):
+                    return
+        except BaseException as exc:  # forwarded to the consumer
+            self._put(pages, _ExtractionError(exc))
+            return
+        self._put(pages, _DONE)
+
+    # -- search stage ---------------------------------------------------------
+
+    def __iter__(self) -> Iterator[StreamedOccurrence]:
+        from main import extract_extended_context, save_extracted_text
+
+        start = monotonic()
+        pages: "queue.Queue" = queue.Queue(maxsize=self.page_buffer)
+        extractor = threading.Thread(
+            target=self._extract, args=(pages,), name="pdf-extract", daemon=True
+        )
+        extractor.start()
+
+        index = self.sentence_index
+        pending: Deque[Tuple[str, Occurrence]] = deque()
+
+        def ready(flush: bool) -> Iterator[StreamedOccurrence]:
+            while pending and (flush or index.context_settled(pending[0][1][3])):
+                enabler, occurrence = pending.popleft()
+                _page, keyword, _paragraph, abs_start = occurrence
+                if self.first_occurrence_s is None:
+                    self.first_occurrence_s = monotonic() - start
+                yield enabler, occurrence, extract_extended_context(
+                    index.text, abs_start, abs_start + len(keyword), index
+                )
+
+        try:
+            while True:
+                item = pages.get()
+                if item is _DONE:
+                    break
+                if isinstance(item, _ExtractionError):
+                    raise item.exc
+                page_num, page_text = item
+                if not self._from_cache:
+                    print(Fore.CYAN + f"Extracted text from page {page_num}:" + Style.RESET_ALL)
+                if not page_text:
+                    if not self._from_cache:
+                        print(Fore.YELLOW + "  No text extracted from this page." + Style.RESET_ALL)
+                    continue
+                part_start = len(index.text)
+                part = f"Page {page_num}:\n{page_text}\n"
+                index.extend(part)
+                for enabler, occurrence in self.keyword_searcher.iter_page_occurrences(
+                    part, index, offset=part_start
+                ):
+                    self.enabler_occurrences[enabler].append(occurrence)
+                    self.total_occurrences += 1
+                    pending.append((enabler, occurrence))
+                yield from ready(flush=False)
+
+            # End of document: every remaining context is final.
+            yield from ready(flush=True)
+        finally:
+            self._stop.set()
+            extractor.join()
+
+        if not PAGE_HEADER_PATTERN.search(index.text):
+            print("Warning: No page headers found in text.")
+        if self.save_text:
+            save_extracted_text(self.pdf_path, index.text)
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Benchmark extract_text_smartly against the previous crop-based layout logic.
+
+Both versions run on the same already-parsed pages (page objects are loaded
+before timing), so the figures compare layout work only. Every page's text
+is checked to be identical.
+
+    python utils/benchmark_smart_extraction.py papers/*.pdf --repeat 3
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Allow running as ``python utils/benchmark_smart_extraction.py`` from the repository root.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pdfplumber
+
+import pdf_keyword_searcher
+from pdf_keyword_searcher import extract_text_smartly
+
+
+def extract_text_cropped(page):
+    """The previous extract_text_smartly: one page.crop + extract_text per region."""
+    words = page.extract_words()
+    width = page.width
+    height = page.height
+    center = width / 2
+    epsilon = 10
+
+    spanning_intervals = sorted(
+        (w['top'], w['bottom']) for w in words
+        if w['x0'] < center - epsilon and w['x1'] > center + epsilon
+    )
+    merged = []
+    if spanning_intervals:
+        curr_start, curr_end = spanning_intervals[0]
+        for start, end in spanning_intervals[1:]:
+            if start <= curr_end + 2:
+                curr_end = max(curr_end, end)
+            else:
+                merged.append((curr_start, curr_end))
+                curr_start, curr_end = start, end
+        merged.append((curr_start, curr_end))
+
+    final_intervals = []
+    curr_y = 0
+    for start, end in merged:
+        if start > curr_y:
+            final_intervals.append({'type': 'cols', 'top': curr_y, 'bottom': start})
+        final_intervals.append({'type': 'span', 'top': start, 'bottom': end})
+        curr_y = end
+    if curr_y < height:
+        final_intervals.append({'type': 'cols', 'top': curr_y, 'bottom': height})
+
+    full_text = []
+    for interval in final_intervals:
+        if interval['bottom'] - interval['top'] < 1:
+            continue
+        crop_box = (0, interval['top'], width, interval['bottom'])
+        if crop_box[1] >= crop_box[3]:
+            continue
+        try:
+            cropped_page = page.crop(crop_box)
+        except Exception:
+            continue
+        if interval['type'] == 'span':
+            text = cropped_page.extract_text(x_tolerance=2, y_tolerance=2)
+            if text:
+                full_text.append(text)
+        else:
+            for box in ((0, interval['top'], center, interval['bottom']),
+                        (center, interval['top'], width, interval['bottom'])):
+                try:
+                    text = page.crop(box).extract_text(x_tolerance=2, y_tolerance=2)
+                    if text:
+                        full_text.append(text)
+                except Exception:
+                    pass
+    return "\n".join(full_text)
+
+
+def time_pages(extract, pages, repeat):
+    best = float('inf')
+    texts = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        texts = [extract(page) for page in pages]
+        best = min(best, time.perf_counter() - start)
+    return best, texts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the single-pass column segmentation")
+    parser.add_argument('pdfs', nargs='+', help='Two-column PDF files')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per version; the best is kept (default: 3)')
+    args = parser.parse_args()
+
+    print(f"NumPy: {'yes' if pdf_keyword_searcher.np is not None else 'no (pure-Python path)'}")
+    print(f"{'PDF':40} {'pages':>5} {'crop (s)':>9} {'single (s)':>10} {'speedup':>8}  same")
+    total_old = total_new = 0.0
+    all_same = True
+    for path in args.pdfs:
+        with pdfplumber.open(path) as pdf:
+            pages = list(pdf.pages)
+            for page in pages:
+                page.chars  # parse once, outside the timings
+            old_time, old_texts = time_pages(extract_text_cropped, pages, args.repeat)
+            new_time, new_texts = time_pages(extract_text_smartly, pages, args.repeat)
+        same = old_texts == new_texts
+        all_same = all_same and same
+        total_old += old_time
+        total_new += new_time
+        speedup = old_time / new_time if new_time else float('inf')
+        print(f"{Path(path).name[:40]:40} {len(pages):5} {old_time:9.3f} {new_time:10.3f} {speedup:7.1f}x  {'yes' if same else 'NO'}")
+
+    if total_new:
+        print(f"{'TOTAL':40} {'':5} {total_old:9.3f} {total_new:10.3f} {total_old / total_new:7.1f}x  {'yes' if all_same else 'NO'}")
+    sys.exit(0 if all_same else 1)
+
+
+if __name__ == "__main__":
+    main()
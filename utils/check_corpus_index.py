@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Check that the corpus index (--index) counts exactly what a full scan counts.
+
+For every PDF given, CorpusIndex.category_counts is compared with
+analyze_pdf: the same totals, and every breakdown in the same order. Random
+synthetic pages are checked too, with the characters FTS5 tokenizes unlike
+the keyword regex (combining marks, symbols newer than SQLite's Unicode
+tables), which real PDFs rarely exercise. Exits with 1 on any difference.
+
+    python utils/check_corpus_index.py papers/*.pdf --keywords cloud.json
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+from pathlib import Path
+
+# Allow running as ``python utils/check_corpus_index.py`` from the repository root.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from corpus_index import CorpusIndex
+from keyword_search import KeywordSearcher
+from pdf_keyword_ranker import analyze_pdf, count_occurrences, index_pages
+
+SYNTHETIC_KEYWORDS = {
+    "Edge": ["edge", "edge computing", "Edge AI"],
+    "Cloud": ["cloud", "x", "İstanbul", "C++"],
+}
+# Combining acute accent, a precomposed letter, a Devanagari spacing mark,
+# a Thai vowel sign, an emoji, a middle dot and a dotted capital I.
+SYNTHETIC_WORDS = [
+    "edge", "computing", "Edge", "AI", "cloud", "x", "C++", "İstanbul", "istanbul",
+    "́", "é", "ः", "็", "\U0001F600", "·", "-", ".",
+]
+
+
+def canonical(counts):
+    """Counts with every breakdown as an ordered list, for an order-sensitive comparison."""
+    return {
+        category: (value["total"], list(value["breakdown"].items()))
+        for category, value in counts.items()
+    }
+
+
+def scan_counts(pages, searcher):
+    """Full-scan counts of ``(page_number, content)`` pages, or None without any hit."""
+    text = "\n".join(f"Page {page}:\n{content}\n" for page, content in pages)
+    counts = count_occurrences(text, searcher)
+    return counts if any(value["total"] for value in counts.values()) else None
+
+
+def check_pdfs(index, pdf_files, searcher):
+    indexed = []
+    for pdf_file in pdf_files:
+        try:
+            index.add(pdf_file, index_pages(pdf_file))
+        except Exception as exc:
+            print(f"Warning: failed to index '{pdf_file}'. Skipping. Reason: {exc}", file=sys.stderr)
+            continue
+        indexed.append(pdf_file)
+    pdf_files = indexed
+    got = index.category_counts(searcher, pdf_files)
+    failures = 0
+    for pdf_file in pdf_files:
+        expected = analyze_pdf(pdf_file, searcher)
+        if not any(value["total"] for value in expected.values()):
+            expected = None
+        actual = got.get(pdf_file)
+        same = (actual and canonical(actual)) == (expected and canonical(expected))
+        failures += not same
+        print(f"{Path(pdf_file).name[:60]:60} {'same' if same else 'DIFFERENT'}")
+    return failures
+
+
+def check_synthetic(index, path, trials, seed):
+    searcher = KeywordSearcher(SYNTHETIC_KEYWORDS)
+    rng = random.Random(seed)
+    failures = 0
+    for trial in range(trials):
+        pages = [
+            (page, "".join(rng.choice(SYNTHETIC_WORDS) + rng.choice(["", " "]) for _ in range(rng.randint(3, 60))))
+            for page in (1, 2, 3)
+        ]
+        # A new size/mtime each time, like an edited PDF.
+        Path(path).write_text(str(trial), encoding="utf-8")
+        index.add(path, pages)
+        actual = index.category_counts(searcher, [path]).get(path)
+        expected = scan_counts(pages, searcher)
+        failures += (actual and canonical(actual)) != (expected and canonical(expected))
+    print(f"Synthetic pages: {trials - failures}/{trials} same")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the corpus index with a full scan")
+    parser.add_argument('pdfs', nargs='*', help='PDF files to index and scan')
+    parser.add_argument('--keywords', default='AIforcoding.json', help='Keywords JSON for the PDFs (default: AIforcoding.json)')
+    parser.add_argument('--trials', type=int, default=300, help='Random synthetic documents (default: 300)')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the synthetic documents (default: 0)')
+    args = parser.parse_args()
+
+    failures = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        index = CorpusIndex(os.path.join(tmp, "index.sqlite"), "check")
+        try:
+            print(f"FTS5: {'yes' if index.fts else 'no (every page is scanned)'}")
+            if args.pdfs:
+                with open(args.keywords, 'r', encoding='utf-8') as fh:
+                    searcher = KeywordSearcher(json.load(fh))
+                failures += check_pdfs(index, [os.path.abspath(pdf) for pdf in args.pdfs], searcher)
+            failures += check_synthetic(index, os.path.join(tmp, "synthetic.pdf"), args.trials, args.seed)
+        finally:
+            index.close()
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
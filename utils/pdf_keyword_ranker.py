@@ -1,24 +1,42 @@
 import argparse
+import heapq
 import json
+import multiprocessing
 import os
+import signal
 import sys
-from typing import Any, Dict, List, Tuple
+import time
+from collections import deque
+from multiprocessing.connection import Connection, wait as wait_connections
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-from PyPDF2 import PdfReader
+# Allow running as ``python utils/pdf_keyword_ranker.py`` from the repository root.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
+from corpus_index import CorpusIndex
 from keyword_search import KeywordSearcher
+from pdf_text_cache import PYPDF2_EXTRACTOR, _pypdf2_version, pypdf2_pages
+from sharded_extraction import resolve_workers
 
 
 def extract_pdf_text(file_path: str) -> str:
-    """Extract raw text from every page of a PDF file."""
-    reader = PdfReader(file_path)
+    """Extract raw text from every page of a PDF file (served from the text cache when warm)."""
+    pages, _from_cache = pypdf2_pages(file_path)
     text_chunks: List[str] = []
-    for page_number, page in enumerate(reader.pages, start=1):
-        page_text = page.extract_text() or ""
+    for page_number, page_text in enumerate(pages, start=1):
         text_chunks.append(f"Page {page_number}:\n{page_text}\n")
     return "\n".join(text_chunks)
 
 
+def index_pages(file_path: str) -> List[Tuple[int, str]]:
+    """Return ``(page_number, content)`` for every page, split as ``KeywordSearcher`` splits the text."""
+    return [
+        (page_number, content)
+        for page_number, _start, content in KeywordSearcher._iter_pages(extract_pdf_text(file_path))
+    ]
+
+
 def iter_pdf_files(folder: str, recursive: bool) -> List[str]:
     """Return a sorted list of PDF file paths inside the folder."""
     pdf_paths: List[str] = []
@@ -53,7 +71,14 @@ def analyze_pdf(
     searcher: KeywordSearcher,
 ) -> Dict[str, Dict[str, Any]]:
     """Return a dict with counts/breakdown of occurrences per category for one PDF."""
-    pdf_text = extract_pdf_text(file_path)
+    return count_occurrences(extract_pdf_text(file_path), searcher)
+
+
+def count_occurrences(
+    pdf_text: str,
+    searcher: KeywordSearcher,
+) -> Dict[str, Dict[str, Any]]:
+    """Counts/breakdown of occurrences per category in a ``Page N:`` text (see ``analyze_pdf``)."""
     occurrences = searcher.check_enabler_occurrences(pdf_text)
 
     result = {}
@@ -72,6 +97,50 @@ def analyze_pdf(
     return result
 
 
+def update_index(index: CorpusIndex, pdf_files: List[str], jobs: int = 1, timeout: float = 0) -> bool:
+    """Index the new and changed PDFs of *pdf_files*; drop the deleted ones.
+
+    With ``jobs > 1`` the PDFs are extracted on a process pool. Returns
+    False when interrupted with Ctrl-C (the PDFs indexed so far are kept).
+    """
+    stale = index.stale_paths(pdf_files)
+    print(f"Index: {len(pdf_files) - len(stale)} PDFs up to date, {len(stale)} to index.")
+    completed = 0
+
+    def on_done(pdf_file: str, pages: List[Tuple[int, str]], error: Optional[Exception]) -> None:
+        nonlocal completed
+        completed += 1
+        if error is None:
+            try:
+                index.add(pdf_file, pages)
+            except Exception as exc:
+                error = exc
+        if error is not None:
+            print(
+                f"Warning: failed to index '{pdf_file}'. Skipping. Reason: {error}",
+                file=sys.stderr,
+            )
+            return
+        print(f"[{completed}/{len(stale)}] Indexed {os.path.basename(pdf_file)}")
+
+    if jobs > 1 and len(stale) > 1:
+        if not run_pool(stale, index_pages, jobs, timeout, on_done):
+            return False
+    else:
+        for pdf_file in stale:
+            try:
+                pages = index_pages(pdf_file)
+            except Exception as exc:
+                on_done(pdf_file, [], exc)
+            else:
+                on_done(pdf_file, pages, None)
+
+    removed = index.prune()
+    if removed:
+        print(f"Removed {removed} deleted PDF(s) from the index.")
+    return True
+
+
 def build_rankings(
     per_file_counts: Dict[str, Dict[str, Any]],
     categories: List[str],
@@ -106,8 +175,11 @@ def save_rankings(rankings: Dict[str, List[Tuple[str, int, Dict[str, int]]]], ou
         ]
         for category, ranking in rankings.items()
     }
-    with open(output_path, "w", encoding="utf-8") as fh:
+    # Interim rankings rewrite the file during a run; readers never see half of it.
+    tmp_path = f"{output_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as fh:
         json.dump(serializable, fh, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, output_path)
 
 
 def print_rankings(rankings: Dict[str, List[Tuple[str, int, Dict[str, int]]]]) -> None:
@@ -123,6 +195,223 @@ def print_rankings(rankings: Dict[str, List[Tuple[str, int, Dict[str, int]]]]) -
             print(f"{idx:2d}. {os.path.basename(file_path)} -> {score} keyword hits; {breakdown_str}")
 
 
+# -- process pool (--jobs) ---------------------------------------------------------
+
+_worker_searcher: Optional[KeywordSearcher] = None
+
+
+class PdfTimeout(Exception):
+    """A PDF took longer than ``--timeout`` seconds; its worker process was killed."""
+
+
+def _worker_main(
+    conn: Connection,
+    task: Callable[[str], Any],
+    enabler_keywords: Optional[Dict[str, List[str]]],
+) -> None:
+    """Worker process: compile the keywords once, then run *task* on each PDF received."""
+    global _worker_searcher
+    # Ctrl-C is handled by the main process, which stops the workers.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if enabler_keywords is not None:
+        _worker_searcher = KeywordSearcher(enabler_keywords)
+    while True:
+        try:
+            file_path = conn.recv()
+        except EOFError:
+            return
+        if file_path is None:
+            return
+        try:
+            conn.send((task(file_path), None))
+        except Exception as exc:
+            conn.send((None, str(exc)))
+
+
+def _analyze_in_worker(file_path: str) -> Dict[str, Dict[str, Any]]:
+    return analyze_pdf(file_path, _worker_searcher)
+
+
+def run_pool(
+    pdf_files: List[str],
+    task: Callable[[str], Any],
+    jobs: int,
+    timeout: float,
+    on_done: Callable[[str, Any, Optional[Exception]], None],
+    enabler_keywords: Optional[Dict[str, List[str]]] = None,
+    interim_every: float = 0,
+    on_interim: Optional[Callable[[], None]] = None,
+) -> bool:
+    """Run ``task(pdf_file)`` for every PDF on *jobs* worker processes.
+
+    Each worker is handed one PDF at a time, so a PDF still running after
+    *timeout* seconds (0 = no limit) is stopped by killing its worker; it is
+    reported as a :class:`PdfTimeout` and the worker is replaced.
+    ``on_done(pdf_file, result, error)`` is called in completion order and
+    ``on_interim()`` every *interim_every* seconds. Returns False when
+    interrupted with Ctrl-C (the workers are stopped at once).
+    """
+    queued = deque(pdf_files)
+    busy: Dict[Connection, Tuple[multiprocessing.Process, str, float]] = {}
+    report_interim = on_interim is not None and interim_every > 0
+    next_interim = time.monotonic() + interim_every
+
+    def send_next(conn: Connection, process: multiprocessing.Process) -> None:
+        if queued:
+            pdf_file = queued.popleft()
+            conn.send(pdf_file)
+            busy[conn] = (process, pdf_file, time.monotonic())
+        else:
+            conn.send(None)
+            conn.close()
+            process.join()
+
+    def spawn() -> None:
+        conn, child_conn = multiprocessing.Pipe()
+        process = multiprocessing.Process(
+            target=_worker_main, args=(child_conn, task, enabler_keywords), daemon=True
+        )
+        process.start()
+        child_conn.close()
+        send_next(conn, process)
+
+    try:
+        for _ in range(min(jobs, len(queued))):
+            spawn()
+        while busy:
+            deadlines = [started + timeout for _process, _pdf, started in busy.values()] if timeout > 0 else []
+            if report_interim:
+                deadlines.append(next_interim)
+            wait_for = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+            for conn in wait_connections(list(busy), wait_for):
+                process, pdf_file, _started = busy.pop(conn)
+                try:
+                    result, reason = conn.recv()
+                except EOFError:
+                    # The worker died (e.g. a crash inside a C extension).
+                    conn.close()
+                    process.join()
+                    on_done(pdf_file, None, RuntimeError(f"worker process exited with code {process.exitcode}"))
+                    if queued:
+                        spawn()
+                    continue
+                on_done(pdf_file, result, None if reason is None else RuntimeError(reason))
+                send_next(conn, process)
+            now = time.monotonic()
+            if timeout > 0:
+                for conn, (process, pdf_file, started) in list(busy.items()):
+                    if now - started >= timeout:
+                        del busy[conn]
+                        process.kill()
+                        process.join()
+                        conn.close()
+                        on_done(pdf_file, None, PdfTimeout(f"timed out after {timeout:g} s"))
+                        if queued:
+                            spawn()
+            if report_interim and now >= next_interim:
+                on_interim()
+                next_interim = time.monotonic() + interim_every
+    except KeyboardInterrupt:
+        for process, _pdf_file, _started in busy.values():
+            process.kill()
+        return False
+    return True
+
+
+class _RankedFile:
+    """One file's score in one category, ordered as ``build_rankings`` orders them."""
+
+    __slots__ = ("file_path", "score", "breakdown", "name")
+
+    def __init__(self, file_path: str, score: int, breakdown: Dict[str, int]) -> None:
+        self.file_path = file_path
+        self.score = score
+        self.breakdown = breakdown
+        self.name = os.path.basename(file_path).lower()
+
+    def __lt__(self, other: "_RankedFile") -> bool:
+        # Ranks below: lower score, or the same score and a later filename.
+        return (self.score, other.name) < (other.score, self.name)
+
+
+class RunningRankings:
+    """Top-N files per category, kept in one bounded min-heap per category.
+
+    Files are added as their results arrive; :meth:`rankings` equals
+    ``build_rankings`` over every file added so far.
+    """
+
+    def __init__(self, categories: List[str], top_n: int) -> None:
+        self.top_n = top_n
+        self._heaps: Dict[str, List[_RankedFile]] = {category: [] for category in categories}
+
+    def add(self, file_path: str, counts: Dict[str, Dict[str, Any]]) -> None:
+        if self.top_n <= 0:
+            return
+        for category, heap in self._heaps.items():
+            cat_data = counts.get(category, {"total": 0, "breakdown": {}})
+            if cat_data["total"] <= 0:
+                continue
+            entry = _RankedFile(file_path, cat_data["total"], cat_data["breakdown"])
+            if len(heap) < self.top_n:
+                heapq.heappush(heap, entry)
+            elif heap[0] < entry:
+                heapq.heapreplace(heap, entry)
+
+    def rankings(self) -> Dict[str, List[Tuple[str, int, Dict[str, int]]]]:
+        return {
+            category: [
+                (entry.file_path, entry.score, entry.breakdown)
+                for entry in sorted(heap, reverse=True)
+            ]
+            for category, heap in self._heaps.items()
+        }
+
+
+def rank_in_pool(
+    pdf_files: List[str],
+    enabler_keywords: Dict[str, List[str]],
+    jobs: int,
+    top_n: int,
+    timeout: float,
+    interim_every: float = 0,
+    output: Optional[str] = None,
+) -> Tuple[Dict[str, List[Tuple[str, int, Dict[str, int]]]], bool]:
+    """Analyze *pdf_files* on a process pool; return ``(rankings, interrupted)``.
+
+    Interim rankings are printed (and saved to *output*) every
+    *interim_every* seconds.
+    """
+    running = RunningRankings(list(enabler_keywords.keys()), top_n)
+    completed = 0
+
+    def on_done(pdf_file: str, counts: Dict[str, Dict[str, Any]], error: Optional[Exception]) -> None:
+        nonlocal completed
+        completed += 1
+        if error is not None:
+            print(
+                f"Warning: failed to analyze '{pdf_file}'. Skipping. Reason: {error}",
+                file=sys.stderr,
+            )
+            return
+        running.add(pdf_file, counts)
+        print(f"[{completed}/{len(pdf_files)}] Processed {os.path.basename(pdf_file)}")
+
+    def on_interim() -> None:
+        print(f"\n--- Interim rankings after {completed}/{len(pdf_files)} PDFs ---")
+        rankings = running.rankings()
+        print_rankings(rankings)
+        if output:
+            save_rankings(rankings, output)
+        print()
+
+    finished = run_pool(
+        pdf_files, _analyze_in_worker, jobs, timeout, on_done,
+        enabler_keywords, interim_every, on_interim,
+    )
+    return running.rankings(), not finished
+
+
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description="Rank PDF files by keyword adherence per category."
@@ -153,7 +442,39 @@ def parse_args() -> argparse.Namespace:
         "--output",
         help="Optional path to save rankings as JSON.",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--index",
+        help="Optional SQLite file holding a persistent index of the PDF texts. "
+             "New and changed PDFs are indexed; rankings are answered from the index.",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Worker processes analyzing (or indexing) PDFs in parallel; 0 = one per CPU core "
+             "(default: 1, sequential).",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=300.0,
+        help="With --jobs > 1, kill the worker of a PDF still running after this many seconds "
+             "and skip the PDF; 0 disables (default: 300).",
+    )
+    parser.add_argument(
+        "--interim-every",
+        type=float,
+        default=0.0,
+        metavar="SECONDS",
+        help="With --jobs > 1 and without --index, print (and save to --output) the rankings "
+             "so far every SECONDS (default: off).",
+    )
+    args = parser.parse_args()
+    if args.timeout < 0:
+        parser.error("--timeout must be >= 0")
+    if args.interim_every < 0:
+        parser.error("--interim-every must be >= 0")
+    return args
 
 
 def main() -> None:
@@ -183,27 +504,49 @@ def main() -> None:
 
     print(f"Found {len(pdf_files)} unique PDF files. Starting analysis...")
 
-    searcher = KeywordSearcher(enabler_keywords)
-    per_file_counts: Dict[str, Dict[str, Any]] = {}
+    jobs = resolve_workers(args.jobs)
+    interrupted = False
 
-    for idx, pdf_file in enumerate(pdf_files, start=1):
+    if args.index:
+        searcher = KeywordSearcher(enabler_keywords)
+        index = CorpusIndex(args.index, f"{PYPDF2_EXTRACTOR}/{_pypdf2_version()}")
         try:
-            counts = analyze_pdf(pdf_file, searcher)
-            per_file_counts[pdf_file] = counts
-            print(f"[{idx}/{len(pdf_files)}] Processed {os.path.basename(pdf_file)}")
-        except Exception as exc:
-            print(
-                f"Warning: failed to analyze '{pdf_file}'. Skipping. Reason: {exc}",
-                file=sys.stderr,
-            )
-
-    rankings = build_rankings(per_file_counts, list(enabler_keywords.keys()), args.top_n)
+            interrupted = not update_index(index, pdf_files, jobs, args.timeout)
+            start = time.perf_counter()
+            per_file_counts = index.category_counts(searcher, pdf_files)
+            print(f"Searched the index in {time.perf_counter() - start:.2f} s.")
+        finally:
+            index.close()
+        rankings = build_rankings(per_file_counts, list(enabler_keywords.keys()), args.top_n)
+    elif jobs > 1:
+        rankings, interrupted = rank_in_pool(
+            pdf_files, enabler_keywords, jobs, args.top_n, args.timeout,
+            args.interim_every, args.output,
+        )
+    else:
+        searcher = KeywordSearcher(enabler_keywords)
+        per_file_counts: Dict[str, Dict[str, Any]] = {}
+        for idx, pdf_file in enumerate(pdf_files, start=1):
+            try:
+                counts = analyze_pdf(pdf_file, searcher)
+                per_file_counts[pdf_file] = counts
+                print(f"[{idx}/{len(pdf_files)}] Processed {os.path.basename(pdf_file)}")
+            except Exception as exc:
+                print(
+                    f"Warning: failed to analyze '{pdf_file}'. Skipping. Reason: {exc}",
+                    file=sys.stderr,
+                )
+        rankings = build_rankings(per_file_counts, list(enabler_keywords.keys()), args.top_n)
+
+    if interrupted:
+        print("\nInterrupted: the rankings below only cover the PDFs processed so far.")
     print_rankings(rankings)
 
     if args.output:
         save_rankings(rankings, args.output)
         print(f"\nRankings saved to {args.output}")
-
+    if interrupted:
+        sys.exit(130)
 
 if __name__ == "__main__":
     main()
@@ -1,15 +1,29 @@
 #!/usr/bin/env python3
 """
-Wrapper script to run pdf_keyword_searcher.py for all keywords from aitaxonomy.json
+Runs the pdf_keyword_searcher.py search for all keywords from aitaxonomy.json
 on all PDF files in the PAPERS folder.
+
+Each PDF is extracted once (column-aware, through the shared text cache) and
+all keywords are matched in one pass over its sentences; PDFs are searched in
+parallel by worker processes (--workers). A PDF still being searched after
+--timeout seconds has its worker killed and is reported as an error.
 """
 import argparse
+import csv
 import json
 import os
-import subprocess
 import sys
+import time
+from dataclasses import dataclass, field
+from functools import partial
 from pathlib import Path
 
+# Allow running as ``python utils/run_keyword_search.py`` from the repository root.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pdf_keyword_ranker import run_pool
+from pdf_keyword_searcher import find_keywords_contexts
+
 def load_keywords(json_path):
     """Load keywords from the JSON file."""
     with open(json_path, 'r', encoding='utf-8') as f:
@@ -30,6 +44,68 @@ def get_pdf_files(papers_dir):
     papers_path = Path(papers_dir)
     return list(papers_path.glob('*.pdf'))
 
+
+@dataclass
+class PdfSearchResult:
+    """Keyword contexts found in one PDF."""
+    pdf_name: str
+    # keyword -> unique (page_num, context) pairs, in page order
+    contexts: dict = field(default_factory=dict)
+    error: str | None = None
+    seconds: float = 0.0
+
+
+def search_pdf(pdf_path, keywords):
+    """
+    Search one PDF for every keyword (see find_keywords_contexts).
+
+    Same matches as running pdf_keyword_searcher.py once per keyword:
+    case-insensitive substring matches per sentence, with the previous and
+    next sentence as context, deduplicated by normalize_text.
+    """
+    start = time.time()
+    pdf_name = Path(pdf_path).name
+    try:
+        contexts = find_keywords_contexts(str(pdf_path), keywords)
+    except Exception as e:
+        return PdfSearchResult(pdf_name, error=str(e), seconds=time.time() - start)
+    return PdfSearchResult(pdf_name, contexts, seconds=time.time() - start)
+
+
+def search_pdfs(pdf_files, keywords, workers, timeout, on_result):
+    """
+    Call ``on_result(PdfSearchResult)`` for every PDF, in input order.
+
+    *workers* PDFs are searched at a time, each by a worker process of
+    pdf_keyword_ranker.run_pool, which kills the worker of a PDF still running
+    after *timeout* seconds (0 = no limit); that PDF is reported with an error.
+    With one worker and no timeout, the PDFs are searched in this process.
+    Returns False when interrupted with Ctrl-C.
+    """
+    if workers <= 1 and timeout <= 0:
+        try:
+            for pdf_file in pdf_files:
+                on_result(search_pdf(pdf_file, keywords))
+        except KeyboardInterrupt:
+            return False
+        return True
+
+    # Results arrive in completion order; hold them until their turn.
+    position = {pdf_file: idx for idx, pdf_file in enumerate(pdf_files)}
+    pending = {}
+    next_idx = 0
+
+    def on_done(pdf_file, result, error):
+        nonlocal next_idx
+        if error is not None:
+            result = PdfSearchResult(Path(pdf_file).name, error=str(error))
+        pending[position[pdf_file]] = result
+        while next_idx in pending:
+            on_result(pending.pop(next_idx))
+            next_idx += 1
+
+    return run_pool(pdf_files, partial(search_pdf, keywords=keywords), workers, timeout, on_done)
+
 def main():
     parser = argparse.ArgumentParser(
         description="Run keyword search on all PDFs with all keywords from JSON file"
@@ -50,12 +126,22 @@ def main():
         help='Directory to save results (default: same as papers directory)'
     )
     parser.add_argument(
-        '--script',
-        default='pdf_keyword_searcher.py',
-        help='Path to pdf_keyword_searcher.py (default: pdf_keyword_searcher.py in current dir)'
+        '--workers',
+        type=int,
+        default=os.cpu_count() or 1,
+        help='Number of PDFs searched in parallel (default: number of CPUs)'
+    )
+    parser.add_argument(
+        '--timeout',
+        type=float,
+        default=120.0,
+        help='Kill the search of a PDF still running after this many seconds and report it as an error; '
+             '0 disables, and with --workers 1 searches in this process (default: 120)'
     )
     
     args = parser.parse_args()
+    if args.timeout < 0:
+        parser.error('--timeout must be >= 0')
     
     # Load keywords
     print(f"Loading keywords from {args.keywords_file}...")
@@ -82,9 +168,15 @@ def main():
     summary_file = os.path.join(args.output_dir, 'keyword_search_results.txt')
     
     total_searches = len(pdf_files) * len(keywords)
-    current = 0
     pdf_count = len(pdf_files)
     keyword_count = len(keywords)
+    workers = max(1, min(args.workers, pdf_count))
+    
+    # Category of each keyword: the first category that lists it
+    keyword_categories = {}
+    for cat_name, cat_keywords in categories.items():
+        for kw in cat_keywords:
+            keyword_categories.setdefault(kw.lower(), cat_name)
     
     print(f"\n{'='*60}")
     print(f"KEYWORD SEARCHER - VERBOSE MODE")
@@ -95,9 +187,10 @@ def main():
     print(f"Total PDFs: {pdf_count}")
     print(f"Total keywords: {keyword_count}")
     print(f"Total searches to perform: {total_searches}")
+    print(f"Parallel workers: {workers}")
+    print(f"Timeout per PDF: {f'{args.timeout:g} s' if args.timeout > 0 else 'none'}")
     print(f"{'='*60}\n")
     
-    import time
     start_time = time.time()
     
     with open(summary_file, 'w', encoding='utf-8') as summary:
@@ -109,86 +202,50 @@ def main():
         summary.write(f"Total keywords: {keyword_count}\n")
         summary.write(f"Total searches: {total_searches}\n\n")
         
-        # Initialize category counts for this PDF
-        pdf_category_counts = {cat: 0 for cat in category_names}
+        pdf_idx = 0
         
-        for pdf_idx, pdf_file in enumerate(pdf_files, 1):
-            pdf_name = pdf_file.name
-            pdf_start_time = time.time()
+        def write_result(result):
+            nonlocal pdf_idx
+            pdf_idx += 1
+            pdf_name = result.pdf_name
             
-            print(f"\n[{pdf_idx}/{pdf_count}] Processing PDF: {pdf_name}")
+            elapsed = time.time() - start_time
+            eta = elapsed / pdf_idx * (pdf_count - pdf_idx)
+            print(f"\n[{pdf_idx}/{pdf_count}] Searched PDF: {pdf_name} | Progress: {pdf_idx*100//pdf_count}% | ETA: {eta/60:.1f} min")
             print(f"-" * 50)
             
             summary.write(f"\n{'='*80}\n")
             summary.write(f"PDF: {pdf_name}\n")
             summary.write(f"{'='*80}\n")
             
-            found_any = False
             found_count = 0
             
             # Track which keywords were found and their counts per category
             keyword_counts_per_category = {cat: 0 for cat in category_names}
             
-            for kw_idx, keyword in enumerate(keywords, 1):
-                current += 1
+            if result.error is not None:
+                summary.write(f"ERROR: {result.error}\n")
+                print(f"  -> Error: {result.error}")
+            
+            for keyword in keywords:
+                contexts = result.contexts.get(keyword)
+                if not contexts:
+                    continue
+                found_count += 1
                 
-                # Show progress every 10 keywords
-                if kw_idx % 10 == 1 or kw_idx == 1:
-                    elapsed = time.time() - start_time
-                    rate = current / elapsed if elapsed > 0 else 0
-                    eta = (total_searches - current) / rate if rate > 0 else 0
-                    print(f"  [{kw_idx}/{keyword_count}] Searching: '{keyword}' | Progress: {current}/{total_searches} ({current*100//total_searches}%) | ETA: {eta/60:.1f} min")
+                cat_name = keyword_categories.get(keyword.lower())
+                if cat_name is not None:
+                    keyword_counts_per_category[cat_name] += len(contexts)
                 
-                try:
-                    # Run the keyword searcher
-                    result = subprocess.run(
-                        [sys.executable, args.script, str(pdf_file), keyword],
-                        capture_output=True,
-                        text=True,
-                        timeout=120  # 2 minute timeout per search
-                    )
-                    
-                    output = result.stdout
-                    
-                    # Check if keyword was found (look for "Found X occurrence(s)")
-                    if "Found 0 occurrence" not in output and "occurrence(s)" in output:
-                        found_any = True
-                        found_count += 1
-                        
-                        # Extract count from output (e.g., "Found 5 occurrence(s)")
-                        import re
-                        match = re.search(r'Found (\d+) occurrence', output)
-                        if match:
-                            count = int(match.group(1))
-                        else:
-                            count = 1
-                        
-                        # Find which category this keyword belongs to
-                        for cat_name, cat_keywords in categories.items():
-                            if keyword.lower() in [k.lower() for k in cat_keywords]:
-                                keyword_counts_per_category[cat_name] += count
-                                break
-                        
-                        summary.write(f"\n--- Keyword: '{keyword}' ---\n")
-                        
-                        # Extract the relevant lines
-                        lines = output.strip().split('\n')
-                        for line in lines:
-                            if 'Page' in line or 'Found' in line or (line.strip() and not line.startswith('[')):
-                                summary.write(line + '\n')
-                    
-                except subprocess.TimeoutExpired:
-                    summary.write(f"\n--- Keyword: '{keyword}' ---\n")
-                    summary.write("TIMEOUT\n")
-                except Exception as e:
-                    summary.write(f"\n--- Keyword: '{keyword}' ---\n")
-                    summary.write(f"ERROR: {str(e)}\n")
+                summary.write(f"\n--- Keyword: '{keyword}' ---\n")
+                summary.write(f"Found {len(contexts)} occurrence(s) of '{keyword}':\n")
+                for page_num, context in contexts:
+                    summary.write(f"Page {page_num}:\n")
+                    summary.write(context + '\n')
             
             # Store results for this PDF
             results_summary[pdf_name] = keyword_counts_per_category
             
-            pdf_elapsed = time.time() - pdf_start_time
-            
             # Show category counts for this PDF
             print(f"\n  Category Results for {pdf_name}:")
             print(f"  {'-' * 40}")
@@ -197,15 +254,20 @@ def main():
                     print(f"    {cat_name}: {count}")
             print(f"  {'-' * 40}")
             
-            if not found_any:
+            if result.error is not None:
+                return
+            if found_count == 0:
                 summary.write("No keywords found in this PDF.\n")
-                print(f"  -> Finished: No keywords found | Time: {pdf_elapsed:.1f}s")
+                print(f"  -> Finished: No keywords found | Time: {result.seconds:.1f}s")
             else:
-                print(f"  -> Finished: Found keywords in {found_count} matches | Time: {pdf_elapsed:.1f}s")
+                print(f"  -> Finished: Found keywords in {found_count} matches | Time: {result.seconds:.1f}s")
+        
+        finished = search_pdfs(pdf_files, keywords, workers, args.timeout, write_result)
+        if not finished:
+            print(f"\nInterrupted: the summary only covers the first {pdf_idx} PDF(s).")
         
         # Generate CSV summary
         csv_file = os.path.join(args.output_dir, 'keyword_summary_by_category.csv')
-        import csv
         with open(csv_file, 'w', newline='', encoding='utf-8') as csvfile:
             writer = csv.writer(csvfile)
             # Write header
@@ -227,6 +289,8 @@ def main():
     
     print(f"\nSearch complete! Results saved to {summary_file}")
     print(f"Individual results: {args.output_dir}")
+    if not finished:
+        sys.exit(130)
 
 if __name__ == "__main__":
     main()